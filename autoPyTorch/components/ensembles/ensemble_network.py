@@ -0,0 +1,121 @@
+import copy
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+import torch.nn as nn
+
+try:
+    from torch.func import stack_module_state, functional_call, vmap
+except ImportError:
+    stack_module_state = None
+
+
+class EnsembleNetwork(nn.Module):
+    """Evaluate the members of an ensemble together and return their weighted output.
+
+    Can be used as predict_model of the TrainNode, so the data is preprocessed and batched once for all members.
+    Members with the same architecture are evaluated in a single stacked forward pass.
+    """
+
+    def __init__(self, networks, weights, num_threads=1, stack_networks=True):
+        """Initialize the ensemble.
+
+        Arguments:
+            networks {list} -- The trained networks of the members. They expect the same input.
+            weights {list} -- The weight of each member.
+
+        Keyword Arguments:
+            num_threads {int} -- Number of threads to evaluate the networks that can not be stacked. (default: {1})
+            stack_networks {bool} -- Whether to stack networks with the same architecture. (default: {True})
+        """
+        super(EnsembleNetwork, self).__init__()
+        self.networks = nn.ModuleList(networks)
+        self.weights = list(weights)
+        self.num_threads = num_threads
+        self.logger = logging.getLogger('autonet')
+
+        # group the indices of the networks by architecture
+        self.groups = []
+        signatures = dict()
+        for i, network in enumerate(networks):
+            signature = self.get_architecture(network) if stack_networks and stack_module_state is not None else i
+            if signature not in signatures:
+                signatures[signature] = len(self.groups)
+                self.groups.append([])
+            self.groups[signatures[signature]].append(i)
+
+        self.stacked = dict()
+        self.executor = None
+
+    @staticmethod
+    def get_architecture(network):
+        """Networks with the same architecture only differ in their parameters"""
+        embedding = getattr(network, "embedding", None)
+        return (type(network), repr(network), repr(getattr(embedding, "embed_features", None)))
+
+    def forward(self, x):
+        with torch.no_grad():
+            outputs = []
+            single = []
+            for group_index, group in enumerate(self.groups):
+                output = self.forward_stacked(group_index, x) if len(group) > 1 else None
+                if output is None:
+                    single.extend(group)
+                else:
+                    outputs.append(output)
+
+            if self.num_threads > 1 and len(single) > 1:
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(max_workers=self.num_threads)
+                outputs.extend(self.executor.map(lambda i: self.weights[i] * self.networks[i](x), single))
+            else:
+                outputs.extend(self.weights[i] * self.networks[i](x) for i in single)
+        return sum(outputs)
+
+    def forward_stacked(self, group_index, x):
+        """Evaluate all networks of a group in one vectorized forward pass.
+
+        Arguments:
+            group_index {int} -- The index of the group of networks with the same architecture.
+            x {Tensor} -- The input batch.
+
+        Returns:
+            Tensor -- The weighted sum of the outputs. None if the networks can not be stacked.
+        """
+        group = self.groups[group_index]
+        stacked = self.stacked.get(group_index)
+        if stacked is False:
+            return None
+
+        # stack the parameters once per device
+        if stacked is None or stacked[0] != x.device or stacked[4] != self.training:
+            networks = [self.networks[i] for i in group]
+            params, buffers = stack_module_state(networks)
+            base = copy.deepcopy(networks[0]).to("meta")
+            base.train(self.training)
+            weights = torch.tensor([self.weights[i] for i in group], device=x.device)
+            stacked = (x.device, base, params, buffers, self.training, weights)
+            self.stacked[group_index] = stacked
+
+        _, base, params, buffers, _, weights = stacked
+        call = lambda p, b, x: functional_call(base, (p, b), (x,))
+        try:
+            output = vmap(call, in_dims=(0, 0, None))(params, buffers, x)
+        except Exception as e:
+            self.logger.debug("Can not stack networks of type " + type(base).__name__ + ": " + str(e))
+            self.stacked[group_index] = False
+            return None
+        weights = weights.to(output.dtype).view(-1, *([1] * (output.dim() - 1)))
+        return (weights * output).sum(0)
+
+    def _apply(self, fn, *args, **kwargs):
+        # stacked parameters are copies. Restack them after the networks have been moved.
+        self.stacked = {k: v for k, v in self.stacked.items() if v is False}
+        return super(EnsembleNetwork, self)._apply(fn, *args, **kwargs)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["executor"] = None
+        state["stacked"] = dict()
+        return state
@@ -5,6 +5,9 @@ import numpy as np
 
 from autoPyTorch.components.ensembles.abstract_ensemble import AbstractEnsemble
 
+# maximum number of prediction values that are scored in a single batch
+MAX_BATCH_ELEMENTS = 2 ** 24
+
 
 class EnsembleSelection(AbstractEnsemble):
     """Ensemble Selection algorithm extracted from auto-sklearn"""
@@ -14,6 +17,7 @@ class EnsembleSelection(AbstractEnsemble):
                  bagging=False, mode='fast'):
         self.ensemble_size = ensemble_size
         self.metric = metric.get_loss_value
+        self.batched_metric = getattr(metric, "get_loss_values", None)
         self.sorted_initialization_n_best = sorted_initialization_n_best
         self.only_consider_n_best = only_consider_n_best
         self.bagging = bagging
@@ -43,6 +47,7 @@ class EnsembleSelection(AbstractEnsemble):
 
     def _fast(self, predictions, labels):
         """Fast version of Rich Caruana's ensemble selection method."""
+        predictions = np.asarray(predictions)
         self.num_input_models_ = len(predictions)
 
         ensemble = []
@@ -65,8 +70,12 @@ class EnsembleSelection(AbstractEnsemble):
         if self.only_consider_n_best > 0:
             only_consider_indices = set(self._sorted_initialization(predictions, labels, self.only_consider_n_best))
 
+        candidates = np.arange(len(predictions))
+        if only_consider_indices:
+            candidates = np.array(sorted(only_consider_indices))
+
         for i in range(ensemble_size):
-            scores = np.zeros((len(predictions)))
+            scores = np.full((len(predictions)), float("inf"))
             s = len(ensemble)
             if s == 0:
                 weighted_ensemble_prediction = np.zeros(predictions[0].shape)
@@ -74,16 +83,10 @@ class EnsembleSelection(AbstractEnsemble):
                 ensemble_prediction = np.mean(np.array(ensemble), axis=0)
                 weighted_ensemble_prediction = (s / float(s + 1)) * \
                                                ensemble_prediction
-            fant_ensemble_prediction = np.zeros(weighted_ensemble_prediction.shape)
-            for j, pred in enumerate(predictions):
-                # TODO: this could potentially be vectorized! - let's profile
-                # the script first!
-                if only_consider_indices and j not in only_consider_indices:
-                    scores[j] = float("inf")
-                    continue
-                fant_ensemble_prediction[:,:] = weighted_ensemble_prediction + \
-                                             (1. / float(s + 1)) * pred
-                scores[j] = self.metric(fant_ensemble_prediction, labels)
+
+            # score all candidates at once
+            scores[candidates] = self._get_scores(predictions, labels, candidates,
+                lambda preds: weighted_ensemble_prediction + (1. / float(s + 1)) * preds)
             all_best = np.argwhere(scores == np.nanmin(scores)).flatten()
             best = np.random.choice(all_best)
             ensemble.append(predictions[best])
@@ -158,14 +161,42 @@ class EnsembleSelection(AbstractEnsemble):
         self.weights_ = weights
 
     def _sorted_initialization(self, predictions, labels, n_best):
-        perf = np.zeros([predictions.shape[0]])
-
-        for idx, prediction in enumerate(predictions):
-            perf[idx] = self.metric(prediction, labels)
-
+        perf = self._get_scores(predictions, labels, np.arange(len(predictions)))
         indices = np.argsort(perf)[:n_best]
         return indices
 
+    def _get_scores(self, predictions, labels, candidates, transform=None):
+        """Compute the loss of the (transformed) predictions of the given candidates.
+        The candidates are scored in batches, if the metric supports it.
+
+        Arguments:
+            predictions {array} -- The predictions of all models, shape (n_models, n_samples, ...)
+            labels {array} -- The true labels
+            candidates {array} -- Indices of the models to score
+
+        Keyword Arguments:
+            transform {function} -- Applied to a batch of predictions before scoring, e.g. adding them to the current ensemble. (default: {None})
+
+        Returns:
+            array -- The loss of each candidate
+        """
+        scores = np.zeros(len(candidates))
+        if len(candidates) == 0:
+            return scores
+        batch_size = max(1, MAX_BATCH_ELEMENTS // max(1, predictions[0].size))
+        if self.batched_metric is None:
+            batch_size = 1
+
+        for start in range(0, len(candidates), batch_size):
+            batch = predictions[candidates[start:start + batch_size]]
+            if transform is not None:
+                batch = transform(batch)
+            if self.batched_metric is None:
+                scores[start] = self.metric(batch[0], labels)
+            else:
+                scores[start:start + batch_size] = self.batched_metric(batch, labels)
+        return scores
+
     def _bagging(self, predictions, labels, fraction=0.5, n_bags=20):
         """Rich Caruana's ensemble selection method with bagging."""
         raise ValueError('Bagging might not work with class-based interface!')
@@ -37,6 +37,8 @@ class AutoNetLearningRateSchedulerBase(object):
             scheduler.allows_early_stopping = True
         if not hasattr(scheduler, "snapshot_before_restart"):
             scheduler.snapshot_before_restart = False
+        if not hasattr(scheduler, "adapts_to_budget"):
+            scheduler.adapts_to_budget = False
         return scheduler
 
     def _get_scheduler(self, optimizer, config):
@@ -260,7 +262,9 @@ class SchedulerCosineAnnealingLR(AutoNetLearningRateSchedulerBase):
     """
 
     def _get_scheduler(self, optimizer, config):
-        return CosineAnnealingToFlatLR(optimizer=optimizer, T_max=config['T_max'], eta_min=config['eta_min'], last_epoch=-1)
+        scheduler = CosineAnnealingToFlatLR(optimizer=optimizer, T_max=config['T_max'], eta_min=config['eta_min'], last_epoch=-1)
+        scheduler.adapts_to_budget = True
+        return scheduler
 
     @staticmethod
     def get_config_space(
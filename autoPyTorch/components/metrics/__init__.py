@@ -1,3 +1,6 @@
-from autoPyTorch.components.metrics.balanced_accuracy import balanced_accuracy
-from autoPyTorch.components.metrics.pac_score import pac_metric
+from autoPyTorch.components.metrics.balanced_accuracy import balanced_accuracy, batched_balanced_accuracy
+from autoPyTorch.components.metrics.pac_score import pac_metric, batched_pac_metric
 from autoPyTorch.components.metrics.standard_metrics import accuracy, auc_metric, mae, rmse, multilabel_accuracy, cross_entropy, top1, top3, top5
+from autoPyTorch.components.metrics.standard_metrics import batched_accuracy, batched_mae, batched_rmse, batched_multilabel_accuracy
+from autoPyTorch.components.metrics.streaming_metrics import StreamingAccuracy, StreamingBalancedAccuracy, StreamingAUC, StreamingPAC, \
+    StreamingMAE, StreamingMSE, StreamingRMSE, StreamingMultilabelAccuracy
@@ -1,66 +1,125 @@
 import numpy as np
-import scipy as sp
-
-from sklearn.metrics.classification import _check_targets, type_of_target
 
 
 def balanced_accuracy(solution, prediction):
-    """balanced accuracy implementation of auto-sklearn"""
+    """balanced accuracy implementation of auto-sklearn, computed from the confusion matrix"""
+    solution, prediction, y_type = _check_targets(solution, prediction)
+
+    if y_type == 'multilabel-indicator':
+        return _multilabel_balanced_accuracy(solution, prediction[np.newaxis])[0]
+    return balanced_accuracy_from_confusion(_confusion_matrices(solution, prediction[np.newaxis])[0])
+
+
+def batched_balanced_accuracy(solution, predictions):
+    """Balanced accuracy of several predictions (e.g. one per model) at once.
+
+    Arguments:
+        solution {array} -- Class labels or multilabel indicators.
+        predictions {array} -- The predictions, with an additional leading axis.
+
+    Returns:
+        array -- The balanced accuracy of each prediction.
+    """
+    predictions = np.asarray(predictions)
+    solution, _, y_type = _check_targets(solution, predictions[0])
+    predictions = predictions.reshape((predictions.shape[0], ) + solution.shape)
 
-    y_type, solution, prediction = _check_targets(solution, prediction)
+    if y_type == 'multilabel-indicator':
+        return _multilabel_balanced_accuracy(solution, predictions)
+    return np.array([balanced_accuracy_from_confusion(confusion) for confusion in _confusion_matrices(solution, predictions)])
 
-    if y_type not in ["binary", "multiclass", 'multilabel-indicator']:
-        raise ValueError("{0} is not supported".format(y_type))
 
-    if y_type == 'binary':
-        # Do not transform into any multiclass representation
-        max_value = max(np.max(solution), np.max(prediction))
-        min_value = min(np.min(solution), np.min(prediction))
-        if max_value == min_value:
+def balanced_accuracy_from_confusion(confusion):
+    """Compute the balanced accuracy from a confusion matrix.
+
+    Arguments:
+        confusion {array} -- confusion[i, j] is the number of samples of class i predicted as class j.
+
+    Returns:
+        float -- The balanced accuracy. Two classes are a binary problem, otherwise the true positive rate
+                 is averaged over all classes up to the largest label.
+    """
+    confusion = confusion.astype(float)
+    eps = 1e-15
+    values = np.where((confusion.sum(axis=0) + confusion.sum(axis=1)) > 0)[0]
+
+    if len(values) <= 2:
+        # binary: the larger value is the positive class
+        if len(values) < 2:
             return 1.0
-        solution = (solution - min_value) / (max_value - min_value)
-        prediction = (prediction - min_value) / (max_value - min_value)
-
-    elif y_type == 'multiclass':
-        # Need to create a multiclass solution and a multiclass predictions
-        max_class = int(np.max((np.max(solution), np.max(prediction))))
-        solution_binary = np.zeros((len(solution), max_class + 1))
-        prediction_binary = np.zeros((len(prediction), max_class + 1))
-        for i in range(len(solution)):
-            solution_binary[i, int(solution[i])] = 1
-            prediction_binary[i, int(prediction[i])] = 1
-        solution = solution_binary
-        prediction = prediction_binary
-
-    elif y_type == 'multilabel-indicator':
-        solution = solution.toarray()
-        prediction = prediction.toarray()
-    else:
-        raise NotImplementedError('bac_metric does not support task type %s'
-                                  % y_type)
-
-    fn = np.sum(np.multiply(solution, (1 - prediction)), axis=0,
-                dtype=float)
-    tp = np.sum(np.multiply(solution, prediction), axis=0, dtype=float)
-    # Bounding to avoid division by 0
+        neg, pos = values
+        tp, fn = confusion[pos, pos], confusion[pos, neg]
+        tn, fp = confusion[neg, neg], confusion[neg, pos]
+        tp = np.maximum(eps, tp)
+        tpr = tp / np.maximum(eps, tp + fn)
+        tn = np.maximum(eps, tn)
+        tnr = tn / np.maximum(eps, tn + fp)
+        return np.mean(0.5 * (tpr + tnr))
+
+    # multiclass: average true positive rate over all classes up to the largest label
+    num_classes = values[-1] + 1
+    confusion = confusion[:num_classes, :num_classes]
+    tp = np.diag(confusion)
+    fn = confusion.sum(axis=1) - tp
+    tp = np.maximum(eps, tp)
+    return np.mean(tp / np.maximum(eps, tp + fn))
+
+
+def _confusion_matrices(solution, predictions):
+    """One confusion matrix per prediction, all counted with a single bincount"""
+    solution = solution.astype(np.int64)
+    predictions = predictions.astype(np.int64)
+    minimum = min(np.min(solution), np.min(predictions))
+    if minimum < 0:
+        # the binary case only depends on the order of the labels
+        solution = solution - minimum
+        predictions = predictions - minimum
+    n = int(max(np.max(solution), np.max(predictions))) + 1
+
+    offsets = np.arange(predictions.shape[0]).reshape((-1, 1)) * (n * n)
+    counts = np.bincount((offsets + solution * n + predictions).ravel(), minlength=predictions.shape[0] * n * n)
+    confusion = counts.reshape((predictions.shape[0], n, n))
+    if minimum < 0 and np.any(np.count_nonzero(confusion.sum(axis=1) + confusion.sum(axis=2), axis=1) > 2):
+        raise ValueError("Negative class labels are only supported for binary problems")
+    return confusion
+
+
+def _multilabel_balanced_accuracy(solution, predictions):
+    # each label is a binary problem, the counts are exact in float
     eps = 1e-15
-    tp = sp.maximum(eps, tp)
-    pos_num = sp.maximum(eps, tp + fn)
-    tpr = tp / pos_num  # true positive rate (sensitivity)
-
-    if y_type in ('binary', 'multilabel-indicator'):
-        tn = np.sum(np.multiply((1 - solution), (1 - prediction)),
-                    axis=0, dtype=float)
-        fp = np.sum(np.multiply((1 - solution), prediction), axis=0,
-                    dtype=float)
-        tn = sp.maximum(eps, tn)
-        neg_num = sp.maximum(eps, tn + fp)
-        tnr = tn / neg_num  # true negative rate (specificity)
-        bac = 0.5 * (tpr + tnr)
-    elif y_type == 'multiclass':
-        label_num = solution.shape[1]
-        bac = tpr
-    else:
-        raise ValueError(y_type)
-
-    return np.mean(bac)  # average over all classes
+    solution = solution.astype(float)
+    predictions = predictions.astype(float)
+    num_samples = float(solution.shape[0])
+    positive = np.sum(solution, axis=0)
+    predicted_positive = np.sum(predictions, axis=1)
+
+    tp = np.sum(solution * predictions, axis=1)
+    fn = positive - tp
+    fp = predicted_positive - tp
+    tn = num_samples - tp - fn - fp
+    tp = np.maximum(eps, tp)
+    tpr = tp / np.maximum(eps, tp + fn)
+    tn = np.maximum(eps, tn)
+    tnr = tn / np.maximum(eps, tn + fp)
+    return np.mean(0.5 * (tpr + tnr), axis=1)
+
+
+def _check_targets(solution, prediction):
+    """Determine the type of the problem like scikit-learn, without computing the unique values"""
+    solution = np.asarray(solution)
+    prediction = np.asarray(prediction)
+
+    if solution.ndim == 2 and solution.shape[1] > 1:
+        if prediction.shape != solution.shape:
+            raise ValueError("Inconsistent shapes of solution and prediction: " + str(solution.shape) + ", " + str(prediction.shape))
+        if np.any((solution != 0) & (solution != 1)) or np.any((prediction != 0) & (prediction != 1)):
+            raise ValueError("multilabel-indicator targets must only contain 0 and 1")
+        return solution, prediction, 'multilabel-indicator'
+
+    if max(solution.ndim, prediction.ndim) > 2 or solution.size != prediction.size:
+        raise ValueError("Inconsistent shapes of solution and prediction: " + str(solution.shape) + ", " + str(prediction.shape))
+    solution = solution.reshape(-1)
+    prediction = prediction.reshape(-1)
+    if any(y.dtype.kind == 'f' and np.any(y != np.floor(y)) for y in [solution, prediction]):
+        raise ValueError("continuous is not supported")
+    return solution, prediction, 'multiclass'
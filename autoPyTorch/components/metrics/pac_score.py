@@ -1,7 +1,4 @@
 import numpy as np
-import scipy as sp
-
-from sklearn.metrics.classification import _check_targets, type_of_target
 
 
 def pac_metric(solution, prediction):
@@ -11,176 +8,195 @@ def pac_metric(solution, prediction):
     Otherwise, run normalize_array.
     :param solution:
     :param prediction:
-    :param task:
     :return:
     """
+    prediction = np.asarray(prediction)
+    return batched_pac_metric(solution, prediction[np.newaxis])[0]
 
-    def normalize_array(solution, prediction):
-        """
-        Use min and max of solution as scaling factors to normalize prediction,
-        then threshold it to [0, 1].
-        Binarize solution to {0, 1}. This allows applying classification
-        scores to all cases. In principle, this should not do anything to
-        properly formatted classification inputs and outputs.
-        :param solution:
-        :param prediction:
-        :return:
-        """
-        # Binarize solution
-        sol = np.ravel(solution)  # convert to 1-d array
-        maxi = np.nanmax(sol[np.isfinite(sol)])
-        mini = np.nanmin(sol[np.isfinite(sol)])
-        if maxi == mini:
-            print('Warning, cannot normalize')
-            return [solution, prediction]
-        diff = maxi - mini
-        mid = (maxi + mini) / 2.
 
-        solution[solution >= mid] = 1
-        solution[solution < mid] = 0
-        # Normalize and threshold predictions (takes effect only if solution not
-        # in {0, 1})
+def batched_pac_metric(solution, predictions):
+    """pac_metric of several predictions (e.g. one per model) at once.
+    The solution is prepared and its base log loss is computed only once.
 
-        prediction -= float(mini)
-        prediction /= float(diff)
+    Arguments:
+        solution {array} -- Class labels, one hot encoded labels or multilabel indicators.
+        predictions {array} -- The predicted probabilities, with an additional leading axis.
 
-        # and if predictions exceed the bounds [0, 1]
-        prediction[prediction > 1] = 1
-        prediction[prediction < 0] = 0
-        # Make probabilities smoother
-        # new_prediction = np.power(new_prediction, (1./10))
-
-        return [solution, prediction]
-
-    def log_loss(solution, prediction, task):
-        """Log loss for binary and multiclass."""
-        [sample_num, label_num] = solution.shape
-        # Lower gives problems with float32!
-        eps = 0.00000003
-
-        if (task == 'multiclass') and (label_num > 1):
-            # Make sure the lines add up to one for multi-class classification
-            norma = np.sum(prediction, axis=1)
-            for k in range(sample_num):
-                prediction[k, :] /= sp.maximum(norma[k], eps)
-
-            sample_num = solution.shape[0]
-            for i in range(sample_num):
-                j = np.argmax(solution[i, :])
-                solution[i, :] = 0
-                solution[i, j] = 1
-
-            solution = solution.astype(np.int32, copy=False)
-            # For the base prediction, this solution is ridiculous in the
-            # multi-label case
-
-            # Bounding of predictions to avoid log(0),1/0,...
-        prediction = sp.minimum(1 - eps, sp.maximum(eps, prediction))
-        # Compute the log loss
-        pos_class_log_loss = -np.mean(solution * np.log(prediction), axis=0)
-        if (task != 'multiclass') or (label_num == 1):
-            # The multi-label case is a bunch of binary problems.
-            # The second class is the negative class for each column.
-            neg_class_log_loss = -np.mean(
-                (1 - solution) * np.log(1 - prediction), axis=0)
-            log_loss = pos_class_log_loss + neg_class_log_loss
-            # Each column is an independent problem, so we average.
-            # The probabilities in one line do not add up to one.
-            # log_loss = mvmean(log_loss)
-            # print('binary {}'.format(log_loss))
-            # In the multilabel case, the right thing i to AVERAGE not sum
-            # We return all the scores so we can normalize correctly later on
-        else:
-            # For the multiclass case the probabilities in one line add up one.
-            log_loss = pos_class_log_loss
-            # We sum the contributions of the columns.
-            log_loss = np.sum(log_loss)
-            # print('multiclass {}'.format(log_loss))
-        return log_loss
-
-    def prior_log_loss(frac_pos, task):
-        """Baseline log loss.
-        For multiplr classes ot labels return the volues for each column
-        """
-        eps = 1e-15
-        frac_pos_ = sp.maximum(eps, frac_pos)
-        if task != 'multiclass':  # binary case
-            frac_neg = 1 - frac_pos
-            frac_neg_ = sp.maximum(eps, frac_neg)
-            pos_class_log_loss_ = -frac_pos * np.log(frac_pos_)
-            neg_class_log_loss_ = -frac_neg * np.log(frac_neg_)
-            base_log_loss = pos_class_log_loss_ + neg_class_log_loss_
-            # base_log_loss = mvmean(base_log_loss)
-            # print('binary {}'.format(base_log_loss))
-            # In the multilabel case, the right thing i to AVERAGE not sum
-            # We return all the scores so we can normalize correctly later on
-        else:  # multiclass case
-            fp = frac_pos_ / sum(
-                frac_pos_
-            )  # Need to renormalize the lines in multiclass case
-            # Only ONE label is 1 in the multiclass case active for each line
-            pos_class_log_loss_ = -frac_pos * np.log(fp)
-            base_log_loss = np.sum(pos_class_log_loss_)
-        return base_log_loss
-
-    y_type = type_of_target(solution)
-
-    if y_type == 'binary':
-        if len(solution.shape) == 1:
-            solution = solution.reshape((-1, 1))
-        if len(prediction.shape) == 1:
-            prediction = prediction.reshape((-1, 1))
-        if len(prediction.shape) == 2:
-            if prediction.shape[1] > 2:
+    Returns:
+        array -- The pac_metric of each prediction.
+    """
+    solution = np.asarray(solution)
+    predictions = np.asarray(predictions)
+    task = _type_of_target(solution)
+
+    if task == 'binary':
+        solution = np.array(solution, dtype=float).reshape((-1, 1))
+        if predictions.ndim == 2:
+            predictions = predictions.reshape(predictions.shape + (1, ))
+        elif predictions.ndim == 3:
+            if predictions.shape[2] != 2:
                 raise ValueError('A prediction array with probability values '
                                  'for %d classes is not a binary '
-                                 'classification problem' % prediction.shape[1])
-            # Prediction will be copied into a new binary array - no copy
-            prediction = prediction[:, 1].reshape((-1, 1))
-        else:
-            raise ValueError('Invalid prediction shape %s' % prediction.shape)
-
-    elif y_type == 'multiclass':
-        if len(solution.shape) == 2:
-            if solution.shape[1] > 1:
-                raise ValueError('Solution array must only contain one class '
-                                 'label, but contains %d' % solution.shape[1])
-        elif len(solution.shape) == 1:
-            pass
+                                 'classification problem' % predictions.shape[2])
+            predictions = predictions[:, :, 1:2]
         else:
-            raise ValueError('Solution.shape %s' % solution.shape)
+            raise ValueError('Invalid prediction shape %s' % (predictions.shape[1:], ))
 
+    elif task == 'multiclass':
         # Need to create a multiclass solution and a multiclass predictions
-        max_class = int(np.max((np.max(solution), np.max(prediction))))
-        solution_binary = np.zeros((len(solution), max_class + 1))
-        for i in range(len(solution)):
-            solution_binary[i, int(solution[i])] = 1
-        solution = solution_binary
+        labels = solution.reshape(-1).astype(np.int64)
+        max_class = int(np.max((np.max(solution), np.max(predictions))))
+        solution = np.zeros((len(labels), max_class + 1))
+        solution[np.arange(len(labels)), labels] = 1
 
-    elif y_type == 'multilabel-indicator':
+    elif task == 'multilabel-indicator':
         solution = solution.copy()
 
     else:
         raise NotImplementedError('pac_score does not support task type %s'
-                                  % y_type)
+                                  % task)
 
-    solution, prediction = normalize_array(solution, prediction.copy())
-
-    sample_num, _ = solution.shape
+    is_binary = np.all((solution == 0) | (solution == 1))
+    solution, mini, diff = _normalize_solution(solution, is_binary)
+    sample_num, label_num = solution.shape
 
     eps = 1e-7
     # Compute the base log loss (using the prior probabilities)
     pos_num = 1. * np.sum(solution, axis=0, dtype=float)  # float conversion!
     frac_pos = pos_num / sample_num  # prior proba of positive class
-    the_base_log_loss = prior_log_loss(frac_pos, y_type)
-    the_log_loss = log_loss(solution, prediction, y_type)
-
-    # Exponentiate to turn into an accuracy-like score.
-    # In the multi-label case, we need to average AFTER taking the exp
-    # because it is an NL operation
-    pac = np.mean(np.exp(the_log_loss * -1))
+    the_base_log_loss = _prior_log_loss(frac_pos, task)
     base_pac = np.mean(np.exp(the_base_log_loss * -1))
-    # Normalize: 0 for random, 1 for perfect
-    score = (pac - base_pac) / sp.maximum(eps, (1 - base_pac))
 
-    return score
\ No newline at end of file
+    if task == 'multiclass' and label_num > 1:
+        # Only ONE label is 1 in the multiclass case active for each line
+        labels = np.argmax(solution, axis=1)
+    is_binary = is_binary or mini is not None
+
+    scores = np.zeros(predictions.shape[0])
+    for i, prediction in enumerate(predictions):
+        if task == 'multiclass' and label_num > 1:
+            the_log_loss = _multiclass_log_loss(labels, _normalize_prediction(prediction, mini, diff))
+        else:
+            # the log loss bounds the predictions to [eps, 1 - eps] anyway
+            the_log_loss = _binary_log_loss(solution, _normalize_prediction(prediction, mini, diff, threshold=False), is_binary)
+
+        # Exponentiate to turn into an accuracy-like score.
+        # In the multi-label case, we need to average AFTER taking the exp
+        # because it is an NL operation
+        pac = np.mean(np.exp(the_log_loss * -1))
+        # Normalize: 0 for random, 1 for perfect
+        scores[i] = (pac - base_pac) / np.maximum(eps, (1 - base_pac))
+    return scores
+
+
+def _normalize_solution(solution, is_binary):
+    """
+    Use min and max of solution as scaling factors to normalize prediction,
+    Binarize solution to {0, 1}. This allows applying classification
+    scores to all cases. In principle, this should not do anything to
+    properly formatted classification inputs and outputs.
+    Returns the solution and the scaling factors for the predictions.
+    """
+    if is_binary:
+        # already binarized, only the scaling factors are needed
+        maxi, mini = np.max(solution), np.min(solution)
+    else:
+        sol = np.ravel(solution)  # convert to 1-d array
+        maxi = np.nanmax(sol[np.isfinite(sol)])
+        mini = np.nanmin(sol[np.isfinite(sol)])
+    if maxi == mini:
+        print('Warning, cannot normalize')
+        return solution, None, None
+    diff = maxi - mini
+
+    if not is_binary:
+        mid = (maxi + mini) / 2.
+        solution[solution >= mid] = 1
+        solution[solution < mid] = 0
+    return solution, mini, diff
+
+
+def _normalize_prediction(prediction, mini, diff, threshold=True):
+    """Normalize and threshold predictions (takes effect only if solution not in {0, 1})"""
+    if mini is None:
+        return prediction
+    if mini != 0 or diff != 1:
+        prediction = prediction - float(mini)
+        prediction /= float(diff)
+
+    # and if predictions exceed the bounds [0, 1]
+    return np.clip(prediction, 0, 1) if threshold else prediction
+
+
+def _multiclass_log_loss(labels, prediction):
+    """Log loss for multiclass, only the predicted probabilities of the true classes are needed"""
+    # Lower gives problems with float32!
+    eps = 0.00000003
+    sample_num = len(labels)
+    rows = np.arange(sample_num)
+
+    # Make sure the lines add up to one for multi-class classification
+    norma = np.sum(prediction, axis=1)
+    p = prediction[rows, labels] / np.maximum(norma, eps)
+
+    # Bounding of predictions to avoid log(0),1/0,...
+    p = np.minimum(1 - eps, np.maximum(eps, p))
+    log_p = np.zeros(prediction.shape)
+    log_p[rows, labels] = np.log(p)
+
+    # For the multiclass case the probabilities in one line add up one.
+    # We sum the contributions of the columns.
+    pos_class_log_loss = -np.mean(log_p, axis=0)
+    return np.sum(pos_class_log_loss)
+
+
+def _binary_log_loss(solution, prediction, is_binary):
+    """Log loss for binary and multilabel. Each column is an independent problem"""
+    # Lower gives problems with float32!
+    eps = 0.00000003
+
+    # Bounding of predictions to avoid log(0),1/0,...
+    prediction = np.clip(prediction, eps, 1 - eps)
+    if not is_binary:
+        pos_class_log_loss = -np.mean(solution * np.log(prediction), axis=0)
+        neg_class_log_loss = -np.mean((1 - solution) * np.log(1 - prediction), axis=0)
+        return pos_class_log_loss + neg_class_log_loss
+
+    # one logarithm per entry: of the prediction for positives, of its complement for negatives
+    log_p = np.log(np.where(solution == 1, prediction, 1 - prediction))
+    pos_class_log_loss = -np.mean(solution * log_p, axis=0)
+    # The second class is the negative class for each column.
+    neg_class_log_loss = -np.mean((1 - solution) * log_p, axis=0)
+    return pos_class_log_loss + neg_class_log_loss
+
+
+def _prior_log_loss(frac_pos, task):
+    """Baseline log loss.
+    For multiplr classes ot labels return the volues for each column
+    """
+    eps = 1e-15
+    frac_pos_ = np.maximum(eps, frac_pos)
+    if task != 'multiclass':  # binary case
+        frac_neg = 1 - frac_pos
+        frac_neg_ = np.maximum(eps, frac_neg)
+        pos_class_log_loss_ = -frac_pos * np.log(frac_pos_)
+        neg_class_log_loss_ = -frac_neg * np.log(frac_neg_)
+        base_log_loss = pos_class_log_loss_ + neg_class_log_loss_
+    else:  # multiclass case
+        fp = frac_pos_ / sum(
+            frac_pos_
+        )  # Need to renormalize the lines in multiclass case
+        # Only ONE label is 1 in the multiclass case active for each line
+        pos_class_log_loss_ = -frac_pos * np.log(fp)
+        base_log_loss = np.sum(pos_class_log_loss_)
+    return base_log_loss
+
+
+def _type_of_target(solution):
+    """Type of the solution like scikit-learn's type_of_target, without computing the unique values"""
+    if solution.ndim > 2 or (solution.dtype.kind == 'f' and np.any(solution != np.floor(solution))):
+        return 'continuous'
+    two_values = solution.size == 0 or np.all((solution == np.min(solution)) | (solution == np.max(solution)))
+    if solution.ndim == 2 and solution.shape[1] > 1:
+        return 'multilabel-indicator' if two_values else 'multiclass-multioutput'
+    return 'binary' if two_values else 'multiclass'
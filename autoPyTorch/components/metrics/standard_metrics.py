@@ -49,3 +49,20 @@ def mae(y_true, y_pred):
 
 def rmse(y_true, y_pred):
     return np.sqrt(np.mean((y_true - y_pred)**2))
+
+
+# batched metrics: y_pred has an additional leading axis (e.g. one entry per model), one value per entry is returned
+def batched_accuracy(y_true, y_pred):
+    return _batch_mean(y_true == y_pred) * 100
+
+def batched_multilabel_accuracy(y_true, y_pred):
+    return _batch_mean(y_true == (y_pred > 0.5))
+
+def batched_mae(y_true, y_pred):
+    return _batch_mean(np.abs(y_true - y_pred))
+
+def batched_rmse(y_true, y_pred):
+    return np.sqrt(_batch_mean((y_true - y_pred)**2))
+
+def _batch_mean(values):
+    return np.mean(values.reshape(values.shape[0], -1), axis=1)
@@ -0,0 +1,294 @@
+import numpy as np
+import torch
+from autoPyTorch.components.metrics.balanced_accuracy import balanced_accuracy_from_confusion
+from autoPyTorch.components.metrics.standard_metrics import auc_metric
+
+
+class StreamingMetric():
+    """Compute a metric incrementally, batch by batch, in constant memory.
+
+    update() adds a batch, merge() combines accumulators of different parts of the data (e.g. cv splits or processes)
+    and compute() returns the value the batch version of the metric returns on all data seen so far.
+    Metrics that are approximated in constant memory (e.g. AUC) are computed exactly with exact=True instead,
+    which takes memory linear in the number of samples.
+    Batches may be numpy arrays or torch tensors. Tensors are reduced with torch on their device,
+    only the accumulated state is copied to the host in compute().
+    """
+
+    def __init__(self, exact=False):
+        self.exact = exact
+        self.state = dict()
+
+    # VIRTUAL
+    def update(self, y_true, y_pred):
+        """Add a batch.
+
+        Arguments:
+            y_true {array / tensor} -- The true targets of the batch.
+            y_pred {array / tensor} -- The predictions for the batch.
+        """
+        raise NotImplementedError()
+
+    # VIRTUAL
+    def compute(self):
+        """Compute the metric.
+
+        Returns:
+            float -- The value of the metric.
+        """
+        raise NotImplementedError()
+
+    def merge(self, other):
+        """Add the state of another accumulator of the same metric.
+
+        Arguments:
+            other {StreamingMetric} -- The other accumulator.
+
+        Returns:
+            StreamingMetric -- self
+        """
+        for key, value in other.state.items():
+            self.state[key] = _add(self.state.get(key, None), value)
+        return self
+
+    def accumulate(self, key, value):
+        self.state[key] = _add(self.state.get(key, None), value)
+
+
+class StreamingMean(StreamingMetric):
+    """Mean of an elementwise function of targets and predictions"""
+
+    def update(self, y_true, y_pred):
+        values = self.elementwise(_as_tensor(y_true), _as_tensor(y_pred))
+        self.accumulate("sum", torch.sum(values, dtype=torch.float64))
+        self.accumulate("count", values.numel())
+
+    def compute(self):
+        return self.transform(_to_numpy(self.state["sum"]) / self.state["count"])
+
+    # VIRTUAL
+    def elementwise(self, y_true, y_pred):
+        raise NotImplementedError()
+
+    # VIRTUAL
+    def transform(self, mean):
+        return mean
+
+
+class StreamingAccuracy(StreamingMean):
+    def elementwise(self, y_true, y_pred):
+        return y_true == y_pred
+
+    def transform(self, mean):
+        return mean * 100
+
+
+class StreamingMultilabelAccuracy(StreamingMean):
+    def elementwise(self, y_true, y_pred):
+        return y_true == (y_pred > 0.5)
+
+
+class StreamingMAE(StreamingMean):
+    def elementwise(self, y_true, y_pred):
+        return torch.abs(y_true - y_pred)
+
+
+class StreamingMSE(StreamingMean):
+    def elementwise(self, y_true, y_pred):
+        return (y_true - y_pred) ** 2
+
+
+class StreamingRMSE(StreamingMSE):
+    def transform(self, mean):
+        return np.sqrt(mean)
+
+
+class StreamingBalancedAccuracy(StreamingMetric):
+    """Balanced accuracy of class labels, computed from the confusion matrix"""
+
+    def update(self, y_true, y_pred):
+        y_true = _as_tensor(y_true).reshape(-1).long()
+        y_pred = _as_tensor(y_pred).reshape(-1).long()
+        if y_true.numel() == 0:
+            return
+
+        # the size of the confusion matrix is the only value of the batch that is read on the host
+        labels = torch.cat([y_true, y_pred])
+        low, high = torch.stack([torch.min(labels), torch.max(labels)]).tolist()
+        if low < 0:
+            raise ValueError("Streaming balanced accuracy requires non-negative class labels")
+        n = high + 1
+        confusion = torch.zeros(n * n, dtype=torch.int64, device=y_true.device)
+        confusion.scatter_add_(0, y_true * n + y_pred, torch.ones_like(y_true))
+        self.accumulate("confusion", confusion.reshape(n, n))
+
+    def compute(self):
+        return balanced_accuracy_from_confusion(_to_numpy(self.state["confusion"]))
+
+
+class StreamingAUC(StreamingMetric):
+    """Approximation of auc_metric (2 * macro averaged ROC AUC - 1) in constant memory.
+    The scores of positive and negative samples are collected in per class histograms with num_bins bins over the logit
+    of the score, so saturated probabilities close to 0 or 1 still fall into different bins. A positive and a negative
+    sample in the same bin count as half a win, which changes auc_metric by at most the fraction of positive-negative
+    pairs sharing a bin. With exact=True the scores of all samples are kept instead and auc_metric is computed on them.
+    """
+
+    max_logit = 20
+
+    def __init__(self, exact=False, num_bins=10000):
+        super(StreamingAUC, self).__init__(exact=exact)
+        self.num_bins = num_bins
+
+    def update(self, y_true, y_pred):
+        if self.exact:
+            self.state.setdefault("y_true", []).append(_as_tensor(y_true).clone())
+            self.state.setdefault("y_pred", []).append(_as_tensor(y_pred).clone())
+            return
+
+        y_true = _to_columns(_as_tensor(y_true))
+        y_pred = _to_columns(_as_tensor(y_pred))
+        if y_pred.shape[1] == 2 and y_true.shape[1] == 1:
+            y_pred = y_pred[:, 1:]
+        bins = self.to_bins(y_pred)
+        positive = (y_true > 0.5).expand_as(bins).long()
+
+        columns = (torch.arange(bins.shape[1], device=bins.device) * self.num_bins + bins).reshape(-1)
+        hist_pos = torch.zeros(bins.shape[1] * self.num_bins, dtype=torch.int64, device=bins.device)
+        hist_pos.scatter_add_(0, columns, positive.reshape(-1))
+        hist_neg = torch.zeros_like(hist_pos).scatter_add_(0, columns, 1 - positive.reshape(-1))
+        self.accumulate("positive", hist_pos.reshape(bins.shape[1], self.num_bins))
+        self.accumulate("negative", hist_neg.reshape(bins.shape[1], self.num_bins))
+
+    def to_bins(self, y_pred):
+        """Map scores in [0, 1] to their histogram bins, equally spaced in logit space.
+
+        Arguments:
+            y_pred {array / tensor} -- The scores.
+
+        Returns:
+            tensor -- The bin of each score, on the device of the scores.
+        """
+        p = torch.clamp(_as_tensor(y_pred).double(), 1 / (1 + np.exp(self.max_logit)), 1 / (1 + np.exp(-self.max_logit)))
+        logit = torch.log(p) - torch.log1p(-p)
+        bins = torch.floor((logit + self.max_logit) / (2 * self.max_logit) * self.num_bins).long()
+        return torch.clamp(bins, 0, self.num_bins - 1)
+
+    def merge(self, other):
+        if not self.exact:
+            return super(StreamingAUC, self).merge(other)
+        for key, value in other.state.items():
+            self.state.setdefault(key, []).extend(value)
+        return self
+
+    def compute(self):
+        if self.exact:
+            return auc_metric(_to_numpy(torch.cat(self.state["y_true"])), _to_numpy(torch.cat(self.state["y_pred"])))
+
+        pos = _to_numpy(self.state["positive"]).astype(float)
+        neg = _to_numpy(self.state["negative"]).astype(float)
+        num_pos = pos.sum(axis=1)
+        num_neg = neg.sum(axis=1)
+
+        # probability that a positive sample is scored higher than a negative one, ties count half
+        neg_below = np.cumsum(neg, axis=1) - neg
+        auc = (np.sum(pos * neg_below, axis=1) + 0.5 * np.sum(pos * neg, axis=1))
+        valid = (num_pos > 0) & (num_neg > 0)
+        if not np.any(valid):
+            return float("nan")
+        auc = auc[valid] / (num_pos[valid] * num_neg[valid])
+        return 2 * np.mean(auc) - 1
+
+
+class StreamingPAC(StreamingMetric):
+    """pac_metric for 0/1 targets (one-hot encoded, multilabel or binary) or class labels"""
+
+    log_loss_eps = 0.00000003
+    prior_eps = 1e-15
+
+    def update(self, y_true, y_pred):
+        y_true = _as_tensor(y_true)
+        y_pred = _to_columns(_as_tensor(y_pred)).double()
+
+        if y_true.dim() == 2 and y_true.shape[1] > 1:
+            # one hot encoded or multilabel: each column is a binary problem
+            self._update_binary(_to_columns(y_true).double(), y_pred)
+            return
+
+        labels = y_true.reshape(-1).long()
+        self.accumulate("label_counts", torch.bincount(labels))
+        if y_pred.shape[1] <= 2:
+            self._update_binary(labels.reshape((-1, 1)).double(), y_pred[:, -1:])
+
+        # multiclass: normalize the rows and take the predicted probability of the true class
+        rows = torch.clamp(y_pred, 0, 1)
+        rows = rows / torch.clamp(torch.sum(rows, dim=1, keepdim=True), min=self.log_loss_eps)
+        p = rows[torch.arange(len(labels), device=rows.device), torch.clamp(labels, max=rows.shape[1] - 1)]
+        p = torch.where(labels >= rows.shape[1], torch.zeros_like(p), p)
+        p = torch.clamp(p, self.log_loss_eps, 1 - self.log_loss_eps)
+        self.accumulate("multiclass_log_sum", torch.sum(torch.log(p)))
+        self.accumulate("multiclass_count", len(labels))
+
+    def _update_binary(self, solution, prediction):
+        prediction = torch.clamp(prediction, 0, 1)
+        prediction = torch.clamp(prediction, self.log_loss_eps, 1 - self.log_loss_eps)
+        self.accumulate("count", solution.shape[0])
+        self.accumulate("positive", torch.sum(solution, dim=0))
+        self.accumulate("positive_log_sum", torch.sum(solution * torch.log(prediction), dim=0))
+        self.accumulate("negative_log_sum", torch.sum((1 - solution) * torch.log(1 - prediction), dim=0))
+
+    def compute(self):
+        state = {key: _to_numpy(value) for key, value in self.state.items()}
+        if "label_counts" in state and (np.count_nonzero(state["label_counts"]) > 2 or "count" not in state):
+            return self._compute_multiclass(state)
+        return self._compute_binary(state)
+
+    def _compute_binary(self, state):
+        n = state["count"]
+        frac_pos = state["positive"] / n
+        log_loss = -(state["positive_log_sum"] + state["negative_log_sum"]) / n
+
+        frac_neg = 1 - frac_pos
+        base_log_loss = -frac_pos * np.log(np.maximum(self.prior_eps, frac_pos)) \
+                        - frac_neg * np.log(np.maximum(self.prior_eps, frac_neg))
+        return self._score(np.mean(np.exp(-log_loss)), np.mean(np.exp(-base_log_loss)))
+
+    def _compute_multiclass(self, state):
+        n = state["multiclass_count"]
+        log_loss = -state["multiclass_log_sum"] / n
+
+        frac_pos = state["label_counts"] / n
+        frac_pos_ = np.maximum(self.prior_eps, frac_pos)
+        base_log_loss = np.sum(-frac_pos * np.log(frac_pos_ / np.sum(frac_pos_)))
+        return self._score(np.exp(-log_loss), np.exp(-base_log_loss))
+
+    def _score(self, pac, base_pac):
+        return (pac - base_pac) / np.maximum(1e-7, (1 - base_pac))
+
+
+def _as_tensor(y):
+    return y.detach() if isinstance(y, torch.Tensor) else torch.as_tensor(np.asarray(y))
+
+
+def _to_numpy(value):
+    return value.cpu().numpy() if isinstance(value, torch.Tensor) else value
+
+
+def _to_columns(y):
+    return y.reshape((-1, 1)) if y.dim() == 1 else y.reshape((y.shape[0], -1))
+
+
+def _add(a, b):
+    """Add two states. Tensors of different shape (e.g. class counts of batches with different classes) are zero padded.
+    The sum is kept on the device of a."""
+    if a is None:
+        return b.clone() if isinstance(b, torch.Tensor) else b
+    if isinstance(a, torch.Tensor) and isinstance(b, torch.Tensor):
+        b = b.to(a.device)
+        if a.shape != b.shape:
+            shape = tuple(max(i, j) for i, j in zip(a.shape, b.shape))
+            result = torch.zeros(shape, dtype=torch.promote_types(a.dtype, b.dtype), device=a.device)
+            result[tuple(slice(0, i) for i in a.shape)] += a
+            result[tuple(slice(0, i) for i in b.shape)] += b
+            return result
+    return a + b
@@ -0,0 +1,209 @@
+import numpy as np
+import torch
+from sklearn.preprocessing import StandardScaler, MinMaxScaler, MaxAbsScaler
+
+
+class ColumnImputer():
+    """Impute missing values of dense data column by column.
+
+    Gives the same result as a ColumnTransformer with a SimpleImputer for the numerical and a constant SimpleImputer for the
+    categorical columns: the numerical columns followed by the categorical columns. Numerical columns without any value in the
+    training data are dropped. The statistics are computed in one pass over the training data and the missing values are replaced in
+    place in the output array. Works on numpy arrays and torch tensors, e.g. data that is already on the GPU.
+    """
+
+    def __init__(self, strategy, categorical_features, fill_value):
+        """Initialize the imputer.
+
+        Arguments:
+            strategy {str} -- How to impute numerical columns: mean, median or most_frequent.
+            categorical_features {list} -- For each column, whether it is categorical.
+            fill_value {float} -- Value for missing values in categorical columns.
+        """
+        self.strategy = strategy
+        self.categorical_features = list(categorical_features)
+        self.fill_value = fill_value
+        self.columns = None
+        self.statistics = None
+
+    def fit(self, X, train_indices=None):
+        numerical = [i for i, c in enumerate(self.categorical_features) if not c]
+        categorical = [i for i, c in enumerate(self.categorical_features) if c]
+
+        statistics = column_statistic(select(X, train_indices, numerical), self.strategy)
+        keep = ~np.isnan(statistics)
+
+        self.columns = np.array([i for i, k in zip(numerical, keep) if k] + categorical, dtype=np.int64)
+        self.statistics = np.concatenate([statistics[keep], np.full(len(categorical), self.fill_value, dtype=np.float64)])
+        return self
+
+    def transform(self, X):
+        if isinstance(X, torch.Tensor):
+            X = X[:, torch.from_numpy(self.columns).to(X.device)]
+            X = X if X.is_floating_point() else X.double()
+            return torch.where(torch.isnan(X), torch.from_numpy(self.statistics).to(X.device, X.dtype), X)
+
+        result = np.asarray(X[:, self.columns], dtype=output_dtype(X))
+        missing = np.isnan(result)
+        if missing.any():
+            np.copyto(result, np.broadcast_to(self.statistics.astype(result.dtype), result.shape), where=missing)
+        return result
+
+    def fit_transform(self, X, train_indices=None):
+        return self.fit(X, train_indices).transform(X)
+
+
+class ColumnScaler():
+    """Normalize the numerical columns of dense data and pass the categorical columns through.
+
+    Gives the same result as a ColumnTransformer with one of the supported sklearn scalers for the numerical columns and remainder='passthrough'.
+    Works on numpy arrays and torch tensors.
+    """
+
+    # the sklearn scalers that can be replaced
+    supported_types = {StandardScaler: "standardize", MinMaxScaler: "minmax", MaxAbsScaler: "maxabs"}
+
+    def __init__(self, normalizer_type, categorical_features):
+        """Initialize the scaler.
+
+        Arguments:
+            normalizer_type {type} -- One of the supported sklearn scalers.
+            categorical_features {list} -- For each column, whether it is categorical.
+        """
+        self.method = self.supported_types[normalizer_type]
+        self.categorical_features = list(categorical_features)
+        self.columns = None
+        self.num_numerical = None
+        self.shift = None
+        self.scale = None
+
+    @staticmethod
+    def is_supported(normalizer_type):
+        return normalizer_type in ColumnScaler.supported_types
+
+    def fit(self, X, train_indices=None):
+        numerical = [i for i, c in enumerate(self.categorical_features) if not c]
+        categorical = [i for i, c in enumerate(self.categorical_features) if c]
+        self.columns = np.array(numerical + categorical, dtype=np.int64)
+        self.num_numerical = len(numerical)
+
+        X_train = select(X, train_indices, numerical)
+        if isinstance(X_train, torch.Tensor):
+            X_train = X_train.cpu().numpy()
+        X_train = np.asarray(X_train, dtype=output_dtype(X_train))
+        has_nan = np.isnan(X_train).any()
+
+        if self.method == "standardize":
+            # mean and variance like sklearn, with float64 accumulation
+            count = (~np.isnan(X_train)).sum(axis=0) if has_nan else X_train.shape[0]
+            self.shift = np.nansum(X_train, axis=0, dtype=np.float64) / count
+            deviation = X_train - self.shift
+            correction = np.nansum(deviation, axis=0, dtype=np.float64)
+            variance = (np.nansum(deviation ** 2, axis=0, dtype=np.float64) - correction ** 2 / count) / count
+            eps = np.finfo(np.float64).eps
+            constant = variance <= count * eps * variance + (count * self.shift * eps) ** 2
+            self.scale = np.where(constant, 1.0, handle_zeros_in_scale(np.sqrt(variance)))
+        elif self.method == "minmax":
+            data_min = np.nanmin(X_train, axis=0) if has_nan else np.min(X_train, axis=0)
+            data_max = np.nanmax(X_train, axis=0) if has_nan else np.max(X_train, axis=0)
+            self.scale = 1.0 / handle_zeros_in_scale(data_max - data_min)
+            self.shift = -data_min * self.scale
+        else:
+            max_abs = np.nanmax(np.abs(X_train), axis=0) if has_nan else np.max(np.abs(X_train), axis=0)
+            self.scale = handle_zeros_in_scale(max_abs)
+            self.shift = np.zeros_like(self.scale)
+        return self
+
+    def transform(self, X):
+        if isinstance(X, torch.Tensor):
+            X = X[:, torch.from_numpy(self.columns).to(X.device)]
+            X = X.clone() if X.is_floating_point() else X.double()
+            numerical = X[:, :self.num_numerical]
+            shift, scale = [torch.from_numpy(v).to(X.device, X.dtype) for v in (self.shift, self.scale)]
+        else:
+            X = np.asarray(X[:, self.columns], dtype=output_dtype(X))
+            numerical = X[:, :self.num_numerical]
+            shift, scale = self.shift.astype(X.dtype), self.scale.astype(X.dtype)
+
+        # in place on the numerical columns
+        if self.method == "standardize":
+            numerical -= shift
+            numerical /= scale
+        elif self.method == "minmax":
+            numerical *= scale
+            numerical += shift
+        else:
+            numerical /= scale
+        return X
+
+    def fit_transform(self, X, train_indices=None):
+        return self.fit(X, train_indices).transform(X)
+
+
+def column_statistic(X, strategy):
+    """Compute a statistic for each column, ignoring missing values.
+
+    Arguments:
+        X {array} -- The data, a numpy array or torch tensor.
+        strategy {str} -- mean, median or most_frequent
+
+    Returns:
+        array -- The statistic of each column as float64. NaN for columns without values.
+    """
+    if isinstance(X, torch.Tensor):
+        if strategy == "most_frequent":
+            return column_statistic(X.cpu().numpy(), strategy)
+        X = X if X.is_floating_point() else X.double()
+        missing = torch.isnan(X)
+        count = (~missing).sum(dim=0)
+        if strategy == "mean":
+            result = torch.where(missing, torch.zeros_like(X), X).sum(dim=0, dtype=torch.float64) / count
+        else:
+            # NaNs are sorted to the end, the median is the mean of the middle values
+            values = torch.sort(X, dim=0)[0]
+            lower = ((count - 1).clamp(min=0) // 2).unsqueeze(0)
+            upper = (count // 2).clamp(max=X.shape[0] - 1).unsqueeze(0)
+            result = (values.gather(0, lower) + values.gather(0, upper)).squeeze(0) / 2
+        result[count == 0] = float("nan")
+        return result.cpu().numpy()
+
+    X = np.asarray(X, dtype=output_dtype(X))
+    missing = np.isnan(X)
+    count = X.shape[0] - missing.sum(axis=0)
+    result = np.full(X.shape[1], np.nan)
+    has_values = count > 0
+    if strategy == "mean":
+        result[has_values] = np.where(missing, 0, X).sum(axis=0)[has_values] / count[has_values]
+    elif strategy == "median":
+        if has_values.any():
+            result[has_values] = np.nanmedian(X[:, has_values], axis=0) if missing.any() else np.median(X, axis=0)
+    elif strategy == "most_frequent":
+        # the smallest of the most frequent values, like scipy.stats.mode
+        for i in np.flatnonzero(has_values):
+            values, counts = np.unique(X[~missing[:, i], i], return_counts=True)
+            result[i] = values[np.argmax(counts)]
+    else:
+        raise ValueError("Unknown imputation strategy " + str(strategy))
+    return result
+
+
+def select(X, rows, columns):
+    """Get the given columns of the given rows. All rows if rows is None."""
+    if isinstance(X, torch.Tensor):
+        X = X[torch.as_tensor(rows, device=X.device)] if rows is not None else X
+        return X[:, torch.as_tensor(columns, dtype=torch.long, device=X.device)]
+    # same indexing as the ColumnTransformer on the training data, reductions over the rows depend on the memory layout
+    X = X[rows] if rows is not None else X
+    return X[:, columns]
+
+
+def output_dtype(X):
+    """Floating point data keeps its precision, like in sklearn"""
+    return X.dtype if np.issubdtype(X.dtype, np.floating) else np.float64
+
+
+def handle_zeros_in_scale(scale):
+    """Do not scale constant columns"""
+    scale = np.array(scale)
+    scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0
+    return scale
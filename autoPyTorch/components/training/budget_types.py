@@ -1,34 +1,146 @@
 from autoPyTorch.components.training.base_training import BaseTrainingTechnique
+import math
 import time
 
+class BudgetPlanner():
+    """Plan the number of full epochs that fit into a time budget.
+    The cost of a batch and of the work between the batches of two epochs (e.g. evaluation) is measured during training.
+    The clock is only read while measuring and when the estimated number of steps of an epoch is exhausted.
+    """
+    def __init__(self, end_time, num_measured_steps=5):
+        """Initialize the planner.
+
+        Arguments:
+            end_time {float} -- Point in time, when the budget is exhausted.
+
+        Keyword Arguments:
+            num_measured_steps {int} -- Number of batches that are timed in the first epoch, before the first plan is made. (default: {5})
+        """
+        self.end_time = end_time
+        self.num_measured_steps = num_measured_steps
+        self.batch_cost = None
+        self.epoch_overhead = 0
+        self.num_steps = None
+        self.planned_epochs = None
+        self.epoch_start_time = None
+        self.train_end_time = None
+        self.step_limit = None
+
+    def start_epoch(self):
+        self.epoch_start_time = time.time()
+        self.train_end_time = None
+        self.step_limit = None
+        if self.batch_cost is not None:
+            self.step_limit = self.fitting_steps(self.epoch_start_time)
+
+    def end_batch(self, epoch, step, num_steps):
+        """Check if the current epoch has to be cut to stay within the budget.
+
+        Arguments:
+            epoch {int} -- The current epoch, starting at 1.
+            step {int} -- The current step of the epoch.
+            num_steps {int} -- The number of steps of an epoch.
+
+        Returns:
+            bool -- Whether the budget does not allow another step.
+        """
+        self.num_steps = num_steps
+        steps = step + 1
+        if self.step_limit is None:
+            # measure the cost of the first batches
+            now = time.time()
+            if now >= self.end_time:
+                return True
+            if steps < min(self.num_measured_steps, num_steps):
+                return False
+            self.measure_batches(now, steps)
+            self.plan(epoch - 1 + steps / num_steps, now)
+
+        if steps == num_steps:
+            self.train_end_time = time.time()
+            return self.train_end_time >= self.end_time
+        if steps < self.step_limit:
+            return False
+
+        # the estimate is exhausted, check the clock
+        self.measure_batches(time.time(), steps)
+        return steps >= self.step_limit
+
+    def end_epoch(self, epoch):
+        """Plan the epochs after the current epoch has been evaluated.
+
+        Arguments:
+            epoch {int} -- The current epoch, starting at 0.
+
+        Returns:
+            bool -- Whether the budget does not allow another full epoch.
+        """
+        now = time.time()
+        if self.train_end_time is not None:
+            self.batch_cost = (self.train_end_time - self.epoch_start_time) / self.num_steps
+            self.epoch_overhead = now - self.train_end_time
+        self.plan(epoch + 1, now)
+        return now >= self.end_time or self.planned_epochs <= epoch + 1
+
+    def measure_batches(self, now, steps):
+        self.batch_cost = max(1e-9, (now - self.epoch_start_time) / steps)
+        self.step_limit = steps + self.fitting_steps(now)
+
+    def fitting_steps(self, now):
+        return max(0, int((self.end_time - now - self.epoch_overhead) / self.batch_cost))
+
+    def plan(self, num_epochs, now):
+        """Plan the total number of epochs, given the (fractional) number of epochs trained until now"""
+        epoch_cost = self.batch_cost * self.num_steps + self.epoch_overhead
+        self.planned_epochs = max(int(math.ceil(num_epochs)), int(num_epochs + max(0, self.end_time - now) / epoch_cost))
+        return self.planned_epochs
+
+
 class BudgetTypeTime(BaseTrainingTechnique):
     default_min_budget = 120
     default_max_budget = 6000
-    compensate = 10 # will be modified by cv
+
+    def __init__(self, compensate=10):
+        """Initialize the budget type.
+
+        Keyword Arguments:
+            compensate {float} -- Time in seconds reserved for the work after training, e.g. the final evaluation. (default: {10})
+        """
+        super(BudgetTypeTime, self).__init__()
+        self.compensate = compensate
 
     # OVERRIDE
     def set_up(self, trainer, pipeline_config, **kwargs):
         super(BudgetTypeTime, self).set_up(trainer, pipeline_config)
         self.end_time = trainer.budget - self.compensate + trainer.fit_start_time
         self.start_time = time.time()
+        self.planner = BudgetPlanner(self.end_time)
         
         if self.start_time >= self.end_time:
             raise Exception("Budget exhausted before training started")
+
+    # OVERRIDE
+    def on_epoch_start(self, trainer, **kwargs):
+        self.planner.start_epoch()
     
     # OVERRIDE
-    def on_batch_end(self, **kwargs):
-        return time.time() >= self.end_time
+    def on_batch_end(self, trainer, epoch, step, num_steps, **kwargs):
+        stop = self.planner.end_batch(epoch, step, num_steps)
+        trainer.planned_epochs = self.planner.planned_epochs
+        return stop
     
     # OVERRIDE
-    def on_epoch_end(self, trainer, **kwargs):
+    def on_epoch_end(self, trainer, epoch, **kwargs):
+        stop = self.planner.end_epoch(epoch)
+        trainer.planned_epochs = self.planner.planned_epochs
         elapsed = time.time() - trainer.fit_start_time
         trainer.model.budget_trained = elapsed
-        trainer.logger.debug("Budget used: " + str(elapsed) + "/" + str(trainer.budget - self.compensate))
+        trainer.logger.debug("Budget used: " + str(elapsed) + "/" + str(trainer.budget - self.compensate) +
+                             ". Planned epochs: " + str(self.planner.planned_epochs))
 
-        if time.time() >= self.end_time:
+        if stop:
             trainer.logger.debug("Budget exhausted!")
-            return True
-        return False
+        return stop
 
 class BudgetTypeEpochs(BaseTrainingTechnique):
     default_min_budget = 5
@@ -38,6 +150,7 @@ class BudgetTypeEpochs(BaseTrainingTechnique):
     def set_up(self, trainer, pipeline_config, **kwargs):
         super(BudgetTypeEpochs, self).set_up(trainer, pipeline_config)
         self.target = trainer.budget
+        trainer.planned_epochs = int(math.ceil(self.target)) + 1
     
     # OVERRIDE
     def on_epoch_end(self, trainer, epoch, **kwargs):
@@ -58,22 +171,31 @@ class BudgetTypeTrainingTime(BaseTrainingTechnique):
         super(BudgetTypeTrainingTime, self).set_up(trainer, pipeline_config)
         self.end_time = trainer.budget + time.time()
         self.start_time = time.time()
+        self.planner = BudgetPlanner(self.end_time)
 
         if self.start_time >= self.end_time:
             raise Exception("Budget exhausted before training started")
 
     # OVERRIDE
-    def on_batch_end(self, **kwargs):
-        return time.time() >= self.end_time
+    def on_epoch_start(self, trainer, **kwargs):
+        self.planner.start_epoch()
+
+    # OVERRIDE
+    def on_batch_end(self, trainer, epoch, step, num_steps, **kwargs):
+        stop = self.planner.end_batch(epoch, step, num_steps)
+        trainer.planned_epochs = self.planner.planned_epochs
+        return stop
 
     # OVERRIDE
-    def on_epoch_end(self, trainer, **kwargs):
+    def on_epoch_end(self, trainer, epoch, **kwargs):
+        stop = self.planner.end_epoch(epoch)
+        trainer.planned_epochs = self.planner.planned_epochs
         elapsed = time.time() - self.start_time
         trainer.model.budget_trained = elapsed
         trainer.logger.debug("Budget used: " + str(elapsed) +
-                             "/" + str(self.end_time - self.start_time))
+                             "/" + str(self.end_time - self.start_time) +
+                             ". Planned epochs: " + str(self.planner.planned_epochs))
 
-        if time.time() >= self.end_time:
+        if stop:
             trainer.logger.debug("Budget exhausted!")
-            return True
-        return False
+        return stop
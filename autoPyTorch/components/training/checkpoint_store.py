@@ -0,0 +1,156 @@
+import os
+import uuid
+import copy
+import torch
+
+from autoPyTorch.pipeline.base.node_cache import fingerprint
+
+
+class CheckpointStore():
+    """Store the training state of a hyperparameter config at the end of a budget.
+    When the optimization algorithm evaluates the config on a higher budget, training is resumed from the stored state.
+    """
+
+    # attributes of the network that describe the progress of training
+    model_attributes = ["epochs_trained", "budget_trained", "logs", "num_epochs_no_progress", "current_best_epoch_performance", "best_parameters"]
+
+    def __init__(self, directory):
+        """Initialize the store.
+
+        Arguments:
+            directory {str} -- Where to store the checkpoints. Should be accessible from all workers.
+        """
+        self.directory = directory
+
+    @staticmethod
+    def get_directory(pipeline_config):
+        """Get the directory of the checkpoints of an optimization run.
+
+        Arguments:
+            pipeline_config {dict} -- The configuration of the pipeline.
+
+        Returns:
+            str -- The directory
+        """
+        return os.path.join(pipeline_config["result_logger_dir"], "checkpoints")
+
+    def get_path(self, hyperparameter_config_id, train_indices):
+        """Get the file of a checkpoint.
+
+        Arguments:
+            hyperparameter_config_id {tuple} -- The id of the config, assigned by BOHB.
+            train_indices {array} -- The indices of the training data. Each cv split has its own checkpoint.
+
+        Returns:
+            str -- The file
+        """
+        name = "_".join(map(str, hyperparameter_config_id)) + "_" + fingerprint(train_indices)[:16] + ".torch"
+        return os.path.join(self.directory, name)
+
+    def save(self, hyperparameter_config_id, train_indices, trainer, budget, next_epoch):
+        """Save the state of the training.
+
+        Arguments:
+            hyperparameter_config_id {tuple} -- The id of the config, assigned by BOHB.
+            train_indices {array} -- The indices of the training data.
+            trainer {Trainer} -- The trainer used for training.
+            budget {float} -- The budget that has been trained.
+            next_epoch {int} -- The epoch to continue with.
+        """
+        state = self.get_state(trainer)
+        state["budget"] = budget
+        state["model_attributes"]["epochs_trained"] = next_epoch
+
+        # write to a temporary file first, another worker might load the checkpoint at the same time
+        path = self.get_path(hyperparameter_config_id, train_indices)
+        tmp_path = path + "." + uuid.uuid4().hex
+        os.makedirs(self.directory, exist_ok=True)
+        torch.save(state, tmp_path)
+        os.replace(tmp_path, path)
+
+    def load(self, hyperparameter_config_id, train_indices, trainer, budget):
+        """Restore the state of the training, if it has been stored on a lower budget.
+
+        Arguments:
+            hyperparameter_config_id {tuple} -- The id of the config, assigned by BOHB.
+            train_indices {array} -- The indices of the training data.
+            trainer {Trainer} -- The trainer to restore the state to.
+            budget {float} -- The budget to train.
+
+        Returns:
+            float -- The budget training is resumed from. None if there is no checkpoint.
+        """
+        path = self.get_path(hyperparameter_config_id, train_indices)
+        if not os.path.exists(path):
+            return None
+        try:
+            state = torch.load(path, map_location="cpu", weights_only=False)
+            if state["budget"] >= budget:
+                return None
+            self.check_state(trainer, state)
+        except (OSError, EOFError, RuntimeError, ValueError, KeyError, AttributeError) as e:
+            trainer.logger.info("Could not resume training from checkpoint: " + str(e))
+            return None
+
+        # restore all or nothing
+        backup = copy.deepcopy(self.get_state(trainer))
+        try:
+            self.set_state(trainer, state)
+        except (RuntimeError, ValueError, KeyError, AttributeError) as e:
+            self.set_state(trainer, backup, rollback=True)
+            trainer.logger.info("Could not resume training from checkpoint: " + str(e))
+            return None
+        return state["budget"]
+
+    def remove(self, hyperparameter_config_id, train_indices):
+        """Remove the checkpoint, e.g. when the config can not be evaluated on a higher budget anymore.
+
+        Arguments:
+            hyperparameter_config_id {tuple} -- The id of the config, assigned by BOHB.
+            train_indices {array} -- The indices of the training data.
+        """
+        try:
+            os.remove(self.get_path(hyperparameter_config_id, train_indices))
+        except FileNotFoundError:
+            pass
+
+    def get_state(self, trainer):
+        state = {
+            "model": trainer.model.state_dict(),
+            "optimizer": trainer.optimizer.state_dict(),
+            "model_attributes": {name: getattr(trainer.model, name) for name in self.model_attributes},
+        }
+        lr_scheduler = getattr(trainer, "lr_scheduler", None)
+        if callable(getattr(lr_scheduler, "state_dict", None)):
+            state["lr_scheduler"] = lr_scheduler.state_dict()
+        return state
+
+    def check_state(self, trainer, state):
+        """Check that the state fits the trainer, before anything is restored"""
+        model_state = trainer.model.state_dict()
+        if set(state["model"].keys()) != set(model_state.keys()):
+            raise KeyError("The parameters of the network do not match the checkpoint")
+        for name, value in state["model"].items():
+            if value.shape != model_state[name].shape:
+                raise ValueError("Shape of " + name + " does not match the checkpoint")
+        if len(state["optimizer"]["param_groups"]) != len(trainer.optimizer.param_groups):
+            raise ValueError("The parameter groups of the optimizer do not match the checkpoint")
+        if ("lr_scheduler" in state) != callable(getattr(getattr(trainer, "lr_scheduler", None), "state_dict", None)):
+            raise ValueError("The learning rate scheduler does not match the checkpoint")
+        missing = set(self.model_attributes) - set(state["model_attributes"].keys())
+        if missing:
+            raise KeyError("Missing attributes of the network in the checkpoint: " + str(missing))
+
+    def set_state(self, trainer, state, rollback=False):
+        """Restore the state. When rolling back, the remaining parts are restored even if one of them fails."""
+        components = [("model", trainer.model), ("optimizer", trainer.optimizer)]
+        if "lr_scheduler" in state:
+            components.append(("lr_scheduler", trainer.lr_scheduler))
+        for key, component in components:
+            try:
+                component.load_state_dict(state[key])
+            except Exception:
+                if not rollback:
+                    raise
+        for name, value in state["model_attributes"].items():
+            setattr(trainer.model, name, value)
@@ -6,6 +6,8 @@ import torch.nn as nn
 import random
 from torch.autograd import Variable
 from .checkpoints.save_load import save_checkpoint
+from autoPyTorch.components.training.prefetcher import DevicePrefetcher
+from autoPyTorch.components.training.mixed_precision import autocast, prepare_input, backward_step
 
 # from util.transforms import mixup_data, mixup_criterion
 # from checkpoints import save_checkpoint
@@ -68,7 +70,7 @@ class Trainer(object):
         budget_exceeded = False
         metric_results = [0] * len(metrics)
         start_time = time.time()
-        for step, (data, targets) in enumerate(train_loader):
+        for step, (data, targets) in enumerate(DevicePrefetcher(train_loader, self.device)):
             # import matplotlib.pyplot as plt
             # img = plt.imshow(data.numpy()[0,1,:])
             # plt.show()
@@ -76,19 +78,17 @@ class Trainer(object):
             # images += list(data.numpy())
             # print('Data:', data.size(), ' - Label:', targets.size())
 
-            data = data.to(self.device)
-            targets = targets.to(self.device)
-
-            data, criterion_kwargs = self.loss_computation.prepare_data(data, targets)
+            data, criterion_kwargs = self.loss_computation.prepare_data(prepare_input(self, data), targets)
             batch_size = data.size(0)
 
-            outputs = self.model(data)
-            loss_func = self.loss_computation.criterion(**criterion_kwargs)
-            loss = loss_func(self.criterion, outputs)
+            with autocast(self):
+                outputs = self.model(data)
+                loss_func = self.loss_computation.criterion(**criterion_kwargs)
+                loss = loss_func(self.criterion, outputs)
+            outputs = outputs.float()
 
             self.optimizer.zero_grad()
-            loss.backward()
-            self.optimizer.step()
+            backward_step(self, loss)
 
             # print('Train:', ' '.join(str(outputs).split('\n')[0:2]))
 
@@ -157,22 +157,17 @@ class Trainer(object):
         self.model.eval()
 
         with torch.no_grad():
-            for step, (data, targets) in enumerate(test_loader):
+            for step, (data, targets) in enumerate(DevicePrefetcher(test_loader, self.device)):
 
                 # import matplotlib.pyplot as plt
                 # img = plt.imshow(data.numpy()[0,1,:])
                 # plt.show()
 
-                try:
-                    data = data.to(self.device)
-                    targets = targets.to(self.device)
-                except:
-                    data = data.to("cpu")
-                    targets = targets.to("cpu")
-
                 batch_size = data.size(0)
 
-                outputs = self.model(data)
+                with autocast(self):
+                    outputs = self.model(prepare_input(self, data))
+                outputs = outputs.float()
 
                 if self.images_plot_count > 0:
                     _, pred = outputs.topk(1, 1, True, True)
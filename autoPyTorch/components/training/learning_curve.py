@@ -0,0 +1,144 @@
+import numpy as np
+from scipy.special import ndtr
+
+from autoPyTorch.components.training.base_training import BaseTrainingTechnique
+from autoPyTorch.utils.config.config_option import ConfigOption, to_bool
+
+
+class LearningCurveTermination(BaseTrainingTechnique):
+    """ Stop training when the learning curve extrapolated to the end of the budget is very unlikely to beat the incumbent.
+    The incumbent is the best loss the optimization algorithm has seen on the same budget so far.
+    """
+
+    def __init__(self, incumbent_loss=None):
+        """Initialize the training technique.
+
+        Keyword Arguments:
+            incumbent_loss {float} -- The best loss reported on the current budget. Nothing is stopped if None. (default: {None})
+        """
+        super(LearningCurveTermination, self).__init__()
+        self.incumbent_loss = incumbent_loss
+
+    # OVERRIDE
+    def set_up(self, trainer, pipeline_config, **kwargs):
+        super(LearningCurveTermination, self).set_up(trainer, pipeline_config)
+        self.min_epochs = max(3, pipeline_config["learning_curve_min_epochs"])
+        self.min_probability = pipeline_config["learning_curve_min_probability"]
+        self.loss_transform = trainer.metrics[0].loss_transform
+        self.budgets_trained = list()
+        self.losses = list()
+
+        trainer.logger.debug("Using learning curve termination. Incumbent loss: " + str(self.incumbent_loss))
+
+    # OVERRIDE
+    def on_epoch_end(self, trainer, log, **kwargs):
+        metric_name = trainer.metrics[0].name
+        name = "val_" + metric_name if "val_" + metric_name in log else "train_" + metric_name
+        if name not in log or self.incumbent_loss is None or not np.isfinite(self.incumbent_loss):
+            return False
+
+        self.budgets_trained.append(trainer.model.budget_trained)
+        self.losses.append(self.loss_transform(log[name]))
+        if len(self.losses) < self.min_epochs:
+            return False
+
+        # estimate the number of epochs that fit into the budget from the budget each epoch consumed so far
+        num_epochs = len(self.losses)
+        budget_per_epoch = (self.budgets_trained[-1] - self.budgets_trained[0]) / (num_epochs - 1)
+        if budget_per_epoch <= 0:
+            return False
+        target_epoch = num_epochs + max(0, trainer.budget - self.budgets_trained[-1]) / budget_per_epoch
+
+        probability = probability_to_beat(np.arange(1, num_epochs + 1), np.array(self.losses), target_epoch, self.incumbent_loss)
+        trainer.logger.debug("Probability to beat the incumbent after " + str(target_epoch) + " epochs: " + str(probability))
+        if probability < self.min_probability:
+            trainer.logger.debug("Learning curve is unlikely to beat the incumbent. Stopping!")
+            trainer.model.stopped_early = True
+            return True
+        return False
+
+    def requires_eval_each_epoch(self):
+        return True
+
+    # OVERRIDE
+    @staticmethod
+    def get_pipeline_config_options():
+        options = [
+            ConfigOption("learning_curve_termination", default=False, type=to_bool,
+                info="Stop training configs whose extrapolated learning curve is unlikely to beat the incumbent on the same budget."),
+            ConfigOption("learning_curve_min_epochs", default=5, type=int,
+                info="Number of epochs to train before the learning curve is extrapolated."),
+            ConfigOption("learning_curve_min_probability", default=0.05, type=float,
+                info="Stop training if the probability to beat the incumbent is lower than this.")
+        ]
+        return options
+
+
+# nonlinear parameter grid shared by all curve families
+ALPHAS = np.exp(np.linspace(np.log(0.05), np.log(5), 40))
+
+# each family is c + a * basis(t, alpha), with t >= 1 the number of epochs
+CURVE_FAMILIES = [
+    lambda t, alpha: t ** -alpha,                     # power law
+    lambda t, alpha: np.exp(-alpha * (t - 1)),        # exponential
+    lambda t, alpha: 1 / np.log(np.e + alpha * t),    # inverse logarithm
+]
+
+
+def extrapolate_learning_curve(t, y, t_target):
+    """Fit an ensemble of parametric curves to a learning curve and evaluate it at a later point.
+    For each curve family and each value of its nonlinear parameter the linear parameters are fitted in closed form, all at once.
+
+    Arguments:
+        t {array} -- The epochs (>= 1) of the observed losses.
+        y {array} -- The observed losses.
+        t_target {float} -- The epoch to extrapolate to.
+
+    Returns:
+        tuple -- Predictions at t_target, their standard deviations and weights of the members of the ensemble.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    alphas = ALPHAS.reshape((-1, 1))
+
+    basis = np.concatenate([family(t.reshape((1, -1)), alphas) for family in CURVE_FAMILIES])
+    basis_target = np.concatenate([family(np.array([[t_target]], dtype=np.float64), alphas) for family in CURVE_FAMILIES])[:, 0]
+
+    # least squares for y = c + a * basis in each row
+    basis_mean = basis.mean(axis=1, keepdims=True)
+    centered = basis - basis_mean
+    var = np.maximum(np.sum(centered ** 2, axis=1), 1e-12)
+    a = np.sum(centered * (y - y.mean()), axis=1) / var
+    a = np.maximum(a, 0)  # losses do not increase with more training
+    c = y.mean() - a * basis_mean[:, 0]
+
+    residuals = y - (c.reshape((-1, 1)) + a.reshape((-1, 1)) * basis)
+    mse = np.maximum(np.mean(residuals ** 2, axis=1), 1e-12 * max(1, np.max(y ** 2)))
+    predictions = c + a * basis_target
+
+    # gaussian likelihood with the residual variance, uncertainty grows with the distance of the extrapolation
+    log_weights = -0.5 * len(y) * np.log(mse)
+    weights = np.exp(log_weights - np.max(log_weights))
+    weights = weights / np.sum(weights)
+    std = np.sqrt(mse * max(1, t_target / t[-1]))
+    return predictions, std, weights
+
+
+def probability_to_beat(t, y, t_target, incumbent_loss):
+    """Probability that the learning curve reaches a loss lower than the incumbent loss at t_target.
+
+    Arguments:
+        t {array} -- The epochs (>= 1) of the observed losses.
+        y {array} -- The observed losses.
+        t_target {float} -- The epoch to extrapolate to.
+        incumbent_loss {float} -- The loss to beat.
+
+    Returns:
+        float -- The probability.
+    """
+    predictions, std, weights = extrapolate_learning_curve(t, y, t_target)
+
+    # the best loss observed so far might be reported (e.g. with early stopping or best_over_epochs)
+    if np.min(y) < incumbent_loss:
+        return 1.0
+    return float(np.sum(weights * ndtr((incumbent_loss - predictions) / std)))
@@ -4,12 +4,14 @@ import time
 class LrScheduling(BaseTrainingTechnique):
     """Schedule the learning rate with given learning rate scheduler.
     The learning rate scheduler is usually set in a LrSchedulerSelector pipeline node.
+    If fit_to_budget is set, schedulers that adapt to the budget finish within the epochs planned by the budget type.
     """
-    def __init__(self, training_components, lr_step_after_batch, lr_step_with_time, allow_snapshot):
+    def __init__(self, training_components, lr_step_after_batch, lr_step_with_time, allow_snapshot, fit_to_budget=False):
         super(LrScheduling, self).__init__(training_components=training_components)
         self.lr_step_after_batch = lr_step_after_batch
         self.lr_step_with_time = lr_step_with_time
         self.allow_snapshot = allow_snapshot
+        self.fit_to_budget = fit_to_budget
 
     # OVERRIDE
     def on_batch_end(self, batch_loss, trainer, epoch, step, num_steps, **kwargs):
@@ -37,6 +39,7 @@ class LrScheduling(BaseTrainingTechnique):
         return False
     
     def perform_scheduling(self, trainer, epoch, metric, **kwargs):
+        self.fit_schedule_to_budget(trainer)
         try:
             trainer.lr_scheduler.step(epoch=epoch, metrics=metric)
         except:
@@ -54,6 +57,22 @@ class LrScheduling(BaseTrainingTechnique):
             return True
         return False
 
+    def fit_schedule_to_budget(self, trainer):
+        # shorten the schedule to the planned epochs, but never lengthen it
+        scheduler = trainer.lr_scheduler
+        if not self.fit_to_budget or self.lr_step_with_time or not getattr(scheduler, "adapts_to_budget", False) \
+                or getattr(trainer, "planned_epochs", None) is None:
+            return
+        if not hasattr(scheduler, "configured_T_max"):
+            scheduler.configured_T_max = scheduler.T_max
+
+        # the scheduler is stepped with the number of finished epochs after each batch, with the index of the epoch otherwise
+        last_epoch = trainer.planned_epochs if self.lr_step_after_batch else trainer.planned_epochs - 1
+        T_max = min(scheduler.configured_T_max, max(1, last_epoch))
+        if T_max != scheduler.T_max:
+            scheduler.T_max = T_max
+            trainer.logger.debug("Fit learning rate schedule to " + str(trainer.planned_epochs) + " planned epochs")
+
     def select_log(self, logs, trainer, **kwargs):
         # select the log where the lr scheduler has converged, if possible.
         if trainer.lr_scheduler.snapshot_before_restart:
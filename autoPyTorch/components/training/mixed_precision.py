@@ -0,0 +1,88 @@
+import logging
+import contextlib
+import torch
+
+from autoPyTorch.components.training.base_training import BaseTrainingTechnique
+from autoPyTorch.utils.config.config_option import ConfigOption, to_bool
+
+
+class MixedPrecision(BaseTrainingTechnique):
+    """Train in reduced precision using automatic mixed precision.
+    The parameters of the network stay in float32, so snapshots and checkpoints are not affected.
+    The forward pass of training and evaluation runs under autocast, float16 losses are scaled to avoid underflowing gradients.
+    Optionally, image data and networks are stored in channels last memory format.
+    """
+
+    # OVERRIDE
+    def set_up(self, trainer, pipeline_config, **kwargs):
+        super(MixedPrecision, self).set_up(trainer, pipeline_config)
+        logger = logging.getLogger('autonet')
+        device = torch.device(trainer.device)
+
+        trainer.autocast_dtype = get_autocast_dtype(pipeline_config["training_precision"], device)
+        trainer.grad_scaler = torch.amp.GradScaler(device.type) if trainer.autocast_dtype == torch.float16 else None
+        trainer.memory_format = torch.channels_last if pipeline_config["channels_last"] else None
+        if trainer.memory_format is not None:
+            trainer.model = trainer.model.to(memory_format=trainer.memory_format)
+
+        logger.debug("Training precision: " + str(trainer.autocast_dtype or torch.float32) + ", loss scaling: " + str(trainer.grad_scaler is not None) +
+                     ", channels last: " + str(trainer.memory_format is not None))
+
+    # OVERRIDE
+    @staticmethod
+    def get_pipeline_config_options():
+        options = [
+            ConfigOption("training_precision", default="fp32", type=str, choices=["fp32", "bf16", "fp16"],
+                info="Precision of the forward pass during training and evaluation. fp16 is only used on GPUs, bf16 is used on CPUs instead."),
+            ConfigOption("channels_last", default=False, type=to_bool, choices=[True, False],
+                info="Whether to train image networks in channels last memory format.")
+        ]
+        return options
+
+
+def get_autocast_dtype(training_precision, device):
+    """Get the data type to use for autocast.
+
+    Arguments:
+        training_precision {str} -- fp32, bf16 or fp16
+        device {torch.device} -- The device used for training.
+
+    Returns:
+        torch.dtype -- The data type or None, if training should run in float32.
+    """
+    logger = logging.getLogger('autonet')
+    if training_precision == "fp32":
+        return None
+    if training_precision == "fp16" and device.type == "cpu":
+        logger.warning("Training in fp16 is not supported on CPU, training in bf16 instead.")
+        return torch.bfloat16
+    if training_precision == "bf16" and device.type == "cuda" and not torch.cuda.is_bf16_supported():
+        logger.warning("Training in bf16 is not supported by the GPU, training in fp16 instead.")
+        return torch.float16
+    return {"bf16": torch.bfloat16, "fp16": torch.float16}[training_precision]
+
+
+def autocast(trainer):
+    """Context for the forward pass of the network of the trainer"""
+    if getattr(trainer, "autocast_dtype", None) is None:
+        return contextlib.nullcontext()
+    return torch.autocast(device_type=torch.device(trainer.device).type, dtype=trainer.autocast_dtype)
+
+
+def prepare_input(trainer, data):
+    """Bring the input of the network to the memory format of the network"""
+    if getattr(trainer, "memory_format", None) is not None and data.dim() == 4:
+        return data.contiguous(memory_format=trainer.memory_format)
+    return data
+
+
+def backward_step(trainer, loss):
+    """Compute the gradients of the loss and update the parameters, with loss scaling if necessary"""
+    grad_scaler = getattr(trainer, "grad_scaler", None)
+    if grad_scaler is None:
+        loss.backward()
+        trainer.optimizer.step()
+        return
+    grad_scaler.scale(loss).backward()
+    grad_scaler.step(trainer.optimizer)
+    grad_scaler.update()
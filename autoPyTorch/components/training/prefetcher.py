@@ -0,0 +1,92 @@
+import queue
+import threading
+import torch
+
+
+class DevicePrefetcher():
+    """Wrap a loader to copy the next batches to the device while the current batch is processed.
+
+    A background thread draws batches from the loader, pins them and issues non-blocking copies on a separate CUDA stream.
+    On the CPU the batches are passed through unchanged.
+    """
+
+    def __init__(self, loader, device, num_prefetch=2):
+        """Initialize the prefetcher.
+
+        Arguments:
+            loader {iterable} -- Yields (data, targets) batches, e.g. a DataLoader.
+            device {torch.device} -- The device to copy the batches to.
+
+        Keyword Arguments:
+            num_prefetch {int} -- Number of batches staged in advance. (default: {2})
+        """
+        self.loader = loader
+        self.device = torch.device(device)
+        self.num_prefetch = num_prefetch
+
+    def __len__(self):
+        return len(self.loader)
+
+    def __iter__(self):
+        if self.device.type != "cuda":
+            for data, targets in self.loader:
+                yield data.to(self.device), targets.to(self.device)
+            return
+
+        batches = queue.Queue(maxsize=self.num_prefetch)
+        stop = threading.Event()
+        stream = torch.cuda.Stream(device=self.device)
+        thread = threading.Thread(target=self._stage_batches, args=(batches, stop, stream), daemon=True)
+        thread.start()
+
+        try:
+            while True:
+                item = batches.get()
+                if item is None:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                data, targets, ready = item
+                current_stream = torch.cuda.current_stream(self.device)
+                current_stream.wait_event(ready)
+                data.record_stream(current_stream)
+                targets.record_stream(current_stream)
+                yield data, targets
+        finally:
+            # the consumer may stop early, e.g. when the budget is exhausted
+            stop.set()
+            while thread.is_alive():
+                try:
+                    batches.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            thread.join()
+
+    def _stage_batches(self, batches, stop, stream):
+        def put(item):
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        try:
+            with torch.cuda.stream(stream):
+                for data, targets in self.loader:
+                    data = self._to_device(data)
+                    targets = self._to_device(targets)
+                    ready = torch.cuda.Event()
+                    ready.record(stream)
+                    if not put((data, targets, ready)):
+                        return
+        except BaseException as e:
+            put(e)
+            return
+        put(None)
+
+    def _to_device(self, tensor):
+        if not tensor.is_cuda and not tensor.is_pinned():
+            tensor = tensor.pin_memory()
+        return tensor.to(self.device, non_blocking=True)
@@ -5,13 +5,15 @@ import numpy as np
 
 from torch.autograd import Variable
 from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
+from autoPyTorch.components.training.prefetcher import DevicePrefetcher
+from autoPyTorch.components.training.mixed_precision import autocast, prepare_input, backward_step
 
 # from util.transforms import mixup_data, mixup_criterion
 # from checkpoints import save_checkpoint
 
 class Trainer(object):
     def __init__(self, metrics, log_functions, loss_computation, model, criterion,
-            budget, optimizer, training_techniques, logger, device, full_eval_each_epoch):
+            budget, optimizer, training_techniques, logger, device, full_eval_each_epoch, compute_train_metrics=True):
         
         self.criterion = criterion
         self.optimizer = optimizer
@@ -30,12 +32,14 @@ class Trainer(object):
 
         self.logger = logger
         self.fit_start_time = None
+        self.planned_epochs = None
 
         self.eval_valid_each_epoch = full_eval_each_epoch or any(t.requires_eval_each_epoch() for t in self.training_techniques)
         self.eval_valid_on_snapshot = not self.eval_valid_each_epoch
         
         self.eval_additional_logs_each_epoch = full_eval_each_epoch and self.log_functions
         self.eval_additional_logs_on_snapshot = not full_eval_each_epoch and self.log_functions
+        self.compute_train_metrics = compute_train_metrics
 
         self.to(device)
     
@@ -104,14 +108,11 @@ class Trainer(object):
         outputs_data = list()
         targets_data = list()
 
-        for step, (data, targets) in enumerate(train_loader):
+        for step, (data, targets) in enumerate(DevicePrefetcher(train_loader, self.device)):
    
             # prepare
-            data = data.to(self.device)
-            targets = targets.to(self.device)
-
             data, criterion_kwargs = self.loss_computation.prepare_data(data, targets)
-            data = Variable(data)
+            data = Variable(prepare_input(self, data))
             batch_size = data.size(0)
 
             for t in self.training_techniques:
@@ -119,25 +120,32 @@ class Trainer(object):
 
             # training
             self.optimizer.zero_grad()
-            outputs = self.model(data)
-            loss_func = self.loss_computation.criterion(**criterion_kwargs)
-            loss = loss_func(self.criterion, outputs)
-            loss.backward()
-            self.optimizer.step()
+            with autocast(self):
+                outputs = self.model(data)
+                loss_func = self.loss_computation.criterion(**criterion_kwargs)
+                loss = loss_func(self.criterion, outputs)
+            backward_step(self, loss)
 
             # save for metric evaluation
-            if self.model.final_activation is not None:
-                outputs = self.model.final_activation(outputs)
-            outputs_data.append(outputs.data.cpu().detach().numpy())
-            targets_data.append(targets.data.cpu().detach().numpy())
+            if self.compute_train_metrics:
+                outputs = outputs.detach().float()
+                if self.model.final_activation is not None:
+                    outputs = self.model.final_activation(outputs)
+                outputs_data.append(outputs)
+                targets_data.append(targets.detach())
 
             loss_sum += loss.item() * batch_size
             N += batch_size
 
             if any([t.on_batch_end(batch_loss=loss.item(), trainer=self, epoch=epoch, step=step, num_steps=len(train_loader))
                     for t in self.training_techniques]):
-                return self.compute_metrics(outputs_data, targets_data), loss_sum / N, True
-        return self.compute_metrics(outputs_data, targets_data), loss_sum / N, False
+                return self.compute_train_metrics_results(outputs_data, targets_data), loss_sum / N, True
+        return self.compute_train_metrics_results(outputs_data, targets_data), loss_sum / N, False
+
+    def compute_train_metrics_results(self, outputs_data, targets_data):
+        if not self.compute_train_metrics:
+            return None
+        return self.compute_metrics(outputs_data, targets_data)
 
 
     def evaluate(self, test_loader):
@@ -146,20 +154,38 @@ class Trainer(object):
         outputs_data = list()
         targets_data = list()
 
+        # evaluate in constant memory, if all metrics can be computed batch by batch
+        accumulators = [metric.create_accumulator() for metric in self.metrics]
+        if any(accumulator is None for accumulator in accumulators):
+            accumulators = None
+
         with torch.no_grad():
-            for _, (data, targets) in enumerate(test_loader):
+            for _, (data, targets) in enumerate(DevicePrefetcher(test_loader, self.device)):
     
-                data = data.to(self.device)
-                data = Variable(data)
-                outputs = self.model(data)
-
-                outputs_data.append(outputs.data.cpu().detach().numpy())
-                targets_data.append(targets.data.cpu().detach().numpy())
+                data = Variable(prepare_input(self, data))
+                with autocast(self):
+                    outputs = self.model(data)
+                outputs = outputs.float()
+
+                if accumulators is not None:
+                    for accumulator in accumulators:
+                        accumulator.update(outputs, targets)
+                else:
+                    outputs_data.append(outputs.detach())
+                    targets_data.append(targets.detach())
 
         self.model.train()
+        if accumulators is not None:
+            return [accumulator.compute() for accumulator in accumulators]
         return self.compute_metrics(outputs_data, targets_data)
     
     def compute_metrics(self, outputs_data, targets_data):
-        outputs_data = np.vstack(outputs_data)
-        targets_data = np.vstack(targets_data)
+        # outputs and targets are kept on the device during the epoch and copied to the host at once
+        outputs_data = vstack(outputs_data).cpu().numpy()
+        targets_data = vstack(targets_data).cpu().numpy()
         return [metric(outputs_data, targets_data) for metric in self.metrics]
+
+
+def vstack(tensors):
+    """Stack tensors like np.vstack"""
+    return torch.cat([t.view(1, -1) if t.dim() <= 1 else t for t in tensors], dim=0)
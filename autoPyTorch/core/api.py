@@ -14,12 +14,17 @@ import json
 from autoPyTorch.pipeline.base.pipeline import Pipeline
 
 from autoPyTorch.pipeline.nodes.one_hot_encoding import OneHotEncoding
+from autoPyTorch.pipeline.nodes.imputation import Imputation
+from autoPyTorch.pipeline.nodes.normalization_strategy_selector import NormalizationStrategySelector
+from autoPyTorch.pipeline.nodes.preprocessor_selector import PreprocessorSelector
 from autoPyTorch.pipeline.nodes.cross_validation import CrossValidation
 from autoPyTorch.pipeline.nodes.metric_selector import MetricSelector
 from autoPyTorch.pipeline.nodes.optimization_algorithm import OptimizationAlgorithm
 from autoPyTorch.pipeline.nodes.create_dataset_info import CreateDatasetInfo
 from autoPyTorch.pipeline.nodes.network_selector import NetworkSelector
 from autoPyTorch.pipeline.nodes.image.network_selector_datasetinfo import NetworkSelectorDatasetInfo
+from autoPyTorch.components.preprocessing.preprocessor_base import PreprocessorBase
+from autoPyTorch.core.inference_model import InferenceModel, ColumnKernel, fold_transformer
 
 
 from autoPyTorch.utils.config.config_file_parser import ConfigFileParser
@@ -288,6 +293,49 @@ class AutoNet():
             else:
                 return self.pipeline[NetworkSelectorDatasetInfo.get_name()].fit_output["network"]
 
+    def export_inference_model(self):
+        """Export the fitted preprocessing and network of the incumbent configuration as a slim model for low latency predictions.
+        Only possible for dense feature data, after fit or refit.
+
+        Returns:
+            InferenceModel -- Callable that predicts like AutoNet.predict, without traversing the pipeline
+        """
+        if NetworkSelector.get_name() not in self.pipeline or self.pipeline[NetworkSelector.get_name()].fit_output is None:
+            raise ValueError("Export is only possible for fitted feature data pipelines")
+        autonet_config = self.get_current_autonet_config()
+        transforms = []
+
+        if Imputation.get_name() in self.pipeline:
+            fit_output = self.pipeline[Imputation.get_name()].fit_output
+            if fit_output["imputation_preprocessor"] is None:
+                raise ValueError("Export is not possible for sparse data")
+            keep = ~fit_output["all_nan_columns"]
+            if not keep.all():
+                transforms.append(ColumnKernel([(np.flatnonzero(keep), None)]))
+            transforms.append(fold_transformer(fit_output["imputation_preprocessor"]))
+
+        if NormalizationStrategySelector.get_name() in self.pipeline:
+            normalizer = self.pipeline[NormalizationStrategySelector.get_name()].fit_output["normalizer"]
+            if normalizer is not None:
+                transforms.append(fold_transformer(normalizer))
+
+        y_categories = None
+        if OneHotEncoding.get_name() in self.pipeline:
+            fit_output = self.pipeline[OneHotEncoding.get_name()].fit_output
+            categorical_features = autonet_config["categorical_features"]
+            if categorical_features and any(categorical_features):
+                transforms.append(fold_transformer(fit_output["one_hot_encoder"]))
+            if fit_output["y_one_hot_encoder"] is not None:
+                y_categories = fit_output["y_one_hot_encoder"].categories_[0]
+
+        if PreprocessorSelector.get_name() in self.pipeline:
+            preprocessor = self.pipeline[PreprocessorSelector.get_name()].fit_output["preprocessor"]
+            if type(preprocessor) != PreprocessorBase:
+                transforms.append(preprocessor.transform)
+
+        network = autonet_config["predict_model"] or self.pipeline[NetworkSelector.get_name()].fit_output["network"]
+        return InferenceModel(transforms=transforms, network=copy.deepcopy(network), y_categories=y_categories)
+
     def initialize_from_checkpoint(self, hyperparameter_config, checkpoint, in_features, out_features, final_activation=None):
         """
 
@@ -122,6 +122,8 @@ class AutoNetFeatureData(AutoNet):
                 TruncatedSVD, FastICA, RandomKitchenSinks, KernelPCA, Nystroem, PowerTransformer
 
         from autoPyTorch.components.training.early_stopping import EarlyStopping
+        from autoPyTorch.components.training.learning_curve import LearningCurveTermination
+        from autoPyTorch.components.training.mixed_precision import MixedPrecision
         from autoPyTorch.components.regularization.mixup import Mixup
 
         pre_selector = pipeline[PreprocessorSelector.get_name()]
@@ -169,6 +171,8 @@ class AutoNetFeatureData(AutoNet):
 
         train_node = pipeline[TrainNode.get_name()]
         train_node.add_training_technique("early_stopping", EarlyStopping)
+        train_node.add_training_technique("learning_curve_termination", LearningCurveTermination)
+        train_node.add_training_technique("mixed_precision", MixedPrecision)
         train_node.add_batch_loss_computation_technique("mixup", Mixup)
 
         cv = pipeline[CrossValidation.get_name()]
@@ -13,7 +13,8 @@ class AutoNetMultilabel(AutoNetFeatureData):
         from autoPyTorch.pipeline.nodes.cross_validation import CrossValidation
 
         import torch.nn as nn
-        from autoPyTorch.components.metrics import multilabel_accuracy, auc_metric, pac_metric
+        from autoPyTorch.components.metrics import multilabel_accuracy, auc_metric, pac_metric, batched_multilabel_accuracy, batched_pac_metric
+        from autoPyTorch.components.metrics import StreamingMultilabelAccuracy, StreamingAUC, StreamingPAC
         from autoPyTorch.components.preprocessing.loss_weight_strategies import LossWeightStrategyWeightedBinary
 
         AutoNetFeatureData._apply_default_pipeline_settings(pipeline)
@@ -27,11 +28,12 @@ class AutoNetMultilabel(AutoNetFeatureData):
 
         metric_selector = pipeline[MetricSelector.get_name()]
         metric_selector.add_metric('multilabel_accuracy', multilabel_accuracy,
-                                   loss_transform=True, requires_target_class_labels=True)
+                                   loss_transform=True, requires_target_class_labels=True, batched_metric=batched_multilabel_accuracy,
+                                   streaming_metric=StreamingMultilabelAccuracy)
         metric_selector.add_metric('auc_metric', auc_metric, loss_transform=True,
-                                   requires_target_class_labels=False)
+                                   requires_target_class_labels=False, streaming_metric=StreamingAUC)
         metric_selector.add_metric('pac_metric', pac_metric, loss_transform=True,
-                                   requires_target_class_labels=False)
+                                   requires_target_class_labels=False, batched_metric=batched_pac_metric, streaming_metric=StreamingPAC)
 
         train_node = pipeline[TrainNode.get_name()]
         train_node.default_minimize_value = False
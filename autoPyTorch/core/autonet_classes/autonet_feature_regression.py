@@ -17,7 +17,8 @@ class AutoNetRegression(AutoNetFeatureData):
         from autoPyTorch.pipeline.nodes.cross_validation import CrossValidation
 
         import torch.nn as nn
-        from autoPyTorch.components.metrics.standard_metrics import mae, rmse
+        from autoPyTorch.components.metrics.standard_metrics import mae, rmse, batched_mae, batched_rmse
+        from autoPyTorch.components.metrics.streaming_metrics import StreamingMAE, StreamingRMSE
 
         AutoNetFeatureData._apply_default_pipeline_settings(pipeline)
 
@@ -28,8 +29,8 @@ class AutoNetRegression(AutoNetFeatureData):
         loss_selector.add_loss_module('l1_loss', nn.L1Loss)
 
         metric_selector = pipeline[MetricSelector.get_name()]
-        metric_selector.add_metric('mean_abs_error', mae, loss_transform=False, requires_target_class_labels=False)
-        metric_selector.add_metric('rmse', rmse, loss_transform=False, requires_target_class_labels=False)
+        metric_selector.add_metric('mean_abs_error', mae, loss_transform=False, requires_target_class_labels=False, batched_metric=batched_mae, streaming_metric=StreamingMAE)
+        metric_selector.add_metric('rmse', rmse, loss_transform=False, requires_target_class_labels=False, batched_metric=batched_rmse, streaming_metric=StreamingRMSE)
 
         train_node = pipeline[TrainNode.get_name()]
         train_node.default_minimize_value = True
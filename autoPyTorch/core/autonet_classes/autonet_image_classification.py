@@ -12,7 +12,9 @@ class AutoNetImageClassification(AutoNetImageData):
         from autoPyTorch.pipeline.nodes.image.cross_validation_indices import CrossValidationIndices
         from autoPyTorch.pipeline.nodes.image.loss_module_selector_indices import LossModuleSelectorIndices
         from autoPyTorch.pipeline.nodes.image.network_selector_datasetinfo import NetworkSelectorDatasetInfo
-        from autoPyTorch.components.metrics import accuracy, auc_metric, pac_metric, balanced_accuracy, cross_entropy
+        from autoPyTorch.components.metrics import accuracy, auc_metric, pac_metric, balanced_accuracy, cross_entropy, batched_accuracy, \
+            batched_pac_metric, batched_balanced_accuracy
+        from autoPyTorch.components.metrics import StreamingAccuracy, StreamingAUC, StreamingPAC, StreamingBalancedAccuracy
         from autoPyTorch.components.preprocessing.loss_weight_strategies import LossWeightStrategyWeighted
 
         AutoNetImageData._apply_default_pipeline_settings(pipeline)
@@ -26,13 +28,14 @@ class AutoNetImageClassification(AutoNetImageData):
 
         metric_selector = pipeline[MetricSelector.get_name()]
         metric_selector.add_metric('accuracy', accuracy, loss_transform=True,
-                                   requires_target_class_labels=False)
+                                   requires_target_class_labels=False, batched_metric=batched_accuracy, streaming_metric=StreamingAccuracy)
         metric_selector.add_metric('auc_metric', auc_metric, loss_transform=True,
-                                   requires_target_class_labels=False)
+                                   requires_target_class_labels=False, streaming_metric=StreamingAUC)
         metric_selector.add_metric('pac_metric', pac_metric, loss_transform=True,
-                                   requires_target_class_labels=False)
+                                   requires_target_class_labels=False, batched_metric=batched_pac_metric, streaming_metric=StreamingPAC)
         metric_selector.add_metric('balanced_accuracy', balanced_accuracy, loss_transform=True,
-                                   requires_target_class_labels=True)
+                                   requires_target_class_labels=True, batched_metric=batched_balanced_accuracy,
+                                   streaming_metric=StreamingBalancedAccuracy)
         metric_selector.add_metric('cross_entropy', cross_entropy, loss_transform=True,
                                    requires_target_class_labels=False)
 
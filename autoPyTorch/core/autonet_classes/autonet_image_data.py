@@ -85,6 +85,7 @@ class AutoNetImageData(AutoNet):
 
         from autoPyTorch.components.training.image.early_stopping import EarlyStopping
         from autoPyTorch.components.training.image.mixup import Mixup
+        from autoPyTorch.components.training.mixed_precision import MixedPrecision
 
         net_selector = pipeline[NetworkSelectorDatasetInfo.get_name()]
         net_selector.add_network('densenet', DenseNet)
@@ -120,6 +121,7 @@ class AutoNetImageData(AutoNet):
         
         train_node = pipeline[SimpleTrainNode.get_name()]
         #train_node.add_training_technique("early_stopping", EarlyStopping)
+        train_node.add_training_technique("mixed_precision", MixedPrecision)
         train_node.add_batch_loss_computation_technique("mixup", Mixup)
 
         data_node = pipeline[CreateImageDataLoader.get_name()]
@@ -2,6 +2,7 @@ import os
 import torch
 import logging
 import numpy as np
+from collections import OrderedDict
 from autoPyTorch.core.api import AutoNet
 from autoPyTorch.pipeline.base.pipeline import Pipeline
 from autoPyTorch.pipeline.nodes.one_hot_encoding import OneHotEncoding
@@ -10,12 +11,20 @@ from autoPyTorch.pipeline.nodes.ensemble import EnableComputePredictionsForEnsem
 from autoPyTorch.pipeline.nodes.create_dataset_info import CreateDatasetInfo
 from autoPyTorch.pipeline.nodes.network_selector import NetworkSelector
 from autoPyTorch.pipeline.nodes import BaselineTrainer
+from autoPyTorch.pipeline.nodes.imputation import Imputation
+from autoPyTorch.pipeline.nodes.normalization_strategy_selector import NormalizationStrategySelector
+from autoPyTorch.pipeline.nodes.preprocessor_selector import PreprocessorSelector
+from autoPyTorch.components.ensembles.ensemble_network import EnsembleNetwork
+from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
 
 from IPython import embed
 
 class AutoNetEnsemble(AutoNet):
     """Build an ensemble of several neural networks that were evaluated during the architecure search"""
 
+    # names of the nodes whose hyperparameters determine the preprocessing of the data
+    preprocessing_nodes = [Imputation.get_name(), NormalizationStrategySelector.get_name(), OneHotEncoding.get_name(), PreprocessorSelector.get_name()]
+
     # OVERRIDE
     def __init__(self, autonet, config_preset="medium_cs", **autonet_config):
         if isinstance(autonet, AutoNet):
@@ -40,6 +49,7 @@ class AutoNetEnsemble(AutoNet):
 
         self.base_config.update(autonet_config)
         self.trained_autonets = None
+        self.ensemble_members = None
         self.dataset_info = None
 
         if config_preset is not None:
@@ -58,6 +68,7 @@ class AutoNetEnsemble(AutoNet):
 
         self.fit_result = self.pipeline.fit_pipeline(pipeline_config=self.autonet_config,
                                                      X_train=X_train, Y_train=Y_train, X_valid=X_valid, Y_valid=Y_valid)
+        self.ensemble_members = None
         self.dataset_info = self.pipeline[CreateDatasetInfo.get_name()].fit_output["dataset_info"]
         self.pipeline.clean()
         if refit:
@@ -81,6 +92,7 @@ class AutoNetEnsemble(AutoNet):
         
         identifiers = ensemble.get_selected_model_identifiers()
         self.trained_autonets = dict()
+        self.ensemble_members = None
 
         autonet_config["save_models"] = False
 
@@ -102,44 +114,22 @@ class AutoNetEnsemble(AutoNet):
         prediction = None
         autonet_config = self.get_current_autonet_config()
 
-        identifiers_with_budget, weights = self.fit_result["ensemble"].identifiers_, self.fit_result["ensemble"].weights_
-
-        baseline_id2model = BaselineTrainer.identifiers_ens
-
+        # load the members once and keep them in memory
+        if self.ensemble_members is None:
+            self.ensemble_members = self.load_ensemble_members(autonet_config)
 
-        model_dirs = [os.path.join(self.autonet_config["result_logger_dir"], "models", str(ident) + ".torch") for ident in identifiers_with_budget]
-        
-        # get data preprocessing pipeline
-        for ident, weight in zip(identifiers_with_budget, weights):
-            
-            if weight==0:
-                continue
-
-
-            if ident[0]>=0:
-                model_dir = os.path.join(self.autonet_config["result_logger_dir"], "models", str(ident) + ".torch")
-                logging.info("==> Inferring model model " + model_dir + ", adding preds with weight " + str(weight))
-                model = torch.load(model_dir)
-
-                autonet_config["model"] = model
-                current_prediction = self.trained_autonet.pipeline.predict_pipeline(pipeline_config=autonet_config, X=X)['Y']
-                prediction = current_prediction if prediction is None else prediction + weight * current_prediction
-
-                OHE = self.trained_autonet.pipeline[OneHotEncoding.get_name()]
-                metric = self.trained_autonet.pipeline[MetricSelector.get_name()].fit_output['optimize_metric']
-
-            else:
-                model_dir = os.path.join(self.autonet_config["result_logger_dir"], "models", str(ident) + ".pkl")
-                info_dir =  os.path.join(self.autonet_config["result_logger_dir"], "models", str(ident) + "_info.pkl")
+        # the networks of members with the same preprocessing are evaluated together, preprocessing is only done once
+        for autonet, ensemble_network in self.ensemble_members["networks"]:
+            current_prediction = autonet.pipeline.predict_pipeline(pipeline_config=dict(autonet_config, predict_model=ensemble_network), X=X)['Y']
+            prediction = current_prediction if prediction is None else prediction + current_prediction
 
-                logging.info("==> Inferring model model " + model_dir + ", adding preds with weight " + str(weight))
+        for weight, baseline_model in self.ensemble_members["baselines"]:
+            current_prediction = weight * baseline_model.predict(X_test=X, predict_proba=True)
+            prediction = current_prediction if prediction is None else prediction + current_prediction
 
-                baseline_model = baseline_id2model[ident[0]]()
-                baseline_model.load(model_dir, info_dir)
+        OHE = self.trained_autonet.pipeline[OneHotEncoding.get_name()]
+        metric = self.trained_autonet.pipeline[MetricSelector.get_name()].fit_output['optimize_metric']
 
-                current_prediction = baseline_model.predict(X_test=X, predict_proba=True)
-                prediction = current_prediction if prediction is None else prediction + weight * current_prediction
-                
         # reverse one hot encoding
         result = OHE.reverse_transform_y(prediction, OHE.fit_output['y_one_hot_encoder'])
         if not return_probabilities and not return_metric:
@@ -151,6 +141,61 @@ class AutoNetEnsemble(AutoNet):
             result.append(metric)
         return tuple(result)
 
+    def load_ensemble_members(self, autonet_config):
+        """Load the members of the ensemble from disk.
+
+        Arguments:
+            autonet_config {dict} -- The configuration of AutoNet
+
+        Returns:
+            dict -- The networks as list of (autonet used for preprocessing, EnsembleNetwork) and the baselines as list of (weight, model)
+        """
+        identifiers_with_budget, weights = self.fit_result["ensemble"].identifiers_, self.fit_result["ensemble"].weights_
+        ensemble_configs = self.fit_result.get("ensemble_configs", dict())
+        models_dir = os.path.join(self.autonet_config["result_logger_dir"], "models")
+
+        # refitted autonets by the preprocessing they have been fitted with
+        preprocessing_autonets = dict()
+        for identifier, autonet in (self.trained_autonets or dict()).items():
+            signature = self.get_preprocessing_signature(ensemble_configs.get(tuple(identifier[:3]), dict()))
+            preprocessing_autonets.setdefault(signature, autonet)
+
+        networks = OrderedDict()
+        baselines = list()
+        for ident, weight in zip(identifiers_with_budget, weights):
+            if weight == 0:
+                continue
+
+            if ident[0] >= 0:
+                model_dir = os.path.join(models_dir, str(ident) + ".torch")
+                logging.info("==> Loading model " + model_dir + " with weight " + str(weight))
+                model = torch.load(model_dir, map_location="cpu", weights_only=False)
+
+                # use the preprocessing of the refitted autonet, if there is none for the preprocessing of this member
+                signature = self.get_preprocessing_signature(ensemble_configs.get(tuple(ident[:3]), dict()))
+                autonet = preprocessing_autonets.get(signature, self.trained_autonet)
+                networks.setdefault(id(autonet), (autonet, [], []))
+                networks[id(autonet)][1].append(model)
+                networks[id(autonet)][2].append(weight)
+            else:
+                model_dir = os.path.join(models_dir, str(ident) + ".pkl")
+                info_dir = os.path.join(models_dir, str(ident) + "_info.pkl")
+                logging.info("==> Loading model " + model_dir + " with weight " + str(weight))
+
+                baseline_model = BaselineTrainer.identifiers_ens[ident[0]]()
+                baseline_model.load(model_dir, info_dir)
+                baselines.append((weight, baseline_model))
+
+        networks = [(autonet, EnsembleNetwork(models, member_weights,
+                                              num_threads=autonet_config["ensemble_predict_num_threads"],
+                                              stack_networks=autonet_config["ensemble_stack_networks"]))
+                    for autonet, models, member_weights in networks.values()]
+        return {"networks": networks, "baselines": baselines}
+
+    def get_preprocessing_signature(self, hyperparameter_config):
+        """Get the part of a hyperparameter config that determines the preprocessing"""
+        return tuple(sorted((key, value) for key, value in hyperparameter_config.items()
+                            if key.split(ConfigWrapper.delimiter)[0] in self.preprocessing_nodes))
 
         """
         models_with_weights = self.fit_result["ensemble"].get_models_with_weights(self.trained_autonets)
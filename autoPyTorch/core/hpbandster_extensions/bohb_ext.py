@@ -1,8 +1,12 @@
 
 from hpbandster.optimizers.bohb import BOHB
 from autoPyTorch.core.hpbandster_extensions.run_with_time import run_with_time
+from autoPyTorch.core.hpbandster_extensions.submit_job import submit_job
 
 class BOHBExt(BOHB):
+    # function returning additional keyword arguments for each job, e.g. information for the workers
+    job_kwargs = None
+
     def run_until(self, runtime=1, n_iterations=float("inf"), min_n_workers=1, iteration_kwargs = {},):
         """
             Parameters:
@@ -14,4 +18,7 @@ class BOHBExt(BOHB):
             min_n_workers: int
                 minimum number of workers before starting the run
         """
-        return run_with_time(self, runtime, n_iterations, min_n_workers, iteration_kwargs)
\ No newline at end of file
+        return run_with_time(self, runtime, n_iterations, min_n_workers, iteration_kwargs)
+
+    def _submit_job(self, config_id, config, budget):
+        return submit_job(self, config_id, config, budget)
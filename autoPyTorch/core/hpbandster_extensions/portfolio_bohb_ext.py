@@ -12,6 +12,7 @@ from hpbandster.optimizers.iterations import SuccessiveHalving
 from hpbandster.optimizers.config_generators.bohb import BOHB as BOHB_CG
 
 from autoPyTorch.core.hpbandster_extensions.run_with_time import run_with_time
+from autoPyTorch.core.hpbandster_extensions.submit_job import submit_job
 
 def get_portfolio(portfolio_type):
     dirname = os.path.dirname(os.path.abspath(__file__))
@@ -106,6 +107,9 @@ class PortfolioBOHB(Master):
 
 
 class PortfolioBOHBExt(PortfolioBOHB):
+    # function returning additional keyword arguments for each job, e.g. information for the workers
+    job_kwargs = None
+
     def run_until(self, runtime=1, n_iterations=float("inf"), min_n_workers=1, iteration_kwargs = {},):
         """
             Parameters:
@@ -118,3 +122,6 @@ class PortfolioBOHBExt(PortfolioBOHB):
                 minimum number of workers before starting the run
         """
         return run_with_time(self, runtime, n_iterations, min_n_workers, iteration_kwargs)
+
+    def _submit_job(self, config_id, config, budget):
+        return submit_job(self, config_id, config, budget)
@@ -0,0 +1,21 @@
+
+def submit_job(self, config_id, config, budget):
+    """
+        custom _submit_job method of Master in hpbandster submodule.
+        Adds the keyword arguments returned by the job_kwargs hook of the master to each job, if the hook is set.
+
+        Parameters:
+        -----------
+        config_id: tuple
+            the id of the config
+        config: dict
+            the config to evaluate
+        budget: float
+            the budget to evaluate the config on
+    """
+    job_kwargs = self.job_kwargs() if getattr(self, "job_kwargs", None) is not None else dict()
+    self.logger.debug('HBMASTER: submitting job %s to dispatcher'%str(config_id))
+    with self.thread_cond:
+        self.dispatcher.submit_job(config_id, config=config, budget=budget, working_directory=self.working_directory, **job_kwargs)
+        self.num_running_jobs += 1
+    self.logger.debug("HBMASTER: job %s submitted to dispatcher"%str(config_id))
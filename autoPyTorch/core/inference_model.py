@@ -0,0 +1,152 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import numpy as np
+import torch
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler, MinMaxScaler, MaxAbsScaler, OneHotEncoder
+
+from autoPyTorch.components.preprocessing.column_transforms import ColumnImputer, ColumnScaler
+
+
+class InferenceModel():
+    """Predict with the fitted preprocessing and network of AutoNet without traversing the pipeline.
+
+    The fitted sklearn transformers are folded into plain NumPy kernels, so a prediction is a few array operations
+    followed by a forward pass of the network. Create it with AutoNet.export_inference_model().
+    The model can be pickled or saved with torch.save.
+    """
+
+    def __init__(self, transforms, network, y_categories=None):
+        """Initialize the model.
+
+        Arguments:
+            transforms {list} -- Callables that transform the feature matrix in this order.
+            network {torch.nn.Module} -- The trained network.
+
+        Keyword Arguments:
+            y_categories {array} -- The classes corresponding to the outputs of the network. None for regression. (default: {None})
+        """
+        self.transforms = transforms
+        self.network = network.cpu().eval()
+        self.y_categories = y_categories
+
+    def transform(self, X):
+        """Preprocess the data like the pipeline.
+
+        Arguments:
+            X {array} -- The data matrix. A single row can be given as 1-d array.
+
+        Returns:
+            array -- The input of the network.
+        """
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        for transform in self.transforms:
+            X = transform(X)
+        return X
+
+    def predict_proba(self, X):
+        """Get the output of the network, e.g. the class probabilities."""
+        X = torch.from_numpy(np.ascontiguousarray(self.transform(X), dtype=np.float32))
+        with torch.no_grad():
+            return self.network(X).numpy()
+
+    def predict(self, X):
+        """Predict the targets, like AutoNet.predict."""
+        Y = self.predict_proba(X)
+        if self.y_categories is None:
+            return Y
+        return self.y_categories[np.argmax(Y, axis=1)].reshape(-1, 1)
+
+    __call__ = predict
+
+
+def fold_transformer(transformer):
+    """Fold a fitted transformer into a NumPy kernel.
+
+    Arguments:
+        transformer {object} -- A fitted sklearn transformer or any object with a transform method.
+
+    Returns:
+        callable -- Transforms a dense matrix. Transformers that are not known fall back to their transform method.
+    """
+    if isinstance(transformer, ColumnTransformer):
+        return ColumnKernel([(columns, None if t == "passthrough" else fold_transformer(t))
+                             for _, t, columns in transformer.transformers_ if t != "drop" and len(columns) > 0])
+    if isinstance(transformer, SimpleImputer):
+        statistics = np.asarray(transformer.statistics_, dtype=np.float64)
+        keep = np.ones(len(statistics), dtype=bool)
+        if transformer.strategy != "constant" and not getattr(transformer, "keep_empty_features", False):
+            keep = ~np.isnan(statistics)
+        return ImputeKernel(statistics[keep], keep)
+    if isinstance(transformer, ColumnImputer):
+        return ColumnKernel([(transformer.columns, ImputeKernel(transformer.statistics, np.ones(len(transformer.columns), dtype=bool)))])
+    if isinstance(transformer, ColumnScaler):
+        numerical, categorical = transformer.columns[:transformer.num_numerical], transformer.columns[transformer.num_numerical:]
+        if transformer.method == "minmax":
+            kernel = AffineKernel(transformer.scale, transformer.shift)
+        else:
+            kernel = AffineKernel(1 / transformer.scale, -transformer.shift / transformer.scale)
+        return ColumnKernel([(numerical, kernel), (categorical, None)])
+    if isinstance(transformer, StandardScaler):
+        mean = transformer.mean_ if transformer.mean_ is not None else 0
+        scale = transformer.scale_ if transformer.scale_ is not None else 1
+        return AffineKernel(1 / scale, -mean / scale)
+    if isinstance(transformer, MinMaxScaler) and not getattr(transformer, "clip", False):
+        return AffineKernel(transformer.scale_, transformer.min_)
+    if isinstance(transformer, MaxAbsScaler):
+        return AffineKernel(1 / transformer.scale_, 0)
+    if isinstance(transformer, OneHotEncoder) and transformer.handle_unknown == "ignore" and getattr(transformer, "drop", None) is None:
+        return OneHotKernel(transformer.categories_)
+    return transformer.transform
+
+
+class ColumnKernel():
+    """Apply kernels to groups of columns and stack the results, like a fitted ColumnTransformer."""
+
+    def __init__(self, kernels):
+        self.kernels = [(np.asarray(columns), kernel) for columns, kernel in kernels]
+
+    def __call__(self, X):
+        parts = [X[:, columns] if kernel is None else kernel(X[:, columns]) for columns, kernel in self.kernels]
+        return np.hstack(parts) if len(parts) != 1 else parts[0]
+
+
+class ImputeKernel():
+    """Replace missing values by the statistics of each column, drop the columns without statistics."""
+
+    def __init__(self, statistics, keep):
+        self.statistics = statistics
+        self.keep = keep if not keep.all() else None
+
+    def __call__(self, X):
+        X = np.array(X if self.keep is None else X[:, self.keep], dtype=np.float64)
+        missing = np.isnan(X)
+        if missing.any():
+            X[missing] = np.broadcast_to(self.statistics, X.shape)[missing]
+        return X
+
+
+class AffineKernel():
+    """Scale and shift each column."""
+
+    def __init__(self, scale, offset):
+        self.scale = scale
+        self.offset = offset
+
+    def __call__(self, X):
+        return X * self.scale + self.offset
+
+
+class OneHotKernel():
+    """One hot encode each column. Unknown values are encoded as all zeros."""
+
+    def __init__(self, categories):
+        self.categories = [np.asarray(c) for c in categories]
+
+    def __call__(self, X):
+        return np.hstack([(X[:, i:i + 1] == c[np.newaxis, :]).astype(np.float64) for i, c in enumerate(self.categories)])
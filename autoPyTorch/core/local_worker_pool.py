@@ -0,0 +1,86 @@
+import logging
+import threading
+import multiprocessing
+
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+class LocalWorkerPool():
+    """Run several workers in processes on the local machine, restart them when they crash and shut them down in the end."""
+
+    def __init__(self, run_worker, num_workers, shutdownables, max_restarts=10, poll_interval=5):
+        """Initialize the pool.
+
+        Arguments:
+            run_worker {function} -- Called with the index of the worker in each process. Should block until the worker is shut down.
+            num_workers {int} -- The number of worker processes.
+            shutdownables {list} -- For each element, the shutdown() method is called after the workers have been shut down.
+
+        Keyword Arguments:
+            max_restarts {int} -- Maximum number of restarts of crashed workers in total. (default: {10})
+            poll_interval {float} -- Seconds between checks whether the workers are still alive. (default: {5})
+        """
+        self.run_worker = run_worker
+        self.num_workers = num_workers
+        self.shutdownables = shutdownables
+        self.max_restarts = max_restarts
+        self.poll_interval = poll_interval
+        self.num_restarts = 0
+        self.processes = [None] * num_workers
+        self.failed = set()
+        self.logger = logging.getLogger('autonet')
+
+        self.stopping = threading.Event()
+        self.monitor = None
+
+    @staticmethod
+    def is_available():
+        """The workers inherit the pipeline and the data from the forked master process"""
+        return "fork" in multiprocessing.get_all_start_methods()
+
+    def start(self):
+        for i in range(self.num_workers):
+            self.start_worker(i)
+        self.monitor = threading.Thread(target=self.supervise, daemon=True)
+        self.monitor.start()
+
+    def start_worker(self, index):
+        process = multiprocessing.get_context("fork").Process(target=self.run_worker, args=(index,), daemon=False)
+        process.start()
+        self.processes[index] = process
+        self.logger.debug("Started local worker " + str(index) + " with pid " + str(process.pid))
+
+    def supervise(self):
+        while not self.stopping.wait(self.poll_interval):
+            for i, process in enumerate(self.processes):
+                if process.is_alive() or process.exitcode == 0 or i in self.failed or self.stopping.is_set():
+                    continue
+                if self.num_restarts >= self.max_restarts:
+                    self.logger.info("Local worker " + str(i) + " crashed with exit code " + str(process.exitcode) +
+                        ". Maximum number of restarts reached.")
+                    self.failed.add(i)
+                    continue
+                self.logger.info("Local worker " + str(i) + " crashed with exit code " + str(process.exitcode) + ". Restarting.")
+                self.num_restarts += 1
+                self.start_worker(i)
+
+    def shutdown(self, timeout=30):
+        """Wait for the workers to finish after they have been asked to shut down by the optimization algorithm. Terminate the remaining ones.
+
+        Keyword Arguments:
+            timeout {float} -- Seconds to wait for each worker. (default: {30})
+        """
+        self.stopping.set()
+        if self.monitor is not None:
+            self.monitor.join()
+        for process in self.processes:
+            if process is None:
+                continue
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        for s in self.shutdownables:
+            s.shutdown()
+        self.shutdownables = []
@@ -56,7 +56,7 @@ class AutoNetWorker(Worker):
         super().__init__(*args, **kwargs)
     
     # OVERRIDE
-    def compute(self, config, budget, working_directory, config_id, **kwargs):
+    def compute(self, config, budget, working_directory, config_id, incumbent_losses=None, **kwargs):
 
         self.autonet_logger.debug("Budget " + str(budget) + " config: " + str(config))
 
@@ -74,7 +74,7 @@ class AutoNetWorker(Worker):
 
             # start optimization
             limit_train = pynisher.enforce_limits(mem_in_mb=self.pipeline_config['memory_limit_mb'], wall_time_in_s=time_limit)(self.optimize_pipeline)
-            result = limit_train(config, config_id, budget, start_time)
+            result = limit_train(config, config_id, budget, start_time, incumbent_losses)
 
             # check for exceptions
             if (limit_train.exit_status == pynisher.TimeoutException):
@@ -86,7 +86,7 @@ class AutoNetWorker(Worker):
                 self.autonet_logger.info('Exception occurred using config:\n' + str(config))
                 raise Exception("Exception in train pipeline. Took " + str((time.time()-start_time)) + " seconds with budget " + str(budget))
         else:
-            result = self.optimize_pipeline(config, config_id, budget, start_time)
+            result = self.optimize_pipeline(config, config_id, budget, start_time, incumbent_losses)
 
         loss = result['loss']
         info = result['info']
@@ -99,7 +99,7 @@ class AutoNetWorker(Worker):
 
         return  result
     
-    def optimize_pipeline(self, config, config_id, budget, optimize_start_time):
+    def optimize_pipeline(self, config, config_id, budget, optimize_start_time, incumbent_losses=None):
         """Fit the pipeline using the sampled hyperparameter configuration.
         
         Arguments:
@@ -107,6 +107,9 @@ class AutoNetWorker(Worker):
             config_id {tuple} -- An ID for the configuration. Assigned by BOHB.
             budget {float} -- The budget to evaluate the hyperparameter configuration.
             optimize_start_time {float} -- The time when optimization started.
+
+        Keyword Arguments:
+            incumbent_losses {list} -- (budget, loss) pairs of the best loss the master has seen on each budget. (default: {None})
         
         Returns:
             dict -- The result of fitting the pipeline.
@@ -116,7 +119,8 @@ class AutoNetWorker(Worker):
             return self.pipeline.fit_pipeline(hyperparameter_config=config, pipeline_config=self.pipeline_config, 
                                             X_train=self.X_train, Y_train=self.Y_train, X_valid=self.X_valid, Y_valid=self.Y_valid, 
                                             budget=budget, budget_type=self.budget_type, max_budget=self.max_budget, optimize_start_time=optimize_start_time,
-                                            refit=False, rescore=False, hyperparameter_config_id=config_id, dataset_info=self.dataset_info)
+                                            refit=False, rescore=False, hyperparameter_config_id=config_id, dataset_info=self.dataset_info,
+                                            incumbent_losses=incumbent_losses)
         except Exception as e:
             if 'use_tensorboard_logger' in self.pipeline_config and self.pipeline_config['use_tensorboard_logger']:            
                 import tensorboard_logger as tl
@@ -1,4 +1,6 @@
 import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 
 __author__ = "Max Dippel, Michael Burkart and Matthias Urban"
 __version__ = "0.0.1"
@@ -9,7 +11,8 @@ class DataConverter(object):
                  numerical_min_unique_values=3,
                  force_numerical=None,
                  force_categorical=None,
-                 is_multilabel=None):
+                 is_multilabel=None,
+                 num_threads=1):
         """
         Initialize the data_converter.
         
@@ -22,12 +25,14 @@ class DataConverter(object):
             force_numerical: Array of feature indices, which schould be treated as numerical.
             force_categorical: Array of feature indices, which should be trated as categorical.
             is_multilabel: True, if multivariable regression / multilabel classification
+            num_threads: Number of threads used to convert the columns.
         """
         self.is_classification = is_classification
         self.numerical_min_unique_values= numerical_min_unique_values
         self.force_numerical = force_numerical or []
         self.force_categorical = force_categorical or []
         self.is_multilabel = is_multilabel
+        self.num_threads = num_threads
 
     def convert(self, X, Y):
         """
@@ -75,67 +80,35 @@ class DataConverter(object):
         """
         num_rows = len(matrix)
         is_categorical = []
-        len_values_and_indices = []
-        result_width = 0
-        
-        # iterate over the columns and get some data
-        for i in range(matrix.shape[1]):
-            
-            # check if it is categorical or numerical
-            matrix_column = matrix[0:num_rows, i]
-            if matrix.dtype == np.dtype("object"):
-                values_occurred = dict()
-                values = []
-                indices = []
-                for v in matrix_column:
-                    if v not in values_occurred:
-                        values_occurred[v] = len(values)
-                        values.append(v)
-                    indices.append(values_occurred[v])
-                indices = np.array(indices)
-                values = np.array(values, dtype=object)
-                nan_indices = np.array([i for i, n in enumerate(matrix_column) if n == np.nan])
-                valid_value_indices = np.array([i for i, n in enumerate(values) if n != np.nan])
-            else:
-                values, indices = np.unique(matrix_column, return_inverse=True)
-                nan_indices = np.argwhere(np.isnan(matrix_column)).flatten()
-                valid_value_indices = np.argwhere(~np.isnan(values)).flatten()
+        result_columns = []
 
-            # check for missing values
-            # nan values are additional category in categorical features
-            if len(nan_indices) > 0:
-                values = np.append(values[valid_value_indices], np.nan)
-                indices[nan_indices] = values.shape[0] - 1         
+        # get the category indices of each column
+        columns = [matrix[0:num_rows, i] for i in range(matrix.shape[1])]
+        if self.num_threads > 1 and len(columns) > 1:
+            with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+                values_and_indices = list(executor.map(factorize_column, columns))
+        else:
+            values_and_indices = [factorize_column(column) for column in columns]
 
-            len_values_and_indices.append((len(values), indices))
+        # check if it is categorical or numerical
+        for i, (values, indices) in enumerate(values_and_indices):
             if len(values) == 1:
                 is_categorical.append(None)
             elif i in force_categorical or i not in force_numerical and (
                     len(values) < self.numerical_min_unique_values or
-                    any(type(value) is str for value in values)):
-                # column is categorical
+                    (matrix.dtype == np.dtype("object") and any(type(value) is str for value in values))):
+                # column is categorical: convert to int
                 is_categorical.append(True)
-                result_width += 1
+                result_columns.append(indices)
             else:
                 # column is numerical
                 is_categorical.append(False)
-                result_width += 1
+                result_columns.append(columns[i])
 
         # fill the result
-        result = np.zeros(shape=(num_rows, result_width), dtype='float32', order='F')
-        j = 0
-        for i, is_cat in enumerate(is_categorical):
-            len_values, indices = len_values_and_indices[i]
-            if len_values == 1:
-                continue
-            if is_cat:
-                # column is categorical: convert to int
-                result[:, j] = indices
-                j += 1
-            else:
-                # column is numerical
-                result[:, j] = matrix[:, i]
-                j += 1
+        result = np.zeros(shape=(num_rows, len(result_columns)), dtype='float32', order='F')
+        for j, column in enumerate(result_columns):
+            result[:, j] = column
 
         return result.astype('float32', copy=False), [x for x in is_categorical if x is not None]
     
@@ -152,4 +125,23 @@ class DataConverter(object):
         else:
             assert not np.any(np.isnan(Y)), "NaN in Y"
             self.is_classification = False
-        return Y
\ No newline at end of file
+        return Y
+
+
+def factorize_column(column):
+    """Assign an index to each distinct value of the column.
+    Numerical values are sorted, other values are indexed in the order they occur.
+    Missing values are an additional category with the highest index.
+
+    Arguments:
+        column {array} -- The column.
+
+    Returns:
+        tuple -- The distinct values and the index of the value of each row.
+    """
+    indices, values = pd.factorize(column, sort=(column.dtype != np.dtype("object")))
+    missing = indices < 0
+    if np.any(missing):
+        values = np.append(np.asarray(values, dtype=column.dtype), np.nan)
+        indices[missing] = len(values) - 1
+    return values, indices
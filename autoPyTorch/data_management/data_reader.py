@@ -3,7 +3,9 @@ import pandas as pd
 import numpy as np
 from abc import abstractmethod
 import os
-from  scipy.sparse import csr_matrix
+import glob
+import itertools
+from  scipy.sparse import csr_matrix, load_npz, save_npz, issparse
 import math
 
 from autoPyTorch.data_management.data_converter import DataConverter
@@ -77,10 +79,9 @@ class CSVReader(DataReader):
         self.X = self.data[0:self.num_entries, 0:self.num_features] #np.array(  .iloc
         self.Y = self.data[0:self.num_entries, -1]
 
-        for i in range(self.X.shape[0]):
-            for j in range(self.X.shape[1]):
-                if self.X[i, j] == "?":
-                    self.X[i, j] = np.nan
+        # only columns with strings can contain "?"
+        if self.X.dtype == object:
+            self.X[self.X == "?"] = np.nan
 
         self.num_classes = len(np.unique(self.Y))
         if (auto_convert):
@@ -128,10 +129,21 @@ class OpenMlReader(DataReader):
 
 
 class AutoMlReader(DataReader):
-    def __init__(self, path_to_info):
+    def __init__(self, path_to_info, cache_dir=None, chunk_size=10000):
+        """Reader for datasets in the format of the AutoML challenge.
+
+        Arguments:
+            path_to_info {str} -- Path to the .info file of the dataset.
+
+        Keyword Arguments:
+            cache_dir {str} -- Directory to cache the parsed data files in binary format (.npy/.npz). No caching if None. (default: {None})
+            chunk_size {int} -- Number of lines parsed at once. (default: {10000})
+        """
         self.num_entries = None
         self.num_features = None
         self.num_classes = None
+        self.cache_dir = cache_dir
+        self.chunk_size = chunk_size
         super(AutoMlReader, self).__init__(path_to_info, None)
     
     def read(self, auto_convert=True, **kwargs):
@@ -176,18 +188,18 @@ class AutoMlReader(DataReader):
         # read data files
         reading_function = self.read_datafile if not is_sparse else (
             self.read_sparse_datafile if not feats_binary else self.read_binary_sparse_datafile)
-        self.X = reading_function(os.path.join(path, name + "_train.data"), (train_num, feat_num))
-        self.Y = self.read_datafile(os.path.join(path, name + "_train.solution"), (train_num, target_num))
+        self.X = self.read_cached(reading_function, os.path.join(path, name + "_train.data"), (train_num, feat_num))
+        self.Y = self.read_cached(self.read_datafile, os.path.join(path, name + "_train.solution"), (train_num, target_num))
 
         if os.path.exists(os.path.join(path, name + "_valid.data")) and \
             os.path.exists(os.path.join(path, name + "_valid.solution")):
-            self.X_valid = reading_function(os.path.join(path, name + "_valid.data"), (valid_num, feat_num))
-            self.Y_valid = self.read_datafile(os.path.join(path, name + "_valid.solution"), (valid_num, target_num))
+            self.X_valid = self.read_cached(reading_function, os.path.join(path, name + "_valid.data"), (valid_num, feat_num))
+            self.Y_valid = self.read_cached(self.read_datafile, os.path.join(path, name + "_valid.solution"), (valid_num, target_num))
         
         if os.path.exists(os.path.join(path, name + "_test.data")) and \
             os.path.exists(os.path.join(path, name + "_test.solution")):
-            self.X_test = reading_function(os.path.join(path, name + "_test.data"), (test_num, feat_num))
-            self.Y_test = self.read_datafile(os.path.join(path, name + "_test.solution"), (test_num, target_num))
+            self.X_test = self.read_cached(reading_function, os.path.join(path, name + "_test.data"), (test_num, feat_num))
+            self.Y_test = self.read_cached(self.read_datafile, os.path.join(path, name + "_test.solution"), (test_num, target_num))
         
         if not self.is_multilabel and self.is_classification and self.Y.shape[1] > 1:
             self.Y = np.argmax(self.Y, axis=1)
@@ -197,41 +209,120 @@ class AutoMlReader(DataReader):
         if auto_convert and not is_sparse:
             self.convert(force_categorical=force_categorical, force_numerical=force_numerical, **kwargs)
         
+    def read_cached(self, reading_function, filepath, shape):
+        """Read a data file using the binary cache, if a cache directory has been specified.
+        The cache is keyed by the modification time of the file, outdated cache files are removed.
+
+        Arguments:
+            reading_function {function} -- The function to parse the file if it is not cached.
+            filepath {str} -- The data file.
+            shape {tuple} -- The shape given in the info file.
+
+        Returns:
+            array or csr_matrix -- The data.
+        """
+        if self.cache_dir is None:
+            return reading_function(filepath, shape)
+
+        cache_prefix = os.path.join(self.cache_dir, os.path.basename(filepath) + ".")
+        cache_key = str(os.stat(filepath).st_mtime_ns)
+        for cache_file in glob.glob(cache_prefix + "*"):
+            key = os.path.basename(cache_file).split(".")[-2]
+            if key.isdigit() and key != cache_key:
+                os.remove(cache_file)
+
+        if os.path.exists(cache_prefix + cache_key + ".npy"):
+            return np.load(cache_prefix + cache_key + ".npy")
+        if os.path.exists(cache_prefix + cache_key + ".npz"):
+            return load_npz(cache_prefix + cache_key + ".npz")
+
+        data = reading_function(filepath, shape)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        extension = ".npz" if issparse(data) else ".npy"
+        tmp_file = cache_prefix + "tmp" + str(os.getpid()) + extension
+        with open(tmp_file, "wb") as f:
+            if issparse(data):
+                save_npz(f, data)
+            else:
+                np.save(f, data)
+        os.replace(tmp_file, cache_prefix + cache_key + extension)
+        return data
+
     def read_datafile(self, filepath, shape):
-        data = []
-        with open(filepath, "r") as f:
-            for line in f:
-                data.append([float(v.strip()) for v in line.split()])
-        return np.array(data)
+        data = np.empty((0, 0))
+        num_rows = 0
+        for lines in read_chunks(filepath, self.chunk_size):
+            lines = [line for line in lines if line.strip()]
+            if not lines:
+                continue
+            values = np.fromstring(" ".join(lines), dtype=np.float64, sep=" ")
+            if data.shape[1] == 0:
+                # the number of rows is taken from the info file, the number of columns from the data
+                data = np.empty((max(shape[0], len(lines)), len(lines[0].split())))
+            if values.size != len(lines) * data.shape[1]:
+                raise ValueError("Lines of " + filepath + " have different numbers of values")
+
+            if num_rows + len(lines) > data.shape[0]:
+                data = np.concatenate([data, np.empty((num_rows + len(lines) - data.shape[0], data.shape[1]))])
+            data[num_rows:num_rows + len(lines)] = values.reshape((len(lines), data.shape[1]))
+            num_rows += len(lines)
+        return data[:num_rows]
 
     def read_sparse_datafile(self, filepath, shape):
-        data = []
-        row_indizes = []
-        col_indizes = []
-        with open(filepath, "r") as f:
-            for row, line in enumerate(f):
-                print("\rReading line:",  row, "of", shape[0], end="")
-                for value in line.split():
-                    value = value.rstrip()
-
-                    data.append(float(value.split(":")[1]))
-                    col_indizes.append(int(value.split(":")[0]) - 1)
-                    row_indizes.append(row)
-            print("Done")
-        return csr_matrix((data, (row_indizes, col_indizes)), shape=shape)
+        def parse(lines):
+            # each value is given as index:value
+            values = np.fromstring(" ".join(lines).replace(":", " "), dtype=np.float64, sep=" ")
+            nnz = np.char.count(np.array(lines, dtype=str), ":")
+            return values[0::2].astype(np.int64) - 1, values[1::2], nnz
+        return self._read_sparse(filepath, shape, parse)
     
     def read_binary_sparse_datafile(self, filepath, shape):
-        row_indizes = []
-        col_indizes = []
-        with open(filepath, "r") as f:
-            for row, line in enumerate(f):
-                print("\rReading line:",  row, "of", shape[0], end="")
-                for value in line.split():
-                    value = value.rstrip()
-                    col_indizes.append(int(value) - 1)
-                    row_indizes.append(row)
-            print("Done")
-        return csr_matrix(([1] * len(row_indizes), (row_indizes, col_indizes)), shape=shape)
+        def parse(lines):
+            # separate the lines by -1, which is not a valid index
+            values = np.fromstring(" -1 ".join(lines) + " -1", dtype=np.int64, sep=" ")
+            line_ends = np.flatnonzero(values == -1)
+            nnz = np.diff(line_ends, prepend=-1) - 1
+            indices = values[values != -1] - 1
+            return indices, np.ones(len(indices), dtype=np.int64), nnz
+        return self._read_sparse(filepath, shape, parse)
+
+    def _read_sparse(self, filepath, shape, parse):
+        """Parse a sparse data file in chunks and build the csr matrix from the chunks.
+
+        Arguments:
+            filepath {str} -- The data file.
+            shape {tuple} -- The shape given in the info file.
+            parse {function} -- Parses a list of lines to column indices, values and number of values per line.
+
+        Returns:
+            csr_matrix -- The data.
+        """
+        indices, data, nnz = list(), list(), list()
+        for lines in read_chunks(filepath, self.chunk_size):
+            chunk_indices, chunk_data, chunk_nnz = parse(lines)
+            indices.append(chunk_indices)
+            data.append(chunk_data)
+            nnz.append(chunk_nnz)
+        if not nnz:
+            return csr_matrix(shape)
+
+        # rows missing in the file are empty
+        nnz = np.concatenate(nnz)
+        nnz = np.concatenate([nnz, np.zeros(max(0, shape[0] - len(nnz)), dtype=nnz.dtype)])
+        indptr = np.concatenate([[0], np.cumsum(nnz)])
+        result = csr_matrix((np.concatenate(data), np.concatenate(indices), indptr), shape=(len(nnz), shape[1]))
+        result.sum_duplicates()
+        return result
+
+
+def read_chunks(filepath, chunk_size):
+    """Iterate over the lines of a file in chunks of chunk_size lines"""
+    with open(filepath, "r") as f:
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if not lines:
+                return
+            yield lines
 
 
 class OpenMLImageReader(OpenMlReader):
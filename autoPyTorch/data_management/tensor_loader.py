@@ -0,0 +1,92 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import math
+import numpy as np
+import scipy.sparse
+import torch
+
+
+class TensorBatchLoader():
+    """Iterate over batches of tensors that are completely held in memory (or on the device).
+
+    Replaces DataLoader(TensorDataset(X, Y), sampler=...) for in-memory tabular data. Instead of collating every batch
+    sample by sample, the indices are permuted once per epoch and each batch is taken from the tensors in one indexing operation.
+    """
+
+    def __init__(self, X, Y, indices=None, batch_size=1, shuffle=False, drop_last=False, device=None, pin_memory=False):
+        """Initialize the loader.
+
+        Arguments:
+            X {Tensor} -- The features.
+            Y {Tensor} -- The targets.
+
+        Keyword Arguments:
+            indices {array} -- Indices of the samples to iterate over. None to use all samples. (default: {None})
+            batch_size {int} -- The batch size. (default: {1})
+            shuffle {bool} -- Whether to permute the samples each epoch. (default: {False})
+            drop_last {bool} -- Whether to drop the last incomplete batch. (default: {False})
+            device {torch.device} -- Move the tensors to this device once, instead of every batch. None to keep them where they are. (default: {None})
+            pin_memory {bool} -- Pin the tensors in memory for faster transfer to the GPU. Ignored if device is given. (default: {False})
+        """
+        if device is not None:
+            X, Y = X.to(device), Y.to(device)
+        elif pin_memory and torch.cuda.is_available():
+            X, Y = X.pin_memory(), Y.pin_memory()
+
+        self.X = X
+        self.Y = Y
+        self.indices = None if indices is None else torch.as_tensor(indices, dtype=torch.long, device=Y.device)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+
+    def __len__(self):
+        num_samples = self.num_samples()
+        if self.drop_last:
+            return num_samples // self.batch_size
+        return int(math.ceil(num_samples / self.batch_size))
+
+    def __iter__(self):
+        indices = self.indices
+        if self.shuffle:
+            permutation = torch.randperm(self.num_samples()).to(self.Y.device)
+            indices = permutation if indices is None else indices[permutation]
+
+        for i in range(len(self)):
+            start, end = i * self.batch_size, (i + 1) * self.batch_size
+            yield self.get_batch(slice(start, end) if indices is None else indices[start:end])
+
+    def get_batch(self, batch_indices):
+        return self.X[batch_indices], self.Y[batch_indices]
+
+    def num_samples(self):
+        return self.Y.size(0) if self.indices is None else self.indices.size(0)
+
+
+class SparseBatchLoader(TensorBatchLoader):
+    """Iterate over batches of a sparse feature matrix. Only the rows of the current batch are densified."""
+
+    def __init__(self, X, Y, indices=None, batch_size=1, shuffle=False, drop_last=False, device=None, pin_memory=False):
+        """Initialize the loader.
+
+        Arguments:
+            X {scipy.sparse.spmatrix} -- The features.
+            Y {Tensor} -- The targets.
+
+        Keyword Arguments:
+            See TensorBatchLoader. Only the targets are moved to the device, the features stay on the host.
+        """
+        super(SparseBatchLoader, self).__init__(X=torch.zeros(0), Y=Y, indices=indices, batch_size=batch_size, shuffle=shuffle,
+            drop_last=drop_last, device=device, pin_memory=False)
+        self.X = scipy.sparse.csr_matrix(X, dtype=np.float32)
+        self.pin_memory = pin_memory and torch.cuda.is_available()
+
+    def get_batch(self, batch_indices):
+        if isinstance(batch_indices, torch.Tensor):
+            batch_indices = batch_indices.cpu().numpy()
+        X = torch.from_numpy(self.X[batch_indices].toarray()).to(self.Y.device)
+        if self.pin_memory and not X.is_cuda:
+            X = X.pin_memory()
+        return X, self.Y[batch_indices]
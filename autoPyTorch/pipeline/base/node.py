@@ -7,6 +7,8 @@ import gc
 import inspect
 import logging
 
+from autoPyTorch.pipeline.base.node_cache import fingerprint, is_data
+
 
 class Node():
     def __init__(self):
@@ -55,6 +57,16 @@ class Node():
         possible_keywords = [k for k in possible_keywords if k != 'self']
         return possible_keywords, defaults
 
+    def get_fit_cache_key(self, **kwargs):
+        """Get everything the fit output of this node depends on.
+        Nodes whose fit output is fully determined by these values can be served from a NodeCache.
+        Will be called with the same keywords as the fit method.
+
+        Returns:
+            object -- The values the fit output depends on. None if the fit output should not be cached.
+        """
+        return None
+
     def clean_fit_data(self):
         node = self
         
@@ -64,7 +76,7 @@ class Node():
             node.predict_output = None
             node = node.child_node
 
-    def fit_traverse(self, **kwargs):
+    def fit_traverse(self, node_cache=None, traversal_plan=None, collect_garbage=False, **kwargs):
         """
         Calls fit function of child nodes.
         The fit function can have different keyword arguments.
@@ -74,62 +86,82 @@ class Node():
         The fit method of each node returns a dictionary of values for keywords of follwing nodes.
 
         This method collects the results of each fit method call and calls the fit methods with the collected values.
+        If a NodeCache is given, the fit output of nodes that implement get_fit_cache_key() will be reused if possible.
+        If a traversal plan is given, the keywords of the nodes are not inspected again.
+        Garbage collection before and after the traversal is optional, Python collects garbage automatically.
         """
 
         self.clean_fit_data()
-        gc.collect()
+        if collect_garbage:
+            gc.collect()
 
         base = Node()
         base.fit_output = kwargs
+        base_step = TraversalStep(base, fit_keywords=[], predict_keywords=[])
 
-        # map all collected kwargs to node whose result the kwarg was
-        available_kwargs = {key: base for key in kwargs.keys()}
+        # map all collected kwargs to the step of the node whose result the kwarg was
+        available_kwargs = {key: base_step for key in kwargs.keys()}
 
-        node = self
         prev_node = base
+        fingerprints = dict()
 
-        while (node is not None):
+        for step in (traversal_plan if traversal_plan is not None else get_traversal_plan(self)):
+            node = step.node
             prev_node = node
-            # get necessary kwargs of current node
-            possible_keywords, defaults = node.get_fit_argspec()
-
-            last_required_keyword_index = len(possible_keywords) - len(defaults or [])
-            required_kwargs = dict()
 
             # get the values to the necessary keywords if available. Use default if not.
-            for index, keyword in enumerate(possible_keywords):
+            required_kwargs = dict()
+            for keyword, has_default, default in step.fit_keywords:
                 if (keyword in available_kwargs):
-                    required_kwargs[keyword] = available_kwargs[keyword].fit_output[keyword]
+                    required_kwargs[keyword] = available_kwargs[keyword].node.fit_output[keyword]
 
-                elif index >= last_required_keyword_index:
-                    required_kwargs[keyword] = defaults[index - last_required_keyword_index]
+                elif has_default:
+                    required_kwargs[keyword] = default
 
                 else:  # Neither default specified nor keyword available
                     print ("Available keywords:", sorted(available_kwargs.keys()))
                     raise ValueError('Node ' + str(type(node)) + ' requires keyword ' + str(keyword) + ' which is not available.')
 
+            # lookup fit output in cache
+            cache_key = None
+            if node_cache is not None and node_cache.is_enabled():
+                dependencies = node.get_fit_cache_key(**required_kwargs)
+                if dependencies is not None:
+                    cache_key = node_cache.get_key(str(type(node).__name__), dependencies, fingerprints)
+                if cache_key is not None:
+                    node.fit_output = node_cache.get(cache_key)
+
             if type(node) != Node:
-                self.logger.debug('Fit: ' + str(type(node).__name__))
+                self.logger.debug('Fit: ' + str(type(node).__name__) + (' (cached)' if node.fit_output is not None else ''))
 
             # call fit method
-            node.fit_output = node.fit(**required_kwargs)
+            if node.fit_output is None:
+                node.fit_output = node.fit(**required_kwargs)
+                if cache_key is not None and isinstance(node.fit_output, dict):
+                    node_cache.put(cache_key, node.fit_output)
             if (not isinstance(node.fit_output, dict)):
                 raise ValueError('Node ' + str(type(node)) + ' does not return a dictionary.')
 
+            # the outputs are determined by the cache key. No need to hash them again.
+            if cache_key is not None:
+                for keyword, value in node.fit_output.items():
+                    if is_data(value):
+                        fingerprints[id(value)] = (value, fingerprint((cache_key, keyword)))
+
             # collect resulting keyword-value pairs
             for keyword in node.fit_output.keys():
                 if keyword in available_kwargs:
                     # delete old values
-                    if (keyword not in available_kwargs[keyword].get_predict_argspec()[0]):
-                        del available_kwargs[keyword].fit_output[keyword]
-                available_kwargs[keyword] = node
-            node = node.child_node
+                    if (keyword not in available_kwargs[keyword].predict_keyword_names):
+                        del available_kwargs[keyword].node.fit_output[keyword]
+                available_kwargs[keyword] = step
 
-        gc.collect()
+        if collect_garbage:
+            gc.collect()
 
         return prev_node.fit_output
 
-    def predict_traverse(self, **kwargs):
+    def predict_traverse(self, traversal_plan=None, collect_garbage=False, **kwargs):
         """Calls predict function of child nodes.
         The predict function can have different keyword arguments.
         All keywords have to be either defined in kwargs, in a predict output of a parent node or in the nodes own fit output.
@@ -148,28 +180,24 @@ class Node():
         # map all collected kwargs to node whose whose result the kwarg was
         available_kwargs = {key: base for key in kwargs.keys()}
 
-        node = self
+        plan = traversal_plan if traversal_plan is not None else get_traversal_plan(self)
 
         # clear outputs
-        while (node is not None):
-            node.predict_output = None
-            node = node.child_node
+        for step in plan:
+            step.node.predict_output = None
 
-        gc.collect()
+        if collect_garbage:
+            gc.collect()
 
-        node = self
         prev_node = base
 
-        while (node is not None):
+        for step in plan:
+            node = step.node
             prev_node = node
-            # get necessary kwargs of current node
-            possible_keywords, defaults = node.get_predict_argspec()
-
-            last_required_keyword_index = len(possible_keywords) - len(defaults or [])
-            required_kwargs = dict()
 
             # get the values to the necessary keywords if available. Use fit result or default if not.
-            for index, keyword in enumerate(possible_keywords):
+            required_kwargs = dict()
+            for keyword, has_default, default in step.predict_keywords:
                 if (keyword in available_kwargs):
                     if (available_kwargs[keyword].predict_output is None):
                         print(str(type(available_kwargs[keyword])))
@@ -178,8 +206,8 @@ class Node():
                 elif (node.fit_output is not None and keyword in node.fit_output):
                     required_kwargs[keyword] = node.fit_output[keyword]
 
-                elif index >= last_required_keyword_index:
-                    required_kwargs[keyword] = defaults[index - last_required_keyword_index]
+                elif has_default:
+                    required_kwargs[keyword] = default
 
                 else:  # Neither default specified nor keyword available nor available in fit result of the node
                     raise ValueError('Node ' + str(type(node)) + ' requires keyword ' + keyword + ' which is not available.')
@@ -195,9 +223,9 @@ class Node():
                     if (available_kwargs[keyword].predict_output[keyword] is not None):
                         del available_kwargs[keyword].predict_output[keyword]
                 available_kwargs[keyword] = node
-            node = node.child_node
             
-        gc.collect()
+        if collect_garbage:
+            gc.collect()
 
         return prev_node.predict_output
 
@@ -209,3 +237,37 @@ class Node():
 
 
 
+
+
+class TraversalStep():
+    """A node of a traversal plan, with the resolved keywords of its fit and predict method"""
+
+    def __init__(self, node, fit_keywords=None, predict_keywords=None):
+        self.node = node
+        self.fit_keywords = fit_keywords if fit_keywords is not None else self.resolve_keywords(*node.get_fit_argspec())
+        self.predict_keywords = predict_keywords if predict_keywords is not None else self.resolve_keywords(*node.get_predict_argspec())
+        self.predict_keyword_names = set(keyword for keyword, _, _ in self.predict_keywords)
+
+    @staticmethod
+    def resolve_keywords(possible_keywords, defaults):
+        """Get a list of (keyword, has_default, default) from the keywords of a method and its defaults"""
+        defaults = defaults or []
+        last_required_keyword_index = len(possible_keywords) - len(defaults)
+        return [(keyword, index >= last_required_keyword_index, defaults[index - last_required_keyword_index] if index >= last_required_keyword_index else None)
+                for index, keyword in enumerate(possible_keywords)]
+
+
+def get_traversal_plan(node):
+    """Get the steps to traverse the pipeline from the given node on.
+
+    Arguments:
+        node {Node} -- The first node of the traversal.
+
+    Returns:
+        list -- A TraversalStep for the node and each of its successors.
+    """
+    plan = []
+    while node is not None:
+        plan.append(TraversalStep(node))
+        node = node.child_node
+    return plan
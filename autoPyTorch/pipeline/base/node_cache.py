@@ -0,0 +1,224 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import os
+import hashlib
+import pickle
+import logging
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+import scipy.sparse
+
+
+class NodeCache():
+    """Content addressed cache for the fit output of pipeline nodes.
+
+    Entries are keyed on the name of the node and a fingerprint of everything the fit output depends on.
+    There is a memory tier and an optional disk tier, both are bounded in size and evict the least recently used entries.
+    The disk tier survives forked worker processes (pynisher) and can be shared between workers on the same host.
+    """
+
+    def __init__(self, max_memory_mb=0, cache_dir=None, max_disk_mb=0):
+        """Initialize the cache.
+
+        Keyword Arguments:
+            max_memory_mb {float} -- Maximum size of the memory tier. 0 disables the memory tier. (default: {0})
+            cache_dir {str} -- Directory of the disk tier. None disables the disk tier. (default: {None})
+            max_disk_mb {float} -- Maximum size of the disk tier. 0 means no limit. (default: {0})
+        """
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024)
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+        self.cache_dir = cache_dir
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.logger = logging.getLogger('autonet')
+
+        if self.cache_dir is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def is_enabled(self):
+        return self.max_memory_bytes > 0 or self.cache_dir is not None
+
+    def get_key(self, node_name, dependencies, fingerprints=None):
+        """Compute the cache key of a node.
+
+        Arguments:
+            node_name {str} -- The name of the node.
+            dependencies {object} -- Everything the fit output of the node depends on.
+
+        Keyword Arguments:
+            fingerprints {dict} -- Memo of already computed fingerprints, see fingerprint(). (default: {None})
+
+        Returns:
+            str -- The cache key or None, if the dependencies can not be fingerprinted.
+        """
+        try:
+            return fingerprint((node_name, dependencies), fingerprints)
+        except Exception as e:
+            self.logger.debug("Unable to compute cache key for " + str(node_name) + ": " + str(e))
+            return None
+
+    def get(self, key):
+        """Get the cached fit output for the given key.
+
+        Arguments:
+            key {str} -- The cache key
+
+        Returns:
+            dict -- A fresh copy of the cached fit output or None, if key is not cached.
+        """
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return pickle.loads(self.memory[key])
+
+        if self.cache_dir is None:
+            return None
+
+        path = self._get_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        self._put_memory(key, data)
+        return pickle.loads(data)
+
+    def put(self, key, fit_output):
+        """Store the fit output of a node.
+
+        Arguments:
+            key {str} -- The cache key
+            fit_output {dict} -- The fit output of the node.
+        """
+        try:
+            data = pickle.dumps(fit_output, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            self.logger.debug("Unable to cache fit output: " + str(e))
+            return
+        self._put_memory(key, data)
+        self._put_disk(key, data)
+
+    def clear(self):
+        self.memory.clear()
+        self.memory_bytes = 0
+        if self.cache_dir is not None:
+            for path, _, _ in self._get_disk_entries():
+                _remove(path)
+
+    def _put_memory(self, key, data):
+        if len(data) > self.max_memory_bytes:
+            return
+        if key in self.memory:
+            self.memory_bytes -= len(self.memory.pop(key))
+        self.memory[key] = data
+        self.memory_bytes += len(data)
+
+        while self.memory_bytes > self.max_memory_bytes:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_bytes -= len(evicted)
+
+    def _put_disk(self, key, data):
+        if self.cache_dir is None or (self.max_disk_bytes > 0 and len(data) > self.max_disk_bytes):
+            return
+
+        # write to a temporary file first, so that concurrent readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._get_path(key))
+        except OSError as e:
+            self.logger.debug("Unable to write cache entry: " + str(e))
+            _remove(tmp_path)
+            return
+
+        if self.max_disk_bytes <= 0:
+            return
+        entries = sorted(self._get_disk_entries(), key=lambda e: e[2])
+        disk_bytes = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if disk_bytes <= self.max_disk_bytes:
+                break
+            _remove(path)
+            disk_bytes -= size
+
+    def _get_disk_entries(self):
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(".pkl"):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _get_path(self, key):
+        return os.path.join(self.cache_dir, key + ".pkl")
+
+
+def fingerprint(value, fingerprints=None):
+    """Compute a fingerprint of the content of the given value.
+
+    Arguments:
+        value {object} -- Arrays, sparse matrices, containers or any picklable object.
+
+    Keyword Arguments:
+        fingerprints {dict} -- Memo mapping id(array) to (array, fingerprint). Avoids hashing the same data twice. (default: {None})
+
+    Returns:
+        str -- The fingerprint
+    """
+    if fingerprints is not None and id(value) in fingerprints:
+        return fingerprints[id(value)][1]
+
+    h = hashlib.blake2b(digest_size=20)
+    h.update((type(value).__module__ + "." + type(value).__qualname__).encode())
+
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        h.update(repr(value).encode())
+    elif isinstance(value, np.ndarray):
+        h.update(str(value.dtype).encode() + str(value.shape).encode())
+        if value.dtype.hasobject:
+            h.update(pickle.dumps(value))
+        else:
+            h.update(np.ascontiguousarray(value).data)
+    elif scipy.sparse.issparse(value):
+        csr = value.tocsr()
+        for part in (csr.shape, csr.data, csr.indices, csr.indptr):
+            h.update(fingerprint(part).encode())
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            h.update(fingerprint(v, fingerprints).encode())
+    elif isinstance(value, dict):
+        for k in sorted(value.keys(), key=str):
+            h.update(fingerprint(k).encode() + fingerprint(value[k], fingerprints).encode())
+    elif isinstance(value, type):
+        h.update((value.__module__ + "." + value.__qualname__).encode())
+    elif hasattr(value, "__dict__"):
+        h.update(fingerprint(value.__dict__, fingerprints).encode())
+    else:
+        h.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    result = h.hexdigest()
+    if fingerprints is not None and is_data(value):
+        fingerprints[id(value)] = (value, result)
+    return result
+
+
+def is_data(value):
+    """Whether the fingerprint of the value is worth to be memorized."""
+    return isinstance(value, np.ndarray) or scipy.sparse.issparse(value)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -1,6 +1,6 @@
 import time
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
-from autoPyTorch.pipeline.base.node import Node
+from autoPyTorch.pipeline.base.node import Node, get_traversal_plan
 import ConfigSpace
 from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
 from autoPyTorch.utils.config.config_file_parser import ConfigFileParser
@@ -20,6 +20,8 @@ class Pipeline():
         self.root = Node()
         self._pipeline_nodes = dict()
         self._parent_pipeline = None
+        self._traversal_plan = None
+        self.node_cache = None
 
         # add all the given nodes to the pipeline
         last_node = self.root
@@ -57,10 +59,22 @@ class Pipeline():
 
 
     def fit_pipeline(self, **kwargs):
-        return self.root.fit_traverse(**kwargs)
+        pipeline_config = kwargs.get("pipeline_config") or dict()
+        return self.root.fit_traverse(node_cache=self.node_cache, traversal_plan=self.get_traversal_plan(),
+                                      collect_garbage=pipeline_config.get("collect_garbage", False), **kwargs)
 
     def predict_pipeline(self, **kwargs):
-        return self.root.predict_traverse(**kwargs)
+        return self.root.predict_traverse(traversal_plan=self.get_traversal_plan(), **kwargs)
+
+    def get_traversal_plan(self):
+        """Get the nodes of the pipeline with their resolved keywords. Computed once and reset when a node is added.
+
+        Returns:
+            list -- The TraversalSteps of the pipeline
+        """
+        if self._traversal_plan is None:
+            self._traversal_plan = get_traversal_plan(self.root)
+        return self._traversal_plan
 
     def add_pipeline_node(self, pipeline_node):
         """Add a node to the pipeline
@@ -76,6 +90,7 @@ class Pipeline():
             raise ValueError("You can only add PipelineElement subclasses to the pipeline")
         
         self._pipeline_nodes[pipeline_node.get_name()] = pipeline_node
+        self._traversal_plan = None
         pipeline_node.set_pipeline(self)
 
         if (self._parent_pipeline):
@@ -11,6 +11,7 @@ from autoPyTorch.utils.hyperparameter_search_space_update import parse_hyperpara
 
 from autoPyTorch.utils.config.config_option import ConfigOption, to_bool
 from hpbandster.core.result import json_result_logger
+from autoPyTorch.utils.results_index import results_index_logger
 
 class AutoNetSettings(PipelineNode):
     def __init__(self):
@@ -34,11 +35,13 @@ class AutoNetSettings(PipelineNode):
         hpbandster_logger.setLevel(level)
 
         autonet_logger.info("Start autonet with config:\n" + str(pipeline_config))
-        result_logger = []
+        result_loggers = [[]]
         if not refit:
-            result_logger = json_result_logger(directory=pipeline_config["result_logger_dir"], overwrite=True)
+            # the index is updated from the logs, it has to be called after the json logger
+            result_loggers = [json_result_logger(directory=pipeline_config["result_logger_dir"], overwrite=True),
+                              results_index_logger(directory=pipeline_config["result_logger_dir"], overwrite=True)]
         return { 'X_train': X_train, 'Y_train': Y_train, 'X_valid': X_valid, 'Y_valid': Y_valid,
-            'result_loggers':  [result_logger], 'shutdownables': []}
+            'result_loggers':  result_loggers, 'shutdownables': []}
 
     def get_pipeline_config_options(self):
         options = [
@@ -46,6 +49,8 @@ class AutoNetSettings(PipelineNode):
             ConfigOption(name='random_seed', default=lambda c: abs(hash(c["run_id"])) % (2 ** 32), type=int, depends=True, info="Make sure to specify the same seed for all workers."),
             ConfigOption(name='hyperparameter_search_space_updates', default=None, type=["directory", parse_hyperparameter_search_space_updates],
                 info="object of type HyperparameterSearchSpaceUpdates"),
-            ConfigOption("result_logger_dir", default=".", type="directory")
+            ConfigOption("result_logger_dir", default=".", type="directory"),
+            ConfigOption("collect_garbage", default=False, type=to_bool, choices=[True, False],
+                info="Run the garbage collector before and after each fit of the pipeline. Releases memory of previous evaluations earlier, but takes time.")
         ]
         return options
\ No newline at end of file
@@ -9,12 +9,12 @@ import numpy as np
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
 from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
 from autoPyTorch.utils.config_space_hyperparameter import get_hyperparameter, add_hyperparameter
+from autoPyTorch.utils.config.config_option import ConfigOption, to_bool
+from autoPyTorch.data_management.tensor_loader import TensorBatchLoader, SparseBatchLoader
 
 import torch
 import scipy.sparse
 from torch.utils.data import DataLoader, TensorDataset
-from torch.utils.data.dataset import Subset
-from torch.utils.data.sampler import SubsetRandomSampler
 
 
 class CreateDataLoader(PipelineNode):
@@ -26,21 +26,22 @@ class CreateDataLoader(PipelineNode):
 
         # prepare data
         drop_last = hyperparameter_config['batch_size'] < train_indices.shape[0]
-        X, Y = to_dense(X), to_dense(Y)
-        X, Y = torch.from_numpy(X).float(), torch.from_numpy(Y)
-
-        train_dataset = TensorDataset(X, Y)
-        train_loader = DataLoader(
-            dataset=train_dataset,
-            batch_size=hyperparameter_config['batch_size'], 
-            sampler=SubsetRandomSampler(train_indices),
-            shuffle=False,
-            drop_last=drop_last)
+        X, Y = to_tensor(X), torch.from_numpy(np.asarray(to_dense(Y)))
+        device, pin_memory = self.get_loader_device(pipeline_config)
+        loader_type = SparseBatchLoader if scipy.sparse.issparse(X) else TensorBatchLoader
+
+        train_loader = loader_type(X, Y,
+            indices=train_indices,
+            batch_size=hyperparameter_config['batch_size'],
+            shuffle=True,
+            drop_last=drop_last,
+            device=device,
+            pin_memory=pin_memory)
             
         valid_loader = None
         if valid_indices is not None:
-            valid_loader = DataLoader(
-                dataset=Subset(train_dataset, valid_indices),
+            valid_loader = loader_type(train_loader.X, train_loader.Y,
+                indices=valid_indices,
                 batch_size=hyperparameter_config['batch_size'],
                 shuffle=False,
                 drop_last=False)
@@ -48,13 +49,28 @@ class CreateDataLoader(PipelineNode):
         return {'train_loader': train_loader, 'valid_loader': valid_loader, 'batch_size': hyperparameter_config['batch_size']}
 
     def predict(self, pipeline_config, X, batch_size):
-        X = torch.from_numpy(to_dense(X)).float()
-        y_placeholder = torch.zeros(X.size()[0])
+        X = to_tensor(X)
+        y_placeholder = torch.zeros(X.shape[0])
 
-        predict_loader = DataLoader(TensorDataset(X.float(), y_placeholder), batch_size)
+        loader_type = SparseBatchLoader if scipy.sparse.issparse(X) else TensorBatchLoader
+        predict_loader = loader_type(X, y_placeholder, batch_size=batch_size)
 
         return {'predict_loader': predict_loader}
 
+    def get_loader_device(self, pipeline_config):
+        """Get the device the data should be moved to once, and whether it should be pinned otherwise.
+        
+        Arguments:
+            pipeline_config {dict} -- The user specified configuration of the pipeline
+        
+        Returns:
+            tuple -- The device (or None) and whether to pin memory
+        """
+        use_cuda = pipeline_config.get("cuda", False) and torch.cuda.is_available()
+        if use_cuda and pipeline_config["dataloader_data_on_device"]:
+            return torch.device("cuda:0"), False
+        return None, use_cuda
+
     def get_hyperparameter_search_space(self, dataset_info=None, **pipeline_config):
         import ConfigSpace
         import ConfigSpace.hyperparameters as CSH
@@ -67,7 +83,20 @@ class CreateDataLoader(PipelineNode):
         self._check_search_space_updates('batch_size')
         return cs
 
-    
+    def get_pipeline_config_options(self):
+        options = [
+            ConfigOption("dataloader_data_on_device", default=False, type=to_bool, choices=[True, False],
+                info="Keep the whole dataset on the GPU instead of copying every batch. Only used if cuda is enabled."),
+        ]
+        return options
+
+
+def to_tensor(matrix):
+    """Convert dense features to a float tensor. Sparse features are kept sparse and densified batch-wise by the loader."""
+    if scipy.sparse.issparse(matrix):
+        return matrix
+    return torch.from_numpy(np.asarray(matrix)).float()
+
 def to_dense(matrix):
     if (matrix is not None and scipy.sparse.issparse(matrix)):
         return matrix.todense()
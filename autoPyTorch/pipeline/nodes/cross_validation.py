@@ -12,14 +12,19 @@ import time
 import math
 import inspect
 import sys
+import os
+import traceback
+import multiprocessing
+import multiprocessing.connection
 from copy import deepcopy
 
 from sklearn.model_selection import BaseCrossValidator
 from autoPyTorch.pipeline.base.sub_pipeline_node import SubPipelineNode
 from autoPyTorch.pipeline.base.pipeline import Pipeline
+from autoPyTorch.pipeline.base.node_cache import NodeCache
 
 from autoPyTorch.utils.config.config_option import ConfigOption, to_bool, to_dict
-from autoPyTorch.components.training.budget_types import BudgetTypeTime
+from autoPyTorch.components.training.budget_types import BudgetTypeTime, BudgetTypeTrainingTime
 
 import time
 
@@ -47,10 +52,12 @@ class CrossValidation(SubPipelineNode):
 
         self.cross_validators = {'none': None}
         self.cross_validators_adjust_y = dict()
+        self.node_cache = None
+        self.node_cache_settings = None
 
 
     def fit(self, hyperparameter_config, pipeline_config, X_train, Y_train, X_valid, Y_valid, budget, budget_type, optimize_start_time,
-            refit, rescore, dataset_info, hyperparameter_config_id):
+            refit, rescore, dataset_info, hyperparameter_config_id, incumbent_losses=None):
         """Perform cross validation.
         
         Arguments:
@@ -66,6 +73,9 @@ class CrossValidation(SubPipelineNode):
             refit {bool} -- Whether we refit currently or not.
             rescore {bool} -- Whether we refit in order to get the exact score of a hp-config during training.
             dataset_info {DatasetInfo} -- Object containing information about the dataset.
+
+        Keyword Arguments:
+            incumbent_losses {list} -- (budget, loss) pairs of the best loss the optimization algorithm has seen on each budget. (default: {None})
         
         Raises:
             Exception: Not a single CV split could be finished.
@@ -76,39 +86,59 @@ class CrossValidation(SubPipelineNode):
         logger = logging.getLogger('autonet')
         loss = 0
         infos = []
+        incumbent_loss = self.get_incumbent_loss(incumbent_losses, budget)
+        max_budget_reached = budget >= pipeline_config.get("max_budget", float("inf"))
+        self.sub_pipeline.node_cache = self.get_node_cache(pipeline_config)
         X, Y, num_cv_splits, cv_splits, loss_penalty, budget = self.initialize_cross_validation(
             pipeline_config=pipeline_config, budget=budget, X_train=X_train, Y_train=Y_train, X_valid=X_valid, Y_valid=Y_valid,
             dataset_info=dataset_info, refit=(refit and not rescore), logger=logger)
         
         # adjust budget in case of budget type time
         cv_start_time = time.time()
-        if budget_type == BudgetTypeTime:
+        if issubclass(budget_type, BudgetTypeTime):
             budget = budget - (cv_start_time - optimize_start_time)
 
         # start cross validation
         logger.debug("Took " + str(time.time() - optimize_start_time) + " s to initialize optimization.")
+        num_parallel_workers = self.get_num_parallel_workers(pipeline_config=pipeline_config, num_cv_splits=num_cv_splits, logger=logger)
         all_sub_pipeline_kwargs = dict()
-        additional_results = dict()
+        results = dict()
         for i, split_indices in enumerate(cv_splits):
-            logger.info("[AutoNet] CV split " + str(i) + " of " + str(num_cv_splits))
+
+            # the budget of splits running in parallel is set when they are started
+            if num_parallel_workers > 1:
+                cur_budget, budget_type_kwargs = None, dict()
+            else:
+                logger.info("[AutoNet] CV split " + str(i) + " of " + str(num_cv_splits))
+                cur_budget, budget_type_kwargs = self.get_current_budget(cv_index=i, budget=budget, budget_type=budget_type,
+                    cv_start_time=cv_start_time, num_cv_splits=num_cv_splits, logger=logger)
 
             # fit training pipeline
-            cur_budget = self.get_current_budget(cv_index=i, budget=budget, budget_type=budget_type,
-                cv_start_time=cv_start_time, num_cv_splits=num_cv_splits, logger=logger)
             sub_pipeline_kwargs = {
                 "hyperparameter_config": hyperparameter_config, "pipeline_config": pipeline_config,
-                "budget": cur_budget, "training_techniques": [budget_type()],
+                "budget": cur_budget, "training_techniques": [budget_type(**budget_type_kwargs)],
                 "fit_start_time": time.time(),
                 "train_indices": split_indices[0],
                 "valid_indices": split_indices[1],
                 "dataset_info": deepcopy(dataset_info),
                 "refit": refit,
                 "loss_penalty": loss_penalty,
-                "hyperparameter_config_id": hyperparameter_config_id}
+                "hyperparameter_config_id": hyperparameter_config_id,
+                "incumbent_loss": incumbent_loss,
+                "max_budget_reached": max_budget_reached}
             all_sub_pipeline_kwargs[i] = deepcopy(sub_pipeline_kwargs)
-            result = self.sub_pipeline.fit_pipeline(X=X, Y=Y, **sub_pipeline_kwargs)
-            logger.info("[AutoNet] Done with current split!")
+            if num_parallel_workers <= 1:
+                results[i] = self.sub_pipeline.fit_pipeline(X=X, Y=Y, **sub_pipeline_kwargs)
+                logger.info("[AutoNet] Done with current split!")
 
+        if num_parallel_workers > 1:
+            results = self.fit_splits_in_parallel(X=X, Y=Y, all_sub_pipeline_kwargs=all_sub_pipeline_kwargs,
+                num_parallel_workers=num_parallel_workers, budget=budget, budget_type=budget_type, cv_start_time=cv_start_time, logger=logger)
+
+        # collect results in the order of the splits
+        additional_results = dict()
+        for i in sorted(results.keys()):
+            result = results[i]
             if result is not None:
                 loss += result['loss']
                 infos.append(result['info'])
@@ -148,13 +178,141 @@ class CrossValidation(SubPipelineNode):
                 info='Specify minimum budget for cv. If budget is smaller use specified validation split.'),
             ConfigOption('shuffle', default=True, type=to_bool, choices=[True, False],
                 info='Shuffle train and validation set'),
+            ConfigOption("cv_parallel_workers", default=1, type=int,
+                info="Number of processes used to fit the cv splits in parallel. The torch_num_threads are divided among them."),
+            ConfigOption("preprocessing_cache_memory_mb", default=0, type=float,
+                info="Size of the in-memory cache for fitted preprocessing nodes, shared across evaluations of the same worker. " +
+                     "0 to disable. Note that the memory cache is lost if the evaluation runs in a pynisher subprocess."),
+            ConfigOption("preprocessing_cache_dir", default=None, type="directory",
+                info="Directory for the on-disk cache of fitted preprocessing nodes. Can be shared by all workers on a host. None to disable."),
+            ConfigOption("preprocessing_cache_disk_mb", default=4096, type=float,
+                info="Maximum size of the on-disk preprocessing cache. 0 for no limit."),
         ]
         return options
 
+    def get_node_cache(self, pipeline_config):
+        """Get the cache for the fit output of the preprocessing nodes in the sub pipeline.
+        The cache is kept across calls to fit, as long as the configuration does not change.
+        
+        Arguments:
+            pipeline_config {dict} -- The user specified configuration of the pipeline
+        
+        Returns:
+            NodeCache -- The cache or None if caching is disabled.
+        """
+        settings = (pipeline_config["preprocessing_cache_memory_mb"], pipeline_config["preprocessing_cache_dir"],
+                    pipeline_config["preprocessing_cache_disk_mb"])
+        if settings[0] <= 0 and settings[1] is None:
+            return None
+        if self.node_cache is None or self.node_cache_settings != settings:
+            self.node_cache = NodeCache(max_memory_mb=settings[0], cache_dir=settings[1], max_disk_mb=settings[2])
+            self.node_cache_settings = settings
+        return self.node_cache
+
     def clean_fit_data(self):
         super(CrossValidation, self).clean_fit_data()
         self.sub_pipeline.root.clean_fit_data()
     
+    def get_num_parallel_workers(self, pipeline_config, num_cv_splits, logger):
+        """Get the number of processes to fit the cv splits with.
+        
+        Arguments:
+            pipeline_config {dict} -- The user specified configuration of the pipeline
+            num_cv_splits {int} -- total number of cv splits.
+            logger {Logger} -- A logger to log stuff on the console.
+        
+        Returns:
+            int -- The number of processes. 1 if the splits should be fitted sequentially.
+        """
+        num_parallel_workers = min(pipeline_config["cv_parallel_workers"], num_cv_splits)
+        if num_parallel_workers <= 1:
+            return 1
+        if "fork" not in multiprocessing.get_all_start_methods():
+            logger.warning("Fitting cv splits in parallel requires the fork start method. Continue sequentially.")
+            return 1
+        if multiprocessing.current_process().daemon:
+            logger.warning("Daemonic processes are not allowed to fit cv splits in parallel. Continue sequentially.")
+            return 1
+        if torch.cuda.is_available() and torch.cuda.is_initialized():
+            logger.warning("Can not fork after CUDA has been initialized. Continue fitting cv splits sequentially.")
+            return 1
+        return num_parallel_workers
+
+    def fit_splits_in_parallel(self, X, Y, all_sub_pipeline_kwargs, num_parallel_workers, budget, budget_type, cv_start_time, logger):
+        """Fit a clone of the sub pipeline for each cv split in a separate process.
+        
+        Arguments:
+            X {array} -- The data
+            Y {array} -- The data
+            all_sub_pipeline_kwargs {dict} -- Mapping from cv index to kwargs with which the subpipeline should be called.
+                                              The budget and the budget type are set when the split is started.
+            num_parallel_workers {int} -- Maximum number of processes running at the same time.
+            budget {float} -- The budget of all splits.
+            budget_type {BaseTrainingTechnique} -- The type of budget.
+            cv_start_time {float} -- Start time of cross validation.
+            logger {Logger} -- A logger to log stuff on the console.
+        
+        Raises:
+            Exception: Fitting a split failed.
+        
+        Returns:
+            dict -- Mapping from cv index to the result of the sub pipeline
+        """
+        context = multiprocessing.get_context("fork")
+        pending = sorted(all_sub_pipeline_kwargs.keys())
+        running = dict()
+        results = dict()
+
+        # divide the threads among the processes
+        num_threads = all_sub_pipeline_kwargs[pending[0]]["pipeline_config"].get("torch_num_threads", -1)
+        num_threads = num_threads if num_threads > 0 else (os.cpu_count() or 1)
+        num_threads = max(1, num_threads // num_parallel_workers)
+
+        try:
+            while pending or running:
+                while pending and len(running) < num_parallel_workers:
+                    i = pending.pop(0)
+                    logger.info("[AutoNet] CV split " + str(i) + " of " + str(len(all_sub_pipeline_kwargs)) + " started in parallel")
+                    cur_budget, budget_type_kwargs = self.get_parallel_budget(num_started=len(results) + len(running), budget=budget,
+                        budget_type=budget_type, cv_start_time=cv_start_time, num_cv_splits=len(all_sub_pipeline_kwargs),
+                        num_parallel_workers=num_parallel_workers, logger=logger)
+                    all_sub_pipeline_kwargs[i]["budget"] = cur_budget
+                    all_sub_pipeline_kwargs[i]["training_techniques"] = [budget_type(**budget_type_kwargs)]
+
+                    sub_pipeline = self.sub_pipeline.clone()
+                    sub_pipeline.node_cache = self.sub_pipeline.node_cache
+                    sub_pipeline_kwargs = dict(all_sub_pipeline_kwargs[i])
+                    sub_pipeline_kwargs["pipeline_config"] = dict(sub_pipeline_kwargs["pipeline_config"], torch_num_threads=num_threads)
+
+                    receiver, sender = context.Pipe(duplex=False)
+                    process = context.Process(target=fit_split, args=(sub_pipeline, X, Y, sub_pipeline_kwargs, sender))
+                    process.start()
+                    sender.close()
+                    running[i] = (process, receiver)
+
+                ready = multiprocessing.connection.wait([receiver for _, receiver in running.values()])
+                for i in [i for i, (_, receiver) in running.items() if receiver in ready]:
+                    process, receiver = running.pop(i)
+                    try:
+                        result, error = receiver.recv()
+                    except EOFError:
+                        process.join()
+                        raise Exception("CV split " + str(i) + " terminated with exit code " + str(process.exitcode))
+                    finally:
+                        receiver.close()
+                    process.join()
+
+                    if error is not None:
+                        raise Exception("Exception in CV split " + str(i) + ":\n" + error)
+                    results[i] = result
+                    logger.info("[AutoNet] Done with CV split " + str(i) + "!")
+        finally:
+            for process, receiver in running.values():
+                process.terminate()
+                process.join()
+                receiver.close()
+        return results
+
     def initialize_cross_validation(self, pipeline_config, budget, X_train, Y_train, X_valid, Y_valid, dataset_info, refit, logger):
         """Initialize CV by computing split indices, 
         
@@ -249,20 +407,56 @@ class CrossValidation(SubPipelineNode):
             logger {Logger} -- A logger to log stuff on the console.
         
         Returns:
-            float -- The budget of the current
+            tuple -- The budget of the current split and the keyword arguments for the budget type.
         """
         # adjust budget in case of budget type time
-        if budget_type == BudgetTypeTime:
+        if issubclass(budget_type, BudgetTypeTime):
             remaining_budget = budget - (time.time() - cv_start_time)
             should_be_remaining_budget = (budget - cv_index * budget / num_cv_splits)
-            budget_type.compensate = max(10, should_be_remaining_budget - remaining_budget)
             cur_budget = remaining_budget / (num_cv_splits - cv_index)
             logger.info("Reduced initial budget " + str(budget / num_cv_splits) + " to cv budget " + 
                                 str(cur_budget) + " compensate for " + str(should_be_remaining_budget - remaining_budget))
-        else:
-            cur_budget = budget / num_cv_splits
-        return cur_budget
-    
+            return cur_budget, {"compensate": max(10, should_be_remaining_budget - remaining_budget)}
+        return budget / num_cv_splits, dict()
+
+    def get_parallel_budget(self, num_started, budget, budget_type, cv_start_time, num_cv_splits, num_parallel_workers, logger):
+        """Get the budget for a CV split that is fitted in parallel.
+        Splits running at the same time do not share the wall clock time, the time budget is divided among the rounds of parallel splits.
+        
+        Arguments:
+            num_started {int} -- The number of splits that have been started before.
+            budget {float} -- The budget of all splits.
+            budget_type {BaseTrainingTechnique} -- The type of budget.
+            cv_start_time {float} -- Start time of cross validation.
+            num_cv_splits {int} -- total number of cv splits.
+            num_parallel_workers {int} -- Maximum number of processes running at the same time.
+            logger {Logger} -- A logger to log stuff on the console.
+        
+        Returns:
+            tuple -- The budget of the split and the keyword arguments for the budget type.
+        """
+        num_rounds = int(math.ceil(num_cv_splits / num_parallel_workers))
+        if issubclass(budget_type, BudgetTypeTime):
+            return self.get_current_budget(cv_index=num_started // num_parallel_workers, budget=budget, budget_type=budget_type,
+                cv_start_time=cv_start_time, num_cv_splits=num_rounds, logger=logger)
+        if issubclass(budget_type, BudgetTypeTrainingTime):
+            return budget / num_rounds, dict()
+        return budget / num_cv_splits, dict()
+
+    @staticmethod
+    def get_incumbent_loss(incumbent_losses, budget):
+        """Get the best loss the optimization algorithm has seen on the given budget.
+
+        Arguments:
+            incumbent_losses {list} -- (budget, loss) pairs. May be None.
+            budget {float} -- The budget.
+
+        Returns:
+            float -- The loss of the incumbent. None if there is no result on this budget yet.
+        """
+        losses = [loss for b, loss in (incumbent_losses or []) if np.isclose(b, budget)]
+        return min(losses) if losses else None
+
     def process_additional_results(self, additional_results, all_sub_pipeline_kwargs, X, Y, logger):
         """Process additional results, like predictions for ensemble for example.
         The data of additional results will be combined across the splits.
@@ -284,7 +478,7 @@ class CrossValidation(SubPipelineNode):
         data = dict()
         result = dict()
         logger.info("Process %s additional result(s)" % len(additional_results))
-        for split in additional_results.keys():
+        for split in sorted(additional_results.keys()):
             for name in additional_results[split].keys():
                 combinators[name] = additional_results[split][name]["combinator"]
                 if name not in data:
@@ -357,3 +551,14 @@ class CrossValidation(SubPipelineNode):
 
 def identity(x):
     return x
+
+def fit_split(sub_pipeline, X, Y, sub_pipeline_kwargs, connection):
+    """Fit the sub pipeline on a single split and send the result through the connection. Target of a forked process."""
+    try:
+        sub_pipeline_kwargs["fit_start_time"] = time.time()
+        result = sub_pipeline.fit_pipeline(X=X, Y=Y, **sub_pipeline_kwargs)
+        connection.send((result, None))
+    except Exception:
+        connection.send((None, traceback.format_exc()))
+    finally:
+        connection.close()
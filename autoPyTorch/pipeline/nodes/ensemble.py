@@ -5,13 +5,13 @@ __license__ = "BSD"
 import os
 
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
-from autoPyTorch.utils.config.config_option import ConfigOption
+from autoPyTorch.utils.config.config_option import ConfigOption, to_bool
 from autoPyTorch.pipeline.nodes.metric_selector import MetricSelector, AutoNetMetric, no_transform
 from autoPyTorch.pipeline.nodes import OneHotEncoding, OptimizationAlgorithm
 from autoPyTorch.pipeline.nodes.metric_selector import AutoNetMetric
 from autoPyTorch.utils.ensemble import build_ensemble, read_ensemble_prediction_file, combine_predictions, combine_test_predictions, \
     ensemble_logger, start_server
-from hpbandster.core.result import logged_results_to_HBS_result
+from autoPyTorch.utils.results_index import ResultsIndex
 import json
 import asyncio
 from hpbandster.core.nameserver import nic_name_to_host
@@ -125,7 +125,7 @@ class BuildEnsemble(PipelineNode):
         filename = os.path.join(pipeline_config["result_logger_dir"], 'predictions_for_ensemble.npy')
         optimize_metric = self.pipeline[MetricSelector.get_name()].metrics[pipeline_config["optimize_metric"]]
         y_transform = self.pipeline[OneHotEncoding.get_name()].complete_y_tranformation
-        result = logged_results_to_HBS_result(pipeline_config["result_logger_dir"])
+        result = ResultsIndex(pipeline_config["result_logger_dir"])
 
         all_predictions, labels, model_identifiers, _ = read_ensemble_prediction_file(filename=filename, y_transform=y_transform)
         ensemble_selection, ensemble_configs = build_ensemble(result=result,
@@ -148,7 +148,10 @@ class BuildEnsemble(PipelineNode):
         options = [
             ConfigOption("ensemble_size", default=50, type=int, info="Build a ensemble of well performing autonet configurations. 0 to disable."),
             ConfigOption("ensemble_only_consider_n_best", default=30, type=int, info="Only consider the n best models for ensemble building."),
-            ConfigOption("ensemble_sorted_initialization_n_best", default=0, type=int, info="Initialize ensemble with n best models.")
+            ConfigOption("ensemble_sorted_initialization_n_best", default=0, type=int, info="Initialize ensemble with n best models."),
+            ConfigOption("ensemble_predict_num_threads", default=1, type=int, info="Number of threads to evaluate the networks of the ensemble that can not be stacked."),
+            ConfigOption("ensemble_stack_networks", default=True, type=to_bool, choices=[True, False],
+                info="Evaluate networks of the ensemble with the same architecture in a single vectorized forward pass.")
         ]
         return options
 
@@ -59,6 +59,8 @@ class AutoNetSettingsNoShuffle(PipelineNode):
             ConfigOption(name='random_seed', default=lambda c: abs(hash(c["run_id"])) % (2 ** 32), type=int, depends=True, info="Make sure to specify the same seed for all workers."),
             ConfigOption(name='hyperparameter_search_space_updates', default=None, type=["directory", parse_hyperparameter_search_space_updates],
                 info="object of type HyperparameterSearchSpaceUpdates"),
+            ConfigOption("collect_garbage", default=False, type=to_bool, choices=[True, False],
+                info="Run the garbage collector before and after each fit of the pipeline. Releases memory of previous evaluations earlier, but takes time.")
         ]
         return options
 
@@ -12,8 +12,7 @@ import autoPyTorch.utils.thread_read_write as thread_read_write
 import datetime
 
 from hpbandster.core.nameserver import NameServer, nic_name_to_host
-from hpbandster.core.result import (json_result_logger,
-                                    logged_results_to_HBS_result)
+from hpbandster.core.result import json_result_logger
 
 from autoPyTorch.pipeline.base.sub_pipeline_node import SubPipelineNode
 from autoPyTorch.pipeline.base.pipeline import Pipeline
@@ -29,6 +28,7 @@ import copy
 from autoPyTorch.utils.modify_config_space import remove_constant_hyperparameter
 
 from autoPyTorch.utils.loggers import combined_logger, bohb_logger, tensorboard_logger
+from autoPyTorch.utils.results_index import ResultsIndex, results_index_logger
 
 import pprint
 
@@ -230,15 +230,14 @@ class OptimizationAlgorithmNoTimeLimit(SubPipelineNode):
 
 
     def parse_results(self, result_logger_dir):
-        res = logged_results_to_HBS_result(result_logger_dir)
-        id2config = res.get_id2config_mapping()
+        res = ResultsIndex(result_logger_dir)
         incumbent_trajectory = res.get_incumbent_trajectory(bigger_is_better=False, non_decreasing_budget=False)
         
         if (len(incumbent_trajectory['config_ids']) == 0):
             return dict()
         
         final_config_id = incumbent_trajectory['config_ids'][-1]
-        return incumbent_trajectory['losses'][-1], id2config[final_config_id]['config'], incumbent_trajectory['budgets'][-1]
+        return incumbent_trajectory['losses'][-1], res.get_config(final_config_id)['config'], incumbent_trajectory['budgets'][-1]
 
 
     def run_worker(self, pipeline_config, constant_hyperparameter, run_id, task_id, ns_credentials_dir, network_interface_name,
@@ -343,7 +342,8 @@ class OptimizationAlgorithmNoTimeLimit(SubPipelineNode):
                 'info': res['info'] if res else dict()}
 
     def get_result_logger(self, pipeline_config, constant_hyperparameter):
-        loggers = [bohb_logger(constant_hyperparameter=constant_hyperparameter, directory=pipeline_config["result_logger_dir"], overwrite=True)]
+        loggers = [bohb_logger(constant_hyperparameter=constant_hyperparameter, directory=pipeline_config["result_logger_dir"], overwrite=True),
+                   results_index_logger(directory=pipeline_config["result_logger_dir"], overwrite=True)]
         if pipeline_config['use_tensorboard_logger']:
             loggers.append(tensorboard_logger(pipeline_config, constant_hyperparameter, pipeline_config['global_results_dir']))
         return combined_logger(*loggers)
@@ -108,6 +108,8 @@ class SimpleTrainNode(PipelineNode):
             config_id=config_id,
             checkpoint_path=checkpoint_path if pipeline_config['save_checkpoints'] else None,
             images_to_plot=tensorboard_logging * pipeline_config['tensorboard_images_count'])
+        if "mixed_precision" in self.training_techniques and (pipeline_config["training_precision"] != "fp32" or pipeline_config["channels_last"]):
+            self.training_techniques["mixed_precision"]().set_up(trainer=trainer, pipeline_config=pipeline_config)
 
         model_params = self.count_parameters(network)
 
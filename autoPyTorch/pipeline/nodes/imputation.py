@@ -5,8 +5,7 @@ import scipy.sparse
 import ConfigSpace
 import ConfigSpace.hyperparameters as CSH
         
-from sklearn.impute import SimpleImputer
-from sklearn.compose import ColumnTransformer
+from autoPyTorch.components.preprocessing.column_transforms import ColumnImputer
 
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
 
@@ -30,17 +29,16 @@ class Imputation(PipelineNode):
 
         strategy = hyperparameter_config['strategy']
         fill_value = int(np.nanmax(X)) + 1 if not dataset_info.is_sparse else 0
-        numerical_imputer = SimpleImputer(strategy=strategy, copy=False)
-        categorical_imputer = SimpleImputer(strategy='constant', copy=False, fill_value=fill_value)
-        transformer = ColumnTransformer(
-            transformers=[('numerical_imputer', numerical_imputer, [i for i, c in enumerate(dataset_info.categorical_features) if not c]),
-                          ('categorical_imputer', categorical_imputer,  [i for i, c in enumerate(dataset_info.categorical_features) if c])])
-        transformer.fit(X[train_indices])
-        X = transformer.transform(X)
+        transformer = ColumnImputer(strategy=strategy, categorical_features=dataset_info.categorical_features, fill_value=fill_value)
+        X = transformer.fit_transform(X, train_indices)
         
         dataset_info.categorical_features = sorted(dataset_info.categorical_features)
         return { 'X': X, 'imputation_preprocessor': transformer, 'dataset_info': dataset_info , 'all_nan_columns': all_nan}
 
+    def get_fit_cache_key(self, hyperparameter_config, X, train_indices, dataset_info):
+        hyperparameter_config = ConfigWrapper(self.get_name(), hyperparameter_config)
+        return (hyperparameter_config.get_dictionary(), X, train_indices, dataset_info)
+
 
     def predict(self, X, imputation_preprocessor, all_nan_columns):
         if imputation_preprocessor is None:
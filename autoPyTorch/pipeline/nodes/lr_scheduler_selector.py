@@ -10,7 +10,7 @@ from autoPyTorch.components.lr_scheduler.lr_schedulers import AutoNetLearningRat
 import ConfigSpace
 import ConfigSpace.hyperparameters as CSH
 from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
-from autoPyTorch.utils.config.config_option import ConfigOption
+from autoPyTorch.utils.config.config_option import ConfigOption, to_bool
 from autoPyTorch.components.training.lr_scheduling import LrScheduling
 
 class LearningrateSchedulerSelector(PipelineNode):
@@ -20,14 +20,14 @@ class LearningrateSchedulerSelector(PipelineNode):
         self.lr_scheduler = dict()
         self.lr_scheduler_settings = dict()
 
-    def fit(self, hyperparameter_config, optimizer, training_techniques):
+    def fit(self, hyperparameter_config, pipeline_config, optimizer, training_techniques):
         config = ConfigWrapper(self.get_name(), hyperparameter_config)
 
         lr_scheduler_type = self.lr_scheduler[config["lr_scheduler"]]
         lr_scheduler_config = ConfigWrapper(config["lr_scheduler"], config)
         lr_scheduler_settings = self.lr_scheduler_settings[config["lr_scheduler"]]
         lr_scheduling = LrScheduling(training_components={"lr_scheduler": lr_scheduler_type(optimizer, lr_scheduler_config)},
-                                     **lr_scheduler_settings)
+                                     fit_to_budget=pipeline_config["fit_lr_schedule_to_budget"], **lr_scheduler_settings)
         return {'training_techniques': [lr_scheduling] + training_techniques}
 
     def add_lr_scheduler(self, name, lr_scheduler_type, lr_step_after_batch=False, lr_step_with_time=False, allow_snapshot=True):
@@ -65,5 +65,7 @@ class LearningrateSchedulerSelector(PipelineNode):
     def get_pipeline_config_options(self):
         options = [
             ConfigOption(name="lr_scheduler", default=list(self.lr_scheduler.keys()), type=str, list=True, choices=list(self.lr_scheduler.keys())),
+            ConfigOption(name="fit_lr_schedule_to_budget", default=True, type=to_bool, choices=[True, False],
+                info="Shorten schedules like cosine annealing to the number of epochs that are planned to fit into the budget."),
         ]
         return options
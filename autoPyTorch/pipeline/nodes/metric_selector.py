@@ -4,8 +4,9 @@ __license__ = "BSD"
 
 
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
-from autoPyTorch.utils.config.config_option import ConfigOption
+from autoPyTorch.utils.config.config_option import ConfigOption, to_bool
 
+import copy
 import torch
 import numpy as np
 
@@ -17,16 +18,24 @@ class MetricSelector(PipelineNode):
         self.default_optimize_metric = None
 
     def fit(self, pipeline_config):
-        optimize_metric = self.metrics[pipeline_config["optimize_metric"]]
-        additional_metrics = [self.metrics[metric] for metric in pipeline_config["additional_metrics"] if metric != pipeline_config["optimize_metric"]]
+        optimize_metric = self.get_metric(pipeline_config["optimize_metric"], pipeline_config)
+        additional_metrics = [self.get_metric(metric, pipeline_config) for metric in pipeline_config["additional_metrics"] if metric != pipeline_config["optimize_metric"]]
 
         return {'optimize_metric': optimize_metric, 'additional_metrics': additional_metrics}
 
     def predict(self, optimize_metric):
         return { 'optimize_metric': optimize_metric }
 
+    def get_metric(self, name, pipeline_config):
+        metric = self.metrics[name]
+        if pipeline_config["exact_streaming_metrics"]:
+            metric = copy.copy(metric)
+            metric.exact_streaming = True
+        return metric
+
     def add_metric(self, name, metric, loss_transform=False, 
-                   requires_target_class_labels=False, is_default_optimize_metric=False):
+                   requires_target_class_labels=False, is_default_optimize_metric=False, batched_metric=None,
+                   streaming_metric=None):
         """Add a metric, this metric has to be a function that takes to arguments y_true and y_predict
         
         Arguments:
@@ -34,6 +43,9 @@ class MetricSelector(PipelineNode):
             loss_transform {callable / boolean} -- transform metric value to minimizable loss. If True: loss = 1 - metric_value
             metric {function} -- metric function takes y_true and y_pred
             is_default_optimize_metric {bool} -- should the given metric be the default train metric if not specified in config
+            batched_metric {function} -- optional vectorized version of metric. Takes y_true and y_pred with an additional leading axis
+                                         and returns one value per entry of that axis. Used e.g. to score many ensemble candidates at once.
+            streaming_metric {type} -- optional StreamingMetric class computing the metric batch by batch in constant memory.
         """
 
         if (not hasattr(metric, '__call__')):
@@ -46,7 +58,9 @@ class MetricSelector(PipelineNode):
         self.metrics[name] = AutoNetMetric(name=name,
                                            metric=metric,
                                            loss_transform=loss_transform,
-                                           ohe_transform=ohe_transform)
+                                           ohe_transform=ohe_transform,
+                                           batched_metric=batched_metric,
+                                           streaming_metric=streaming_metric)
 
         if (not self.default_optimize_metric or is_default_optimize_metric):
             self.default_optimize_metric = name
@@ -63,7 +77,10 @@ class MetricSelector(PipelineNode):
         options = [
             ConfigOption(name="optimize_metric", default=self.default_optimize_metric, type=str, choices=list(self.metrics.keys()),
                 info="This is the meta train metric BOHB will try to optimize."),
-            ConfigOption(name="additional_metrics", default=[], type=str, list=True, choices=list(self.metrics.keys()))
+            ConfigOption(name="additional_metrics", default=[], type=str, list=True, choices=list(self.metrics.keys())),
+            ConfigOption(name="exact_streaming_metrics", default=False, type=to_bool, choices=[True, False],
+                info="Compute metrics that are approximated when evaluating batch by batch (e.g. AUC) exactly. "
+                     "This keeps the predictions of all samples in memory.")
         ]
         return options
 
@@ -82,11 +99,21 @@ def ensure_numpy(y):
 def undo_ohe(y):
     if len(y.shape) == 1:
         return(y)
+    if type(y)==torch.Tensor:
+        return torch.argmax(y, dim=1)
     return np.argmax(y, axis=1)
 
+def undo_ohe_batch(y):
+    if len(y.shape) <= 2:
+        return(y)
+    return np.argmax(y, axis=2)
+
 class AutoNetMetric():
-    def __init__(self, name, metric, loss_transform, ohe_transform):
+    def __init__(self, name, metric, loss_transform, ohe_transform, batched_metric=None, streaming_metric=None):
         self.loss_transform = loss_transform
+        self.batched_metric = batched_metric
+        self.streaming_metric = streaming_metric
+        self.exact_streaming = False
         self.metric = metric
         self.ohe_transform = ohe_transform
         self.name = name
@@ -103,3 +130,61 @@ class AutoNetMetric():
 
     def get_loss_value(self, Y_pred, Y_true):
         return self.loss_transform(self.__call__(Y_pred, Y_true))
+
+    def get_loss_values(self, Y_preds, Y_true):
+        """Compute the loss of a batch of predictions at once, e.g. the predictions of several models.
+        Falls back to computing the loss of each prediction separately if there is no batched version of the metric.
+
+        Arguments:
+            Y_preds {array} -- Predictions with an additional leading axis.
+            Y_true {array} -- The true targets.
+
+        Returns:
+            array -- The loss of each prediction.
+        """
+        Y_preds = ensure_numpy(Y_preds)
+        Y_true = ensure_numpy(Y_true)
+
+        if self.batched_metric is None or self.ohe_transform not in (undo_ohe, no_transform):
+            return np.array([self.get_loss_value(Y_pred, Y_true) for Y_pred in Y_preds])
+
+        if len(Y_preds.shape) - 1 != len(Y_true.shape):
+            Y_preds = undo_ohe_batch(Y_preds)
+            Y_true = undo_ohe(Y_true)
+        if self.ohe_transform is undo_ohe:
+            Y_preds = undo_ohe_batch(Y_preds)
+            Y_true = undo_ohe(Y_true)
+        values = self.batched_metric(Y_true, Y_preds)
+        return np.array([self.loss_transform(value) for value in values])
+
+    def create_accumulator(self):
+        """Create an accumulator to compute the metric batch by batch.
+
+        Returns:
+            MetricAccumulator -- The accumulator or None, if there is no streaming version of the metric.
+        """
+        if self.streaming_metric is None:
+            return None
+        return MetricAccumulator(self, self.streaming_metric(exact=self.exact_streaming))
+
+
+class MetricAccumulator():
+    """Feed batches of predictions to the streaming version of an AutoNetMetric"""
+
+    def __init__(self, metric, streaming_metric):
+        self.metric = metric
+        self.streaming_metric = streaming_metric
+
+    def update(self, Y_pred, Y_true):
+        # no copy to the host: the streaming metric reduces the batch on its device
+        if len(Y_pred.shape) !=  len(Y_true.shape):
+            Y_pred = undo_ohe(Y_pred)
+            Y_true = undo_ohe(Y_true)
+        self.streaming_metric.update(self.metric.ohe_transform(Y_true), self.metric.ohe_transform(Y_pred))
+
+    def merge(self, other):
+        self.streaming_metric.merge(other.streaming_metric)
+        return self
+
+    def compute(self):
+        return self.streaming_metric.compute()
@@ -5,6 +5,7 @@ __license__ = "BSD"
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
 from autoPyTorch.utils.config.config_option import ConfigOption
 from autoPyTorch.components.preprocessing.preprocessor_base import PreprocessorBase
+from autoPyTorch.components.preprocessing.column_transforms import ColumnScaler
 from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
 import ConfigSpace
 import ConfigSpace.hyperparameters as CSH
@@ -26,22 +27,32 @@ class NormalizationStrategySelector(PipelineNode):
         if normalizer_name == 'none':
             return {'normalizer': None}
 
-        if isinstance(X, csr_matrix):
-            normalizer = self.normalization_strategies[normalizer_name](with_mean=False)
+        normalizer_type = self.normalization_strategies[normalizer_name]
+        if not isinstance(X, csr_matrix) and ColumnScaler.is_supported(normalizer_type):
+            transformer = ColumnScaler(normalizer_type, dataset_info.categorical_features)
+            X = transformer.fit_transform(X, train_indices)
         else:
-            normalizer = self.normalization_strategies[normalizer_name]()
-        
-        transformer = ColumnTransformer(transformers=[("normalize", normalizer, [i for i, c in enumerate(dataset_info.categorical_features) if not c])],
-                                        remainder='passthrough')
+            if isinstance(X, csr_matrix):
+                normalizer = normalizer_type(with_mean=False)
+            else:
+                normalizer = normalizer_type()
+            
+            transformer = ColumnTransformer(transformers=[("normalize", normalizer, [i for i, c in enumerate(dataset_info.categorical_features) if not c])],
+                                            remainder='passthrough')
 
-        transformer.fit(X[train_indices])
+            transformer.fit(X[train_indices])
 
-        X = transformer.transform(X)
+            X = transformer.transform(X)
         
         dataset_info.categorical_features = sorted(dataset_info.categorical_features)
 
         return {'X': X, 'normalizer': transformer, 'dataset_info': dataset_info}
 
+    def get_fit_cache_key(self, hyperparameter_config, X, train_indices, dataset_info):
+        hyperparameter_config = ConfigWrapper(self.get_name(), hyperparameter_config)
+        normalizer_type = self.normalization_strategies[hyperparameter_config['normalization_strategy']]
+        return (hyperparameter_config.get_dictionary(), normalizer_type, X, train_indices, dataset_info)
+
     def predict(self, X, normalizer):
         if normalizer is None:
             return {'X': X}
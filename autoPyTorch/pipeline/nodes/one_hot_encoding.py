@@ -32,6 +32,9 @@ class OneHotEncoding(PipelineNode):
         dataset_info.categorical_features = None
         return {'X': X, 'one_hot_encoder': encoder, 'Y': Y, 'y_one_hot_encoder': y_encoder, 'dataset_info': dataset_info}
 
+    def get_fit_cache_key(self, pipeline_config, X, Y, dataset_info):
+        return (X, Y, dataset_info, self.encode_Y)
+
     def predict(self, pipeline_config, X, one_hot_encoder):
         categorical_features = pipeline_config["categorical_features"]
         if categorical_features and any(categorical_features) and not scipy.sparse.issparse(X):
@@ -3,12 +3,13 @@ import numpy as np
 import os
 import time
 import shutil
+import uuid
 import netifaces
 import traceback
 import logging
 
 from hpbandster.core.nameserver import NameServer, nic_name_to_host
-from hpbandster.core.result import logged_results_to_HBS_result
+from autoPyTorch.utils.results_index import ResultsIndex
 
 from autoPyTorch.pipeline.base.sub_pipeline_node import SubPipelineNode
 from autoPyTorch.pipeline.base.pipeline import Pipeline
@@ -20,8 +21,11 @@ from autoPyTorch.core.hpbandster_extensions.bohb_ext import BOHBExt
 from autoPyTorch.core.hpbandster_extensions.hyperband_ext import HyperBandExt
 from autoPyTorch.core.hpbandster_extensions.portfolio_bohb_ext import PortfolioBOHBExt
 from autoPyTorch.core.worker import AutoNetWorker
+from autoPyTorch.core.local_worker_pool import LocalWorkerPool
+from autoPyTorch.utils.shared_data import SharedData
 
 from autoPyTorch.components.training.budget_types import BudgetTypeTime, BudgetTypeEpochs, BudgetTypeTrainingTime
+from autoPyTorch.components.training.checkpoint_store import CheckpointStore
 import copy
 
 class OptimizationAlgorithm(SubPipelineNode):
@@ -109,6 +113,7 @@ class OptimizationAlgorithm(SubPipelineNode):
                     'info': loss_info_dict['info']}
 
         # Start Optimization Algorithm
+        local_workers = None
         try:
             ns_credentials_dir, tmp_models_dir, network_interface_name = self.prepare_environment(pipeline_config)
 
@@ -117,7 +122,11 @@ class OptimizationAlgorithm(SubPipelineNode):
                 NS = self.get_nameserver(run_id, task_id, ns_credentials_dir, network_interface_name)
                 ns_host, ns_port = NS.start()
                 
-            if task_id != 1 or pipeline_config["run_worker_on_master_node"]:
+            if task_id == -1 and self.get_num_local_workers(pipeline_config, logger) > 1:
+                local_workers = self.run_local_workers(pipeline_config=pipeline_config, run_id=run_id, ns_credentials_dir=ns_credentials_dir,
+                    network_interface_name=network_interface_name, X_train=X_train, Y_train=Y_train, X_valid=X_valid, Y_valid=Y_valid,
+                    dataset_info=dataset_info, shutdownables=shutdownables)
+            elif task_id != 1 or pipeline_config["run_worker_on_master_node"]:
                 self.run_worker(pipeline_config=pipeline_config, run_id=run_id, task_id=task_id, ns_credentials_dir=ns_credentials_dir,
                     network_interface_name=network_interface_name, X_train=X_train, Y_train=Y_train, X_valid=X_valid, Y_valid=Y_valid,
                     dataset_info=dataset_info, shutdownables=shutdownables)
@@ -136,6 +145,8 @@ class OptimizationAlgorithm(SubPipelineNode):
             print(e)
             traceback.print_exc()
         finally:
+            if local_workers is not None:
+                local_workers.shutdown()
             self.clean_up(pipeline_config, ns_credentials_dir, tmp_models_dir)
 
         if res:
@@ -175,12 +186,16 @@ class OptimizationAlgorithm(SubPipelineNode):
                 type=float, depends=True, info="Number of successive halving iterations."),
             ConfigOption("eta", default=3, type=float, info='eta parameter of Hyperband.'),
             ConfigOption("min_workers", default=1, type=int),
+            ConfigOption("num_local_workers", default=1, type=int,
+                info="Number of worker processes to run on this machine, if you run AutoNet locally (task_id -1). torch_num_threads is split among them."),
             ConfigOption("working_dir", default=".", type="directory"),
             ConfigOption("network_interface_name", default=self.get_default_network_interface_name(), type=str),
             ConfigOption("memory_limit_mb", default=1000000, type=int),
             ConfigOption("use_tensorboard_logger", default=False, type=to_bool),
             ConfigOption("run_worker_on_master_node", default=True, type=to_bool),
-            ConfigOption("use_pynisher", default=True, type=to_bool)
+            ConfigOption("use_pynisher", default=True, type=to_bool),
+            ConfigOption("share_data_between_workers", default=False, type=to_bool,
+                info="Keep the training data once per host in shared memory, and map it into all workers on the host.")
         ]
         return options
 
@@ -244,6 +259,9 @@ class OptimizationAlgorithm(SubPipelineNode):
                 shutil.rmtree(tmp_models_dir)
             if os.path.exists(ns_credentials_dir):
                 shutil.rmtree(ns_credentials_dir)
+            # the checkpoints to warm start from are only needed during the optimization
+            if os.path.exists(CheckpointStore.get_directory(pipeline_config)):
+                shutil.rmtree(CheckpointStore.get_directory(pipeline_config))
 
     def get_nameserver(self, run_id, task_id, ns_credentials_dir, network_interface_name):
         """Get the namesever object
@@ -282,6 +300,13 @@ class OptimizationAlgorithm(SubPipelineNode):
             Master -- An optimization algorithm.
         """
         optimization_algorithm = self.algorithms[pipeline_config["algorithm"]]
+
+        # the learning curve termination of the workers needs the best loss on each budget
+        incumbents = None
+        if pipeline_config.get("learning_curve_termination", False):
+            incumbents = incumbent_logger()
+            loggers = [incumbents] + list(loggers)
+
         kwargs = {"configspace": config_space, "run_id": run_id,
                   "eta": pipeline_config["eta"], "min_budget": pipeline_config["min_budget"], "max_budget": pipeline_config["max_budget"],
                   "host": ns_host, "nameserver": ns_host, "nameserver_port": ns_port,
@@ -294,6 +319,8 @@ class OptimizationAlgorithm(SubPipelineNode):
              kwargs["portfolio_type"] = pipeline_config["portfolio_type"]
 
         hb = optimization_algorithm(**kwargs)
+        if incumbents is not None:
+            hb.job_kwargs = incumbents.get_job_kwargs
         return hb
 
 
@@ -310,8 +337,9 @@ class OptimizationAlgorithm(SubPipelineNode):
             dict -- Dictionary summarizing the results
         """
         try:
-            res = logged_results_to_HBS_result(pipeline_config["result_logger_dir"])
-            id2config = res.get_id2config_mapping()
+            res = ResultsIndex(pipeline_config["result_logger_dir"])
+            if res.get_num_runs() == 0:
+                raise ValueError("No results")
             incumbent_trajectory = res.get_incumbent_trajectory(bigger_is_better=False, non_decreasing_budget=False)
         except Exception as e:
             raise RuntimeError("Error parsing results. Check results.json and output for more details. An empty results.json is usually caused by a misconfiguration of AutoNet.")
@@ -321,15 +349,15 @@ class OptimizationAlgorithm(SubPipelineNode):
         
         final_config_id = incumbent_trajectory['config_ids'][-1]
         final_budget = incumbent_trajectory['budgets'][-1]
-        best_run = [r for r in res.get_runs_by_id(final_config_id) if r.budget == final_budget][0]
-        return {'optimized_hyperparameter_config': id2config[final_config_id]['config'],
+        best_run = res.get_run(final_config_id, final_budget)
+        return {'optimized_hyperparameter_config': res.get_config(final_config_id)['config'],
                 'budget': final_budget,
                 'loss': best_run.loss,
                 'info': best_run.info}
 
 
     def run_worker(self, pipeline_config, run_id, task_id, ns_credentials_dir, network_interface_name,
-            X_train, Y_train, X_valid, Y_valid, dataset_info, shutdownables):
+            X_train, Y_train, X_valid, Y_valid, dataset_info, shutdownables, background=None):
         """ Run the AutoNetWorker
         
         Arguments:
@@ -344,12 +372,19 @@ class OptimizationAlgorithm(SubPipelineNode):
             Y_valid {array} -- The data
             dataset_info {DatasetInfo} -- Object describing the dataset
             shutdownables {list} -- A list of objects that need to shutdown when the optimization is finished
+
+        Keyword Arguments:
+            background {bool} -- Whether to run the worker in a background thread. None to run it in the background if not on cluster. (default: {None})
         """
         if not task_id == -1:
             time.sleep(5)
         while not os.path.isdir(ns_credentials_dir):
             time.sleep(5)
         host = nic_name_to_host(network_interface_name)
+
+        if pipeline_config["share_data_between_workers"]:
+            X_train, Y_train, X_valid, Y_valid, shutdownables = self.share_data(pipeline_config=pipeline_config, task_id=task_id,
+                ns_credentials_dir=ns_credentials_dir, shutdownables=shutdownables, X_train=X_train, Y_train=Y_train, X_valid=X_valid, Y_valid=Y_valid)
         
         worker = AutoNetWorker(pipeline=self.sub_pipeline, pipeline_config=pipeline_config,
                               X_train=X_train, Y_train=Y_train, X_valid=X_valid, Y_valid=Y_valid, dataset_info=dataset_info,
@@ -360,8 +395,106 @@ class OptimizationAlgorithm(SubPipelineNode):
                               use_pynisher=pipeline_config["use_pynisher"])
         worker.load_nameserver_credentials(ns_credentials_dir)
         # run in background if not on cluster
-        worker.run(background=(task_id <= 1))
+        worker.run(background=(task_id <= 1) if background is None else background)
 
+    def get_num_local_workers(self, pipeline_config, logger):
+        """Get the number of local worker processes. Fall back to a single worker if processes can not be forked."""
+        if pipeline_config["num_local_workers"] > 1 and not LocalWorkerPool.is_available():
+            logger.info("Can not start local worker processes on this platform. Using a single worker.")
+            return 1
+        return max(1, pipeline_config["num_local_workers"])
+
+    def run_local_workers(self, pipeline_config, run_id, ns_credentials_dir, network_interface_name,
+            X_train, Y_train, X_valid, Y_valid, dataset_info, shutdownables):
+        """ Run AutoNetWorkers in processes on the local machine
+        
+        Arguments:
+            pipeline_config {dict} -- The configuration of the pipeline
+            run_id {str} -- An id for the run
+            ns_credentials_dir {str} -- path to nameserver credentials
+            network_interface_name {str} -- the name of the network interface
+            X_train {array} -- The data
+            Y_train {array} -- The data
+            X_valid {array} -- The data
+            Y_valid {array} -- The data
+            dataset_info {DatasetInfo} -- Object describing the dataset
+            shutdownables {list} -- A list of objects that need to shutdown when the optimization is finished
+
+        Returns:
+            LocalWorkerPool -- The pool of worker processes. Shuts down the shutdownables when it is shut down.
+        """
+        num_workers = self.get_num_local_workers(pipeline_config, logging.getLogger('autonet'))
+
+        # the workers inherit the data from this process: only share it once
+        if pipeline_config["share_data_between_workers"]:
+            X_train, Y_train, X_valid, Y_valid, shutdownables = self.share_data(pipeline_config=pipeline_config, task_id=-1,
+                ns_credentials_dir=ns_credentials_dir, shutdownables=shutdownables, X_train=X_train, Y_train=Y_train, X_valid=X_valid, Y_valid=Y_valid)
+
+        # split the threads among the workers
+        worker_config = dict(pipeline_config)
+        worker_config["share_data_between_workers"] = False
+        num_threads = pipeline_config.get("torch_num_threads", -1)
+        num_threads = num_threads if num_threads > 0 else (os.cpu_count() or 1)
+        worker_config["torch_num_threads"] = max(1, num_threads // num_workers)
+
+        def run_local_worker(index):
+            self.run_worker(pipeline_config=worker_config, run_id=run_id, task_id=-1, ns_credentials_dir=ns_credentials_dir,
+                network_interface_name=network_interface_name, X_train=X_train, Y_train=Y_train, X_valid=X_valid, Y_valid=Y_valid,
+                dataset_info=dataset_info, shutdownables=[], background=False)
+
+        local_workers = LocalWorkerPool(run_worker=run_local_worker, num_workers=num_workers, shutdownables=shutdownables)
+        local_workers.start()
+        return local_workers
+
+
+    def share_data(self, pipeline_config, task_id, ns_credentials_dir, shutdownables, X_train, Y_train, X_valid, Y_valid):
+        """Put the data in shared memory, or attach to the data another worker of this run on this host has already put there.
+        
+        Arguments:
+            pipeline_config {dict} -- The configuration of the pipeline
+            task_id {int} -- An id for the worker
+            ns_credentials_dir {str} -- path to nameserver credentials. Contains the token of the run.
+            shutdownables {list} -- The shared data will be removed when these objects shut down
+            X_train {array} -- The data
+            Y_train {array} -- The data
+            X_valid {array} -- The data
+            Y_valid {array} -- The data
+        
+        Returns:
+            tuple -- The data, mapped from shared memory if possible, and the shutdownables.
+        """
+        logger = logging.getLogger('autonet')
+        shared_data = SharedData(pipeline_config["run_id"], self.get_run_token(task_id, ns_credentials_dir))
+        # the master replaces data left over from a previous run with the same token
+        if not shared_data.publish(replace=(task_id in [1, -1]), X_train=X_train, Y_train=Y_train, X_valid=X_valid, Y_valid=Y_valid):
+            logger.info("Could not share the data between the workers on this host")
+            return X_train, Y_train, X_valid, Y_valid, shutdownables
+
+        data = shared_data.attach()
+        logger.debug("Attached to data in shared memory at " + shared_data.path)
+        return data["X_train"], data["Y_train"], data["X_valid"], data["Y_valid"], shutdownables + [shared_data]
+
+    def get_run_token(self, task_id, ns_credentials_dir):
+        """Get a token that is unique for this run. The master creates it, the other workers read it from the nameserver credentials directory.
+
+        Arguments:
+            task_id {int} -- An id for the worker
+            ns_credentials_dir {str} -- path to nameserver credentials. Created anew by the master of each run.
+
+        Returns:
+            str -- The token
+        """
+        path = os.path.join(ns_credentials_dir, "run_token")
+        if task_id in [1, -1] and not os.path.exists(path):
+            os.makedirs(ns_credentials_dir, exist_ok=True)
+            tmp_path = path + "." + uuid.uuid4().hex
+            with open(tmp_path, "w") as f:
+                f.write(uuid.uuid4().hex)
+            os.replace(tmp_path, path)
+        while not os.path.exists(path):
+            time.sleep(1)
+        with open(path, "r") as f:
+            return f.read().strip()
 
     def run_optimization_algorithm(self, pipeline_config, run_id, ns_host, ns_port, nameserver, task_id, result_loggers,
             dataset_info, logger):
@@ -391,7 +524,7 @@ class OptimizationAlgorithm(SubPipelineNode):
             pipeline_config=pipeline_config, ns_host=ns_host, ns_port=ns_port, loggers=result_loggers)
 
         # start algorithm
-        min_num_workers = pipeline_config["min_workers"] if task_id != -1 else 1
+        min_num_workers = pipeline_config["min_workers"] if task_id != -1 else self.get_num_local_workers(pipeline_config, logger)
 
         reduce_runtime = pipeline_config["max_budget"] if pipeline_config["budget_type"] == "time" else 0
         HB.run_until(runtime=(pipeline_config["max_runtime"] - reduce_runtime),
@@ -438,6 +571,30 @@ class tensorboard_logger(object):
             tl.log_value('BOHB/incumbent_results', self.incumbent * -1, time_step)
 
 
+class incumbent_logger(object):
+    """Keep track of the best loss on each budget, to send it to the workers with every job."""
+
+    def __init__(self):
+        self.incumbent_losses = dict()
+
+    def new_config(self, config_id, config, config_info):
+        pass
+
+    def __call__(self, job):
+        if job.result is None or job.result.get('loss') is None:
+            return
+        budget = job.kwargs['budget']
+        self.incumbent_losses[budget] = min(self.incumbent_losses.get(budget, float('inf')), job.result['loss'])
+
+    def get_job_kwargs(self):
+        """Get the current incumbent losses as additional arguments of a job. Used as job_kwargs hook of the optimization algorithm.
+
+        Returns:
+            dict -- The keyword arguments.
+        """
+        return {'incumbent_losses': sorted(self.incumbent_losses.items())}
+
+
 class combined_logger(object):
     def __init__(self, *loggers):
         self.loggers = loggers
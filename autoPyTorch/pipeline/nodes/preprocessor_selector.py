@@ -34,6 +34,11 @@ class PreprocessorSelector(PipelineNode):
 
         return {'X': X, 'preprocessor': preprocessor, 'one_hot_encoder': one_hot_encoder}
 
+    def get_fit_cache_key(self, hyperparameter_config, pipeline_config, X, Y, train_indices, one_hot_encoder):
+        hyperparameter_config = ConfigWrapper(self.get_name(), hyperparameter_config)
+        preprocessor_type = self.preprocessors[hyperparameter_config['preprocessor']]
+        return (hyperparameter_config.get_dictionary(), preprocessor_type, X, Y, train_indices, one_hot_encoder)
+
     def predict(self, preprocessor, X):
         return { 'X': preprocessor.transform(X) }
 
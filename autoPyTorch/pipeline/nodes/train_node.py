@@ -21,6 +21,8 @@ from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
 from autoPyTorch.utils.config.config_option import ConfigOption, to_bool
 from autoPyTorch.components.training.base_training import BaseTrainingTechnique, BaseBatchLossComputationTechnique
 from autoPyTorch.components.training.trainer import Trainer
+from autoPyTorch.components.training.checkpoint_store import CheckpointStore
+from autoPyTorch.components.training.budget_types import BudgetTypeEpochs
 
 import signal
 
@@ -45,7 +47,10 @@ class TrainNode(PipelineNode):
             training_techniques,
             fit_start_time,
             refit,
-            hyperparameter_config_id):
+            hyperparameter_config_id,
+            incumbent_loss=None,
+            train_indices=None,
+            max_budget_reached=False):
         """Train the network.
         
         Arguments:
@@ -63,6 +68,11 @@ class TrainNode(PipelineNode):
             training_techniques {list} -- List of objects inheriting from BaseTrainingTechnique.
             fit_start_time {float} -- Start time of fit
             refit {bool} -- Whether training for refit or not.
+
+        Keyword Arguments:
+            incumbent_loss {float} -- The best loss the optimization algorithm has seen on this budget. (default: {None})
+            train_indices {array} -- The indices of the training data. Identifies the checkpoint of the current cv split. (default: {None})
+            max_budget_reached {bool} -- Whether the config is evaluated on the max budget, so its checkpoint is not needed anymore. (default: {False})
         
         Returns:
             dict -- loss and info reported to bohb
@@ -77,6 +87,11 @@ class TrainNode(PipelineNode):
         if pipeline_config["torch_num_threads"] > 0:
             torch.set_num_threads(pipeline_config["torch_num_threads"])
 
+        if "learning_curve_termination" in self.training_techniques and pipeline_config["learning_curve_termination"] and not refit:
+            training_techniques = training_techniques + [self.training_techniques["learning_curve_termination"](incumbent_loss=incumbent_loss)]
+        if "mixed_precision" in self.training_techniques and (pipeline_config["training_precision"] != "fp32" or pipeline_config["channels_last"]):
+            training_techniques = training_techniques + [self.training_techniques["mixed_precision"]()]
+
         trainer = Trainer(
             model=network,
             loss_computation=self.batch_loss_computation_techniques[hyperparameter_config["batch_loss_computation_technique"]](),
@@ -88,7 +103,19 @@ class TrainNode(PipelineNode):
             training_techniques=training_techniques,
             device=Trainer.get_device(pipeline_config),
             logger=logger,
-            full_eval_each_epoch=pipeline_config["full_eval_each_epoch"])
+            full_eval_each_epoch=pipeline_config["full_eval_each_epoch"],
+            compute_train_metrics=pipeline_config["compute_train_metrics"] or valid_loader is None)
+
+        # resume training of this config from a lower budget
+        checkpoint_store = None
+        if pipeline_config["warm_start_from_checkpoints"] and not refit and hyperparameter_config_id is not None:
+            checkpoint_store = CheckpointStore(CheckpointStore.get_directory(pipeline_config))
+            resumed_budget = checkpoint_store.load(hyperparameter_config_id, train_indices, trainer, budget)
+            if resumed_budget is not None:
+                logger.debug("Resume training from budget " + str(resumed_budget))
+                if not any(isinstance(t, BudgetTypeEpochs) for t in training_techniques):
+                    # time budgets: only train the additional time
+                    trainer.budget = budget - resumed_budget
         trainer.prepare(pipeline_config, hyperparameter_config, fit_start_time)
 
         model_params = self.count_parameters(network)
@@ -110,7 +137,8 @@ class TrainNode(PipelineNode):
             log['loss'] = train_loss
             log['model_parameters'] = model_params
             for i, metric in enumerate(trainer.metrics):
-                log['train_' + metric.name] = optimize_metric_results[i]
+                if optimize_metric_results is not None:
+                    log['train_' + metric.name] = optimize_metric_results[i]
 
                 if valid_loader is not None and trainer.eval_valid_each_epoch:
                     log['val_' + metric.name] = valid_metric_results[i]
@@ -134,6 +162,11 @@ class TrainNode(PipelineNode):
             epoch += 1
             torch.cuda.empty_cache()
 
+        if checkpoint_store is not None and max_budget_reached:
+            checkpoint_store.remove(hyperparameter_config_id, train_indices)
+        elif checkpoint_store is not None:
+            checkpoint_store.save(hyperparameter_config_id, train_indices, trainer, budget=budget, next_epoch=epoch + 1)
+
         # wrap up
         loss, final_log = self.wrap_up_training(trainer=trainer, logs=logs, epoch=epoch,
             train_loader=train_loader, valid_loader=valid_loader, budget=budget, training_start_time=training_start_time, fit_start_time=fit_start_time,
@@ -209,9 +242,13 @@ class TrainNode(PipelineNode):
             ConfigOption("torch_num_threads", default=1, type=int),
             ConfigOption("full_eval_each_epoch", default=False, type=to_bool, choices=[True, False],
                 info="Whether to evaluate everything every epoch. Results in more useful output"),
+            ConfigOption("compute_train_metrics", default=True, type=to_bool, choices=[True, False],
+                info="Whether to compute the metrics on the training data. Always done if there is no validation data."),
             ConfigOption("best_over_epochs", default=False, type=to_bool, choices=[True, False],
                 info="Whether to report the best performance occurred to BOHB"),
             ConfigOption("save_models", default=False, type=to_bool, choices=[True, False]),
+            ConfigOption("warm_start_from_checkpoints", default=False, type=to_bool, choices=[True, False],
+                info="Save the state of training at the end of each budget and resume from it when a config is evaluated on a higher budget."),
             ConfigOption("predict_model", default=None, info="Model to use for predicting"),
         ]
         for name, technique in self.training_techniques.items():
@@ -1,5 +1,7 @@
 
+import os
 from autoPyTorch.utils.config.config_option import ConfigOption
+from autoPyTorch.utils.config.config_file_parser import ConfigFileParser
 from autoPyTorch.pipeline.base.sub_pipeline_node import SubPipelineNode
 import traceback
 
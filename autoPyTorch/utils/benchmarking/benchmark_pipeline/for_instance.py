@@ -3,11 +3,20 @@ import logging
 from autoPyTorch.utils.config.config_option import ConfigOption, to_bool
 from autoPyTorch.utils.config.config_file_parser import ConfigFileParser
 from autoPyTorch.pipeline.base.sub_pipeline_node import SubPipelineNode
+from autoPyTorch.utils.benchmarking.benchmark_pipeline.for_autonet_config import ForAutoNetConfig
+from autoPyTorch.utils.benchmarking.benchmark_pipeline.for_run import ForRun
+from autoPyTorch.utils.benchmarking.local_scheduler import LocalScheduler
 import traceback
 
 class ForInstance(SubPipelineNode):
     def fit(self, pipeline_config, task_id, run_id):
         instances = self.get_instances(pipeline_config, instance_slice=self.parse_slice(pipeline_config["instance_slice"]))
+        if pipeline_config["num_local_jobs"] > 1:
+            if LocalScheduler.is_available():
+                self.fit_parallel(pipeline_config, instances, task_id, run_id)
+                return dict()
+            logging.getLogger('benchmark').warning("Running benchmark jobs in parallel requires the fork start method. Continue sequentially.")
+
         for instance in instances:
             try:
                 self.sub_pipeline.fit_pipeline(pipeline_config=pipeline_config, instance=instance, run_id=run_id, task_id=task_id)
@@ -16,12 +25,54 @@ class ForInstance(SubPipelineNode):
                 traceback.print_exc()
         return dict()
 
+    def fit_parallel(self, pipeline_config, instances, task_id, run_id):
+        """Run each combination of instance, autonet config and run number in its own process.
+
+        Arguments:
+            pipeline_config {dict} -- The benchmark config.
+            instances {list} -- The instances to run.
+            task_id {int} -- The id of the task.
+            run_id {str} -- The id of the run.
+        """
+        config_files = ForAutoNetConfig.get_config_files(pipeline_config, parse_slice=False)
+        config_slice = ForAutoNetConfig.parse_slice(pipeline_config["autonet_config_slice"]) or slice(None)
+        run_numbers = ForRun.parse_range(pipeline_config["run_number_range"], pipeline_config["num_runs"])
+
+        jobs = []
+        for i, instance in enumerate(instances):
+            for j in range(len(config_files))[config_slice]:
+                for run_number in run_numbers:
+                    name = "job_" + "_".join([str(run_id), str(i), str(j), str(run_number)])
+
+                    # restrict the sub pipeline to a single autonet config and run, keep the temporary files of the jobs apart
+                    job_config = dict(pipeline_config)
+                    job_config["autonet_config_slice"] = str(j)
+                    job_config["run_number_range"] = str(run_number)
+                    job_config["working_dir"] = os.path.join(pipeline_config["working_dir"] or ".", name)
+                    jobs.append((name, self.get_job(job_config, instance, task_id, run_id)))
+
+        scheduler = LocalScheduler(num_jobs=pipeline_config["num_local_jobs"],
+                                   log_dir=os.path.join(pipeline_config["result_dir"], "logs_" + str(run_id)),
+                                   cores_per_job=pipeline_config["cores_per_job"],
+                                   memory_per_job_mb=pipeline_config["memory_per_job_mb"])
+        return scheduler.run(jobs)
+
+    def get_job(self, job_config, instance, task_id, run_id):
+        def job():
+            if not os.path.exists(job_config["working_dir"]):
+                os.makedirs(job_config["working_dir"])
+            self.sub_pipeline.fit_pipeline(pipeline_config=job_config, instance=instance, run_id=run_id, task_id=task_id)
+        return job
+
     def get_pipeline_config_options(self):
         options = [
             ConfigOption("instances", default=None, type='directory', required=True),
             ConfigOption("instance_slice", default=None, type=str),
             ConfigOption("dataset_root", default=ConfigFileParser.get_autonet_home(), type='directory'),
             ConfigOption("multiple_datasets_indices", default=None, type=int, list=True),
+            ConfigOption("num_local_jobs", default=1, type=int),
+            ConfigOption("cores_per_job", default=None, type=int),
+            ConfigOption("memory_per_job_mb", default=None, type=int),
         ]
         return options
 
@@ -1,15 +1,21 @@
+import os
 import logging
-from autoPyTorch.utils.config.config_option import ConfigOption
+from autoPyTorch.utils.config.config_option import ConfigOption, to_bool
 from autoPyTorch.pipeline.base.sub_pipeline_node import SubPipelineNode
+from autoPyTorch.utils.benchmarking.benchmark_pipeline.prepare_result_folder import get_run_result_dir
 import traceback
 
 class ForRun(SubPipelineNode):
     def fit(self, pipeline_config, autonet, data_manager, instance, run_id, task_id):
         for run_number in self.parse_range(pipeline_config['run_number_range'], pipeline_config['num_runs']):
             try:
+                if pipeline_config['skip_finished_runs'] and \
+                        os.path.exists(os.path.join(get_run_result_dir(pipeline_config, instance, run_id, run_number, autonet), "summary.json")):
+                    logging.getLogger('benchmark').info("Skip finished run " + str(run_id) + "_" + str(run_number) + " of " + str(instance))
+                    continue
                 logging.getLogger('benchmark').info("Start run " + str(run_id) + "_" + str(run_number))
                 self.sub_pipeline.fit_pipeline(pipeline_config=pipeline_config,
-                    data_manager=data_manager, instance=instance,
+                    autonet=autonet, data_manager=data_manager, instance=instance,
                     run_number=run_number, run_id=run_id, task_id=task_id)
             except Exception as e:
                 print(e)
@@ -19,7 +25,8 @@ class ForRun(SubPipelineNode):
     def get_pipeline_config_options(self):
         options = [
             ConfigOption("num_runs", default=1, type=int),
-            ConfigOption("run_number_range", default=None, type=str)
+            ConfigOption("run_number_range", default=None, type=str),
+            ConfigOption("skip_finished_runs", default=False, type=to_bool)
         ]
         return options
 
@@ -1,11 +1,11 @@
-from hpbandster.core.result import logged_results_to_HBS_result
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
 from autoPyTorch.utils.config.config_option import ConfigOption, to_bool, to_list
 from autoPyTorch.pipeline.nodes.metric_selector import MetricSelector
 from autoPyTorch.pipeline.nodes import OneHotEncoding
 from autoPyTorch.pipeline.nodes.ensemble import build_ensemble, read_ensemble_prediction_file
-from hpbandster.core.result import logged_results_to_HBS_result
+from autoPyTorch.utils.results_index import ResultsIndex
 from autoPyTorch.utils.ensemble import filter_nan_predictions
+from autoPyTorch.components.ensembles.ensemble_selection import EnsembleSelection
 from copy import copy
 import os
 import logging
@@ -14,6 +14,7 @@ import numpy as np
 import json
 import traceback
 import time
+import multiprocessing
 
 class SaveEnsembleLogs(PipelineNode):
 
@@ -26,7 +27,8 @@ class SaveEnsembleLogs(PipelineNode):
  
     def get_pipeline_config_options(self):
         options = [
-            ConfigOption('num_ensemble_evaluations', default=100, type=int)
+            ConfigOption('num_ensemble_evaluations', default=100, type=int),
+            ConfigOption('ensemble_log_num_workers', default=1, type=int, info="Number of processes that build the ensembles over time.")
         ]
         return options
 
@@ -37,7 +39,7 @@ def save_ensemble_logs(pipeline_config, autonet, result_dir, ensemble_size=None,
     metrics = autonet.pipeline[MetricSelector.get_name()].metrics
     optimize_metric = metrics[autonet_config["optimize_metric"]]
     y_transform = autonet.pipeline[OneHotEncoding.get_name()].complete_y_tranformation
-    result = logged_results_to_HBS_result(result_dir)
+    result = ResultsIndex(result_dir)
     filename = os.path.join(result_dir, "predictions_for_ensemble.npy")
     test_filename = os.path.join(result_dir, "test_predictions_for_ensemble.npy")
     ensemble_log_filename = os.path.join(result_dir, log_filename or "ensemble_log.json")
@@ -59,68 +61,142 @@ def save_ensemble_logs(pipeline_config, autonet, result_dir, ensemble_size=None,
         predictions, model_identifiers, timestamps = \
             filter_nan_predictions(predictions, model_identifiers, timestamps)
 
-    # compute the prediction subset used to compute performance over time
+    # the timestamps are sorted, each subset used to compute performance over time is a prefix of the predictions
+    predictions = np.array(predictions)
+    test_predictions = np.array(test_predictions) if test_data_available else None
+    finished = np.array([t["finished"] for t in timestamps])
     start_time = min(map(lambda t: t["submitted"], timestamps))
-    end_time = max(map(lambda t: t["finished"], timestamps))
+    end_time = finished.max()
     step = math.log(end_time - start_time) / (pipeline_config["num_ensemble_evaluations"] - 1)
     steps = start_time + np.exp(np.arange(step, step * (pipeline_config["num_ensemble_evaluations"] + 1), step))
-    subset_indices = [np.array([i for i, t in enumerate(timestamps) if t["finished"] < s]) for s in steps]
+    subset_sizes = np.unique(np.searchsorted(finished, steps, side="left"))
+    subset_sizes = subset_sizes[subset_sizes > 0]
 
-    # iterate over the subset to compute performance over time
-    last_finished = 0
-    for subset in subset_indices:
-        if len(subset) == 0:
-            continue
-        
-        finished = max(timestamps[s]["finished"] for s in subset)
-        if finished == last_finished:
+    global _state
+    _state = {
+        "result": result, "metrics": metrics, "optimize_metric": optimize_metric, "autonet_config": autonet_config,
+        "ensemble_size": ensemble_size or autonet_config["ensemble_size"], "predictions": predictions, "labels": labels,
+        "test_predictions": test_predictions, "test_labels": test_labels if test_data_available else None,
+        "model_identifiers": model_identifiers
+    }
+
+    # the greedy selection only depends on the candidates: reuse the ensemble of the previous subset if they did not change
+    single_model_losses = EnsembleSelection(ensemble_size=1, metric=optimize_metric)._get_scores(predictions, labels, np.arange(len(predictions)))
+    reuse_from = dict()
+    fit_sizes = list()
+    last_key = None
+    for size in subset_sizes:
+        key = get_selection_key(single_model_losses[:size], autonet_config["ensemble_only_consider_n_best"],
+                                autonet_config["ensemble_sorted_initialization_n_best"])
+        if key is not None and key == last_key:
+            reuse_from[size] = fit_sizes[-1]
+        else:
+            fit_sizes.append(size)
+        last_key = key
+
+    # build the ensembles in parallel
+    try:
+        num_workers = min(pipeline_config["ensemble_log_num_workers"], len(fit_sizes))
+        if num_workers > 1 and "fork" in multiprocessing.get_all_start_methods() and not multiprocessing.current_process().daemon:
+            with multiprocessing.get_context("fork").Pool(num_workers) as pool:
+                evaluations = dict(zip(fit_sizes, pool.map(evaluate_ensemble, fit_sizes)))
+        else:
+            evaluations = {size: evaluate_ensemble(size) for size in fit_sizes}
+    finally:
+        _state = None
+
+    # write to log
+    with open(ensemble_log_filename, "a") as f:
+        for size in subset_sizes:
+            entry, ensemble_time = evaluations[reuse_from.get(size, size)]
+            if size in reuse_from:
+                entry = copy(entry)
+                entry[3] = dict(entry[3], num_input_models=int(size))
+                ensemble_time = 0
+            print(json.dumps([float(finished[size - 1]) + ensemble_time] + entry), file=f)
+
+
+# state of save_ensemble_logs, inherited by the forked worker processes
+_state = None
+
+
+def get_selection_key(losses, only_consider_n_best, sorted_initialization_n_best):
+    """Get the models that the greedy ensemble selection is able to pick and the models it is initialized with.
+
+    Arguments:
+        losses {array} -- The loss of each single model.
+        only_consider_n_best {int} -- Only the n best models are considered.
+        sorted_initialization_n_best {int} -- The ensemble is initialized with the n best models.
+
+    Returns:
+        tuple -- Identifies the result of ensemble selection. None if all models are considered.
+    """
+    if only_consider_n_best <= 0:
+        return None
+    order = np.argsort(losses)
+    return len(losses) == 1, frozenset(order[:only_consider_n_best].tolist()), tuple(order[:sorted_initialization_n_best].tolist())
+
+
+def evaluate_ensemble(size):
+    """Build an ensemble of the first models and evaluate it.
+
+    Arguments:
+        size {int} -- Number of models to build the ensemble from.
+
+    Returns:
+        tuple -- The log entry without the timestamp and the time it took to build the ensemble.
+    """
+    state = _state
+    autonet_config = state["autonet_config"]
+    subset_model_identifiers = state["model_identifiers"][:size]
+
+    # build an ensemble with current subset and size
+    ensemble_start_time = time.time()
+    ensemble, _ = build_ensemble(result=state["result"],
+        optimize_metric=state["optimize_metric"], ensemble_size=state["ensemble_size"],
+        all_predictions=state["predictions"][:size], labels=state["labels"], model_identifiers=subset_model_identifiers,
+        only_consider_n_best=autonet_config["ensemble_only_consider_n_best"],
+        sorted_initialization_n_best=autonet_config["ensemble_sorted_initialization_n_best"])
+
+    # get the ensemble predictions, without copying the predictions of the subset
+    ensemble_prediction = weighted_sum(state["predictions"], ensemble.weights_)
+    if state["test_predictions"] is not None:
+        test_ensemble_prediction = weighted_sum(state["test_predictions"], ensemble.weights_)
+
+    # evaluate the metrics
+    metric_performances = dict()
+    for metric_name, metric in state["metrics"].items():
+        if metric_name != autonet_config["optimize_metric"] and metric_name not in autonet_config["additional_metrics"]:
             continue
-        last_finished = finished
-        subset_predictions = [np.copy(predictions[s]) for s in subset]
-        subset_model_identifiers = [model_identifiers[s] for s in subset]
-
-        # build an ensemble with current subset and size
-        ensemble_start_time = time.time()
-        ensemble, _ = build_ensemble(result=result,
-            optimize_metric=optimize_metric, ensemble_size=ensemble_size or autonet_config["ensemble_size"],
-            all_predictions=subset_predictions, labels=labels, model_identifiers=subset_model_identifiers,
-            only_consider_n_best=autonet_config["ensemble_only_consider_n_best"],
-            sorted_initialization_n_best=autonet_config["ensemble_sorted_initialization_n_best"])
-
-        # get the ensemble predictions
-        ensemble_prediction = ensemble.predict(subset_predictions)
-        if test_data_available:
-            subset_test_predictions = [np.copy(test_predictions[s]) for s in subset]
-            test_ensemble_prediction = ensemble.predict(subset_test_predictions)
-
-        # evaluate the metrics
-        metric_performances = dict()
-        for metric_name, metric in metrics.items():
-            if metric_name != autonet_config["optimize_metric"] and metric_name not in autonet_config["additional_metrics"]:
-                continue
-            metric_performances[metric_name] = metric(ensemble_prediction, labels)
-            if test_data_available:
-                metric_performances["test_%s" % metric_name] = metric(test_ensemble_prediction, test_labels)
-
-        ensemble_time = time.time() - ensemble_start_time
-
-        # write to log
-        with open(ensemble_log_filename, "a") as f:
-            print(json.dumps([
-                finished + ensemble_time,
-                metric_performances,
-                sorted([(identifier, weight) for identifier, weight in zip(ensemble.identifiers_, ensemble.weights_) if weight > 0],
-                        key=lambda x: -x[1]),
-                [ensemble.identifiers_[i] for i in ensemble.indices_],
-                {
-                    "ensemble_size": ensemble.ensemble_size,
-                    "metric": autonet_config["optimize_metric"],
-                    "sorted_initialization_n_best": ensemble.sorted_initialization_n_best,
-                    "only_consider_n_best": ensemble.only_consider_n_best,
-                    "bagging": ensemble.bagging,
-                    "mode": ensemble.mode,
-                    "num_input_models": ensemble.num_input_models_,
-                    "trajectory": ensemble.trajectory_,
-                    "train_score": ensemble.train_score_
-                }
-            ]), file=f)
\ No newline at end of file
+        metric_performances[metric_name] = metric(ensemble_prediction, state["labels"])
+        if state["test_predictions"] is not None:
+            metric_performances["test_%s" % metric_name] = metric(test_ensemble_prediction, state["test_labels"])
+
+    ensemble_time = time.time() - ensemble_start_time
+    entry = [
+        metric_performances,
+        sorted([(identifier, weight) for identifier, weight in zip(ensemble.identifiers_, ensemble.weights_) if weight > 0],
+                key=lambda x: -x[1]),
+        [ensemble.identifiers_[i] for i in ensemble.indices_],
+        {
+            "ensemble_size": ensemble.ensemble_size,
+            "metric": autonet_config["optimize_metric"],
+            "sorted_initialization_n_best": ensemble.sorted_initialization_n_best,
+            "only_consider_n_best": ensemble.only_consider_n_best,
+            "bagging": ensemble.bagging,
+            "mode": ensemble.mode,
+            "num_input_models": ensemble.num_input_models_,
+            "trajectory": ensemble.trajectory_,
+            "train_score": ensemble.train_score_
+        }
+    ]
+    return entry, ensemble_time
+
+
+def weighted_sum(predictions, weights):
+    """Sum up the weighted predictions of the models with a positive weight, in the same order as EnsembleSelection.predict"""
+    result = None
+    for i in np.flatnonzero(weights):
+        weighted = (predictions[i] * weights[i]).astype(predictions.dtype)
+        result = weighted if result is None else result + weighted
+    return result
@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+import logging
+import traceback
+import multiprocessing
+from multiprocessing.connection import wait
+
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+class LocalScheduler():
+    """Run benchmark jobs in parallel processes on the local machine, each with its own cores, memory limit and log file.
+    The logs of the jobs are appended to a combined log once they are finished."""
+
+    def __init__(self, num_jobs, log_dir, cores_per_job=None, memory_per_job_mb=None):
+        """Initialize the scheduler.
+
+        Arguments:
+            num_jobs {int} -- The number of jobs that run at the same time.
+            log_dir {str} -- Directory for the log files of the jobs and the combined log.
+
+        Keyword Arguments:
+            cores_per_job {int} -- Number of cores a job is pinned to. Divides the available cores evenly if None. (default: {None})
+            memory_per_job_mb {int} -- Limit of the address space of a job in MB. No limit if None. (default: {None})
+        """
+        self.num_jobs = num_jobs
+        self.log_dir = log_dir
+        self.available_cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(multiprocessing.cpu_count()))
+        self.cores_per_job = cores_per_job or max(1, len(self.available_cores) // num_jobs)
+        self.memory_per_job_mb = memory_per_job_mb
+        self.logger = logging.getLogger('benchmark')
+
+    @staticmethod
+    def is_available():
+        """The jobs inherit the benchmark pipeline from the forked master process"""
+        return "fork" in multiprocessing.get_all_start_methods()
+
+    def run(self, jobs):
+        """Run the jobs and wait for all of them to finish.
+
+        Arguments:
+            jobs {list} -- List of (name, function) tuples. The function is called without arguments in a new process.
+
+        Returns:
+            dict -- The exit code of each job.
+        """
+        if not os.path.exists(self.log_dir):
+            os.makedirs(self.log_dir)
+        context = multiprocessing.get_context("fork")
+        pending = list(reversed(jobs))
+        free_slots = list(reversed(range(self.num_jobs)))
+        running = dict()
+        exit_codes = dict()
+
+        while pending or running:
+            while pending and free_slots:
+                name, function = pending.pop()
+                slot = free_slots.pop()
+                process = context.Process(target=self.run_job, args=(function, slot, self.get_log_file(name)), daemon=False)
+                process.start()
+                running[process.sentinel] = (process, slot, name, time.time())
+                self.logger.info("Started job " + name + " with pid " + str(process.pid))
+
+            for sentinel in wait(list(running.keys())):
+                process, slot, name, start_time = running.pop(sentinel)
+                process.join()
+                free_slots.append(slot)
+                exit_codes[name] = process.exitcode
+                self.collect_log(name, process.exitcode, time.time() - start_time)
+                self.logger.info("Finished job " + name + " with exit code " + str(process.exitcode) + " after " +
+                    str(int(time.time() - start_time)) + "s. " + str(len(exit_codes)) + "/" + str(len(jobs)) + " jobs done.")
+
+        failed = [name for name, exit_code in exit_codes.items() if exit_code != 0]
+        if failed:
+            self.logger.warning("Failed jobs: " + ", ".join(failed) + ". See " + self.get_log_file("benchmark") + " for details.")
+        return exit_codes
+
+    def run_job(self, function, slot, log_file):
+        """Restrict the process to the resources of the slot, redirect its output and run the job. Target of a forked process."""
+        sys.stdout.flush()
+        sys.stderr.flush()
+        log = open(log_file, "w", buffering=1)
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+        sys.stdout = sys.stderr = log
+
+        cores = self.available_cores[slot * self.cores_per_job:(slot + 1) * self.cores_per_job]
+        if cores and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cores)
+        num_threads = str(len(cores) or self.cores_per_job)
+        for variable in ["OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"]:
+            os.environ[variable] = num_threads
+        if "torch" in sys.modules:
+            sys.modules["torch"].set_num_threads(int(num_threads))
+
+        if self.memory_per_job_mb is not None:
+            import resource
+            limit = int(self.memory_per_job_mb * 1024 * 1024)
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+        try:
+            function()
+        except BaseException:
+            traceback.print_exc()
+            sys.stderr.flush()
+            os._exit(1)
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+    def collect_log(self, name, exit_code, duration):
+        with open(self.get_log_file("benchmark"), "a") as combined:
+            combined.write("=" * 20 + " " + name + " (exit code " + str(exit_code) + ", " + str(int(duration)) + "s) " + "=" * 20 + "\n")
+            if os.path.exists(self.get_log_file(name)):
+                with open(self.get_log_file(name), "r") as f:
+                    for line in f:
+                        combined.write(line)
+            combined.write("\n")
+
+    def get_log_file(self, name):
+        return os.path.join(self.log_dir, name + ".log")
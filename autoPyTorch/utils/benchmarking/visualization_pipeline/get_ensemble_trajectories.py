@@ -1,10 +1,9 @@
-from hpbandster.core.result import logged_results_to_HBS_result
+from autoPyTorch.utils.results_index import ResultsIndex
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
 from autoPyTorch.utils.config.config_option import ConfigOption, to_bool, to_list
 from autoPyTorch.utils.benchmarking.benchmark_pipeline.prepare_result_folder import get_run_result_dir
 from autoPyTorch.pipeline.nodes import OneHotEncoding, MetricSelector
 from autoPyTorch.pipeline.nodes.ensemble import read_ensemble_prediction_file
-from hpbandster.core.result import logged_results_to_HBS_result
 from copy import copy
 import os
 import logging
@@ -22,8 +21,10 @@ class GetEnsembleTrajectories(PipelineNode):
             return {"trajectories": trajectories, "optimize_metric": optimize_metric}
 
         try:
-            started = logged_results_to_HBS_result(run_result_dir).HB_config["time_ref"]
+            started = ResultsIndex(run_result_dir).get_time_ref()
         except:
+            started = None
+        if started is None:
             return {"trajectories": trajectories, "optimize_metric": optimize_metric}
         
         metrics = autonet.pipeline[MetricSelector.get_name()].metrics
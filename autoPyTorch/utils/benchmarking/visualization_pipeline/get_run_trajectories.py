@@ -1,4 +1,4 @@
-from hpbandster.core.result import logged_results_to_HBS_result
+from autoPyTorch.utils.results_index import ResultsIndex
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
 from autoPyTorch.utils.config.config_option import ConfigOption, to_bool
 from autoPyTorch.utils.benchmarking.benchmark_pipeline.prepare_result_folder import get_run_result_dir
@@ -36,7 +36,7 @@ class GetRunTrajectories(PipelineNode):
 def build_run_trajectories(results_folder, autonet_config, metrics, log_functions):
     # parse results
     try:
-        res = logged_results_to_HBS_result(results_folder)
+        res = ResultsIndex(results_folder)
         incumbent_trajectory = res.get_incumbent_trajectory(bigger_is_better=False, non_decreasing_budget=False)
     except:
         print("No incumbent trajectory found")
@@ -55,12 +55,9 @@ def build_run_trajectories(results_folder, autonet_config, metrics, log_function
     # save incumbent trajectories
     for name, obj in additional_metric_names:
         tj = copy(incumbent_trajectory)
-        log_available = [name in run["info"] for config_id, budget in zip(tj["config_ids"], tj["budgets"])
-                                             for run in res.get_runs_by_id(config_id)
-                                             if run["budget"] == budget]
-        tj["values"] = [run["info"][name] for config_id, budget in zip(tj["config_ids"], tj["budgets"])
-                                          for run in res.get_runs_by_id(config_id)
-                                          if run["budget"] == budget and name in run["info"]]
+        values = res.get_metric_values(name)
+        log_available = [(config_id, budget) in values for config_id, budget in zip(tj["config_ids"], tj["budgets"])]
+        tj["values"] = [values[(config_id, budget)] for config_id, budget in zip(tj["config_ids"], tj["budgets"]) if (config_id, budget) in values]
         tj["losses"] = [obj.loss_transform(x) for x in tj["values"]]
 
         for key, value_list in tj.items():
@@ -5,10 +5,13 @@ import json
 import math
 import tempfile
 import uuid
-import asyncio
+import socket
+import socketserver
 import multiprocessing
 import signal
 import logging
+import fcntl
+import io
 from autoPyTorch.components.ensembles.ensemble_selection import EnsembleSelection
 
 def build_ensemble(result, optimize_metric,
@@ -19,7 +22,7 @@ def build_ensemble(result, optimize_metric,
         only_consider_n_best=only_consider_n_best, sorted_initialization_n_best=sorted_initialization_n_best)
 
     # fit ensemble
-    ensemble_selection.fit(np.array(all_predictions), labels, model_identifiers)
+    ensemble_selection.fit(np.asarray(all_predictions), labels, model_identifiers)
     ensemble_configs = dict()
     for identifier in ensemble_selection.get_selected_model_identifiers():
         try:
@@ -30,7 +33,39 @@ def build_ensemble(result, optimize_metric,
     return ensemble_selection, ensemble_configs
 
 
-def read_ensemble_prediction_file(filename, y_transform):
+def read_ensemble_prediction_file(filename, y_transform, budgets=None, n_best=None):
+    """Read the predictions logged for ensemble building.
+
+    Arguments:
+        filename {str} -- Path of the predictions file, e.g. result_dir/predictions_for_ensemble.npy
+        y_transform {function} -- Transformation applied to the labels.
+
+    Keyword Arguments:
+        budgets {list} -- Only read predictions of models evaluated on one of these budgets. None to read all. (default: {None})
+        n_best {int} -- Only read predictions of the n models with the lowest loss. None to read all. (default: {None})
+
+    Returns:
+        tuple -- predictions, labels, model identifiers, timestamps
+    """
+    store = EnsemblePredictionStore(filename)
+    if not store.exists() and os.path.exists(filename):
+        return _read_legacy_ensemble_prediction_file(filename, y_transform)
+
+    labels, _ = y_transform(store.read_labels())
+    entries = store.read_index()
+    if budgets is not None:
+        entries = [e for e in entries if e["budget"] in budgets]
+    if n_best is not None:
+        best = sorted(range(len(entries)), key=lambda i: (entries[i]["loss"] is None, entries[i]["loss"]))[:n_best]
+        entries = [entries[i] for i in sorted(best)]
+
+    all_predictions = store.read_predictions(entries)
+    model_identifiers = [tuple(e["job_id"]) + (e["budget"], ) for e in entries]
+    all_timestamps = [e["timestamps"] for e in entries]
+    return all_predictions, labels, model_identifiers, all_timestamps
+
+
+def _read_legacy_ensemble_prediction_file(filename, y_transform):
     all_predictions = list()
     all_timestamps = list()
     labels = None
@@ -52,6 +87,121 @@ def read_ensemble_prediction_file(filename, y_transform):
     return all_predictions, labels, model_identifiers, all_timestamps
 
 
+class EnsemblePredictionStore():
+    """Indexed store of the predictions logged for ensemble building.
+
+    The predictions of all models are appended as float32 blocks to a single data file, that is memory mapped when reading.
+    A line in the index file describes each block (job id, budget, timestamps, loss, offset, shape), so that single models
+    can be read or filtered without loading the others. Appends are serialized by a lock on the index file.
+    """
+
+    def __init__(self, filename):
+        """Initialize the store.
+
+        Arguments:
+            filename {str} -- Base name of the store. A trailing .npy is stripped, the store consists of the files
+                              <base>.labels.npy, <base>.index and <base>.data
+        """
+        base = filename[:-len(".npy")] if filename.endswith(".npy") else filename
+        self.labels_file = base + ".labels.npy"
+        self.index_file = base + ".index"
+        self.data_file = base + ".data"
+
+    def exists(self):
+        return os.path.exists(self.index_file)
+
+    def create(self, overwrite):
+        """Create an empty store.
+
+        Arguments:
+            overwrite {bool} -- Whether an existing store should be overwritten.
+
+        Raises:
+            FileExistsError: The store already exists and overwrite is False.
+        """
+        if self.exists() and not overwrite:
+            raise FileExistsError('The file %s already exists.' % self.index_file)
+        for name in [self.labels_file, self.data_file]:
+            if os.path.exists(name):
+                os.remove(name)
+        with open(self.index_file, "w"): pass
+        with open(self.data_file, "wb"): pass
+
+    def has_labels(self):
+        return os.path.exists(self.labels_file)
+
+    def write_labels(self, labels):
+        with open(self.labels_file, "wb") as f:
+            np.save(f, labels)
+
+    def read_labels(self):
+        with open(self.labels_file, "rb") as f:
+            return np.load(f, allow_pickle=True)
+
+    def append(self, job_id, budget, timestamps, loss, predictions):
+        """Append the predictions of a model.
+
+        Arguments:
+            job_id {tuple} -- The id of the job (config_id).
+            budget {float} -- The budget the model has been evaluated on.
+            timestamps {dict} -- Timestamps of the job.
+            loss {float} -- The loss of the model. None if unknown.
+            predictions {array} -- The predictions of the model.
+        """
+        predictions = np.ascontiguousarray(predictions, dtype=np.float32)
+        with open(self.index_file, "a") as index:
+            fcntl.flock(index, fcntl.LOCK_EX)
+            try:
+                with open(self.data_file, "ab") as data:
+                    offset = data.seek(0, os.SEEK_END)
+                    data.write(predictions.tobytes())
+                index.write(json.dumps({
+                    "job_id": [int(i) for i in job_id],
+                    "budget": float(budget),
+                    "timestamps": timestamps,
+                    "loss": float(loss) if loss is not None else None,
+                    "offset": offset,
+                    "shape": list(predictions.shape)
+                }) + "\n")
+                index.flush()
+            finally:
+                fcntl.flock(index, fcntl.LOCK_UN)
+
+    def read_index(self):
+        """Read the index of the store.
+
+        Returns:
+            list -- One dict per stored model, in the order they have been appended.
+        """
+        entries = list()
+        with open(self.index_file, "r") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # incomplete line of a concurrent append
+                entries.append(json.loads(line))
+        return entries
+
+    def read_predictions(self, entries):
+        """Read the predictions of the given index entries without copying them into memory.
+
+        Arguments:
+            entries {list} -- Entries of the index.
+
+        Returns:
+            list -- A copy-on-write memory mapped array for each entry.
+        """
+        if len(entries) == 0:
+            return list()
+        data = np.memmap(self.data_file, dtype=np.float32, mode="c")
+        itemsize = np.dtype(np.float32).itemsize
+        result = list()
+        for e in entries:
+            start = e["offset"] // itemsize
+            size = int(np.prod(e["shape"]))
+            result.append(data[start:start + size].reshape(e["shape"]))
+        return result
+
+
 class test_predictions_for_ensemble():
     def __init__(self, autonet, X_test, Y_test):
         self.autonet = autonet
@@ -67,6 +217,8 @@ class test_predictions_for_ensemble():
         
         return self.predict(self.autonet, self.X_test, return_probabilities=True)[1], self.Y_test
 
+TRANSFER_CHUNK_SIZE = 1024 * 1024
+
 def combine_predictions(data, pipeline_kwargs, X, Y):
     all_indices = None
     all_predictions = None
@@ -81,15 +233,7 @@ def combine_predictions(data, pipeline_kwargs, X, Y):
     argsort = np.argsort(all_indices)
     sorted_predictions = all_predictions[argsort]
     sorted_indices = all_indices[argsort]
-    
-    unique = uuid.uuid4()
-    tempfile.gettempdir()
-    with open(os.path.join(tempfile.gettempdir(), "autonet_ensemble_predictions_%s.npy" % unique), "wb") as f:
-        np.save(f, sorted_predictions)
-    with open(os.path.join(tempfile.gettempdir(), "autonet_ensemble_labels_%s.npy" % unique), "wb") as f:
-        np.save(f, Y[sorted_indices])
-    host, port = pipeline_kwargs[0]["pipeline_config"]["ensemble_server_credentials"]
-    return host, port, unique
+    return offer_predictions(pipeline_kwargs, sorted_predictions, Y[sorted_indices])
 
 def combine_test_predictions(data, pipeline_kwargs, X, Y):
     predictions = [d[0] for d in data.values() if d == d]
@@ -98,15 +242,72 @@ def combine_test_predictions(data, pipeline_kwargs, X, Y):
     assert len(predictions) == len(labels)
     if len(predictions) == 0:
         return None
+    return offer_predictions(pipeline_kwargs, np.stack(predictions), labels[0])
+
+def offer_predictions(pipeline_kwargs, predictions, labels):
+    """Make predictions and labels available to the ensemble logger.
+    They are written to shared memory (if available), from where the logger reads them directly, if it runs on the same host.
+    Otherwise the logger fetches them from the ensemble server of this host.
+    
+    Arguments:
+        pipeline_kwargs {dict} -- Kwargs of the sub pipelines, containing the credentials of the ensemble server.
+        predictions {array} -- The predictions
+        labels {array} -- The labels
     
-    unique = uuid.uuid4()
-    tempfile.gettempdir()
-    with open(os.path.join(tempfile.gettempdir(), "autonet_ensemble_predictions_%s.npy" % unique), "wb") as f:
-        np.save(f, np.stack(predictions))
-    with open(os.path.join(tempfile.gettempdir(), "autonet_ensemble_labels_%s.npy" % unique), "wb") as f:
-        np.save(f, labels[0])
-    host, port = pipeline_kwargs[0]["pipeline_config"]["ensemble_server_credentials"]
-    return host, port, unique
+    Returns:
+        tuple -- Handle to fetch the data: host and port of the ensemble server, unique id, hostname of this host
+    """
+    unique = uuid.uuid4().hex
+    for name, data in [("predictions", predictions), ("labels", labels)]:
+        with open(get_transfer_file_name(name, unique), "wb") as f:
+            np.save(f, data)
+    host, port = pipeline_kwargs[0]["pipeline_config"]["ensemble_server_credentials"] or (None, None)
+    return host, port, unique, socket.gethostname()
+
+def fetch_predictions(handle, name):
+    """Fetch data offered by offer_predictions. The data is removed from the offering host afterwards.
+    Fetching the predictions also removes the labels.
+    
+    Arguments:
+        handle {tuple} -- The handle returned by offer_predictions.
+        name {str} -- Either predictions or labels.
+    
+    Returns:
+        array -- The data
+    """
+    host, port, unique, hostname = handle
+    filename = get_transfer_file_name(name, unique)
+
+    # same host: read from shared memory
+    if hostname == socket.gethostname() and os.path.exists(filename):
+        with open(filename, "rb") as f:
+            data = np.load(f, allow_pickle=True)
+        remove_transfer_files(name, unique)
+        return data
+
+    # different host: fetch from the ensemble server of the offering host
+    with socket.create_connection((host, port)) as connection:
+        connection.sendall(("%s_%s" % (name, unique)).encode())
+        buf = bytearray()
+        chunk = bytearray(TRANSFER_CHUNK_SIZE)
+        while True:
+            n = connection.recv_into(chunk)
+            if n == 0:
+                break
+            buf += chunk[:n]
+    return np.load(io.BytesIO(buf), allow_pickle=True)
+
+def get_transfer_file_name(name, unique):
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else tempfile.gettempdir()
+    return os.path.join(directory, "autonet_ensemble_%s_%s.npy" % (name, unique))
+
+def remove_transfer_files(name, unique):
+    names = [name, "labels"] if name == "predictions" else [name]
+    for n in names:
+        try:
+            os.remove(get_transfer_file_name(n, unique))
+        except OSError:
+            pass
 
 def filter_nan_predictions(predictions, *args):
     nan_predictions = set([i for i, p in enumerate(predictions) if np.any(np.isnan(p))])
@@ -115,40 +316,30 @@ def filter_nan_predictions(predictions, *args):
         for vector in [predictions, *args]
     ]
 
-async def serve_predictions(reader, writer):
-    data = await reader.read(1024)
-    name, unique = data.decode().split("_")
-    # logging.getLogger("autonet").info("Serve %s %s" % (name, unique))
+class PredictionRequestHandler(socketserver.BaseRequestHandler):
+    """Serve the predictions offered on this host to the ensemble logger of another host"""
 
-    with open(os.path.join(tempfile.gettempdir(), "autonet_ensemble_%s_%s.npy" % (name, unique)), "rb") as f:
-        while True:
-            buf = f.read(1024)
-            if not buf:
-                break
-            writer.write(buf)
-    os.remove(os.path.join(tempfile.gettempdir(), "autonet_ensemble_%s_%s.npy" % (name, unique)))
-    if name == "predictions" and os.path.exists(os.path.join(tempfile.gettempdir(), "autonet_ensemble_labels_%s.npy" % unique)):
-        os.remove(os.path.join(tempfile.gettempdir(), "autonet_ensemble_labels_%s.npy" % unique))
-    await writer.drain()
-    writer.close()
+    def handle(self):
+        name, unique = self.request.recv(1024).decode().split("_")
+        try:
+            with open(get_transfer_file_name(name, unique), "rb") as f:
+                self.request.sendfile(f)
+        finally:
+            remove_transfer_files(name, unique)
 
 def _start_server(host, queue):
     def shutdown(signum, stack):
         raise KeyboardInterrupt
     signal.signal(signal.SIGTERM, shutdown)
-    loop = asyncio.get_event_loop()
-    coro = asyncio.start_server(serve_predictions, host, 0, loop=loop)
-    server = loop.run_until_complete(coro)
-    host, port = server.sockets[0].getsockname()
+    socketserver.ThreadingTCPServer.daemon_threads = True
+    server = socketserver.ThreadingTCPServer((host, 0), PredictionRequestHandler)
+    host, port = server.server_address[:2]
     queue.put((host, port))
     try:
-        loop.run_forever()
+        server.serve_forever()
     except KeyboardInterrupt:
         pass
-    server.close()
-    loop.run_until_complete(server.wait_closed())
-    loop.close()
-    # logging.getLogger("autonet").info("Ensemble Server has been shut down")
+    server.server_close()
 
 def start_server(host):
     queue = multiprocessing.Queue()
@@ -163,97 +354,58 @@ class ensemble_logger(object):
         self.start_time = time.time()
         self.directory = directory
         self.overwrite = overwrite
-        self.labels_written = False
-        self.test_labels_written = False
         
         self.file_name = os.path.join(directory, 'predictions_for_ensemble.npy')
         self.test_file_name = os.path.join(directory, 'test_predictions_for_ensemble.npy')
 
-        try:
-            with open(self.file_name, 'x') as fh: pass
-        except FileExistsError:
-            if overwrite:
-                with open(self.file_name, 'w') as fh: pass
-            else:
-                raise FileExistsError('The file %s already exists.'%self.file_name)
-        except:
-            raise
-        
-        try:
-            with open(self.test_file_name, 'x') as fh: pass
-        except FileExistsError:
-            if overwrite:
-                with open(self.test_file_name, 'w') as fh: pass
-            else:
-                raise FileExistsError('The file %s already exists.'%self.test_file_name)
-        except:
-            raise
+        self.store = EnsemblePredictionStore(self.file_name)
+        self.test_store = EnsemblePredictionStore(self.test_file_name)
+        self.store.create(overwrite)
+        self.test_store.create(overwrite)
 
     def new_config(self, *args, **kwargs):
         pass
     
-    async def save_remote_data(self, host, port, name, unique, f):
-        remote_reader, remote_writer = await asyncio.open_connection(host, port)
-        remote_writer.write(("%s_%s" % (name, unique)).encode())
-        while not remote_reader.at_eof():
-            f.write(await remote_reader.read(1024))
-        remote_writer.close()
-
     def __call__(self, job):
         if job.result is None:
             return
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        loss = job.result.get("loss", None)
 
         if "predictions_for_ensemble" in job.result and job.result["predictions_for_ensemble"] is None and \
             "test_predictions_for_ensemble" in job.result and job.result["test_predictions_for_ensemble"] is not None:
-            host, port, unique =  job.result["test_predictions_for_ensemble"]
-            with open("/dev/null", "wb") as f:
-                loop.run_until_complete(self.save_remote_data(host, port, "predictions", unique, f))
-
-        #logging.info(job.result.__repr__()) #TODO: delete
+            # discard
+            fetch_predictions(job.result["test_predictions_for_ensemble"], "predictions")
 
         if "predictions_for_ensemble" in job.result and job.result["predictions_for_ensemble"] is not None:
-            host, port, unique = job.result["predictions_for_ensemble"]
-            #logging.info("==> Saving preds...") # #TODO: delete
-            #if not self.labels_written:
-            #    logging.info("==> (Labels)") #TODO: delete
-            with open(self.file_name, "ab") as f:
-                if not self.labels_written:
-                    loop.run_until_complete(self.save_remote_data(host, port, "labels", unique, f))
-                    self.labels_written = True
-                np.save(f, np.array([job.id, job.kwargs['budget'], job.timestamps], dtype=object))
-                loop.run_until_complete(self.save_remote_data(host, port, "predictions", unique, f))
+            handle = job.result["predictions_for_ensemble"]
+            if not self.store.has_labels():
+                self.store.write_labels(fetch_predictions(handle, "labels"))
+            predictions = fetch_predictions(handle, "predictions")
+            self.store.append(job.id, job.kwargs['budget'], job.timestamps, loss, predictions)
             del job.result["predictions_for_ensemble"]
 
             if "baseline_predictions_for_ensemble" in job.result and job.result["baseline_predictions_for_ensemble"] is not None:
                 baseline_id = (int(job.result["info"]["baseline_id"]), 0, 0)
-                host, port, unique = job.result["baseline_predictions_for_ensemble"]
-                #logging.info("==> Saving baseline preds...") # #TODO: delete
-                with open(self.file_name, "ab") as f:
-                    if not self.labels_written:
-                        raise RuntimeError("Baseline predictions found but no labels logged yet.")
-                    np.save(f, np.array([baseline_id, 0., job.timestamps], dtype=object))
-                    loop.run_until_complete(self.save_remote_data(host, port, "predictions", unique, f))
+                handle = job.result["baseline_predictions_for_ensemble"]
+                if not self.store.has_labels():
+                    raise RuntimeError("Baseline predictions found but no labels logged yet.")
+                predictions = fetch_predictions(handle, "predictions")
+                self.store.append(baseline_id, 0., job.timestamps, None, predictions)
                 del job.result["baseline_predictions_for_ensemble"]
 
             if "test_predictions_for_ensemble" in job.result and job.result["test_predictions_for_ensemble"] is not None:
-                host, port, unique =  job.result["test_predictions_for_ensemble"]
-                with open(self.test_file_name, "ab") as f:
-                    if not self.test_labels_written:
-                         loop.run_until_complete(self.save_remote_data(host, port, "labels", unique, f))
-                         self.test_labels_written = True
-                    np.save(f, np.array([job.id, job.kwargs['budget'], job.timestamps], dtype=object))
-                    loop.run_until_complete(self.save_remote_data(host, port, "predictions", unique, f))
+                handle = job.result["test_predictions_for_ensemble"]
+                if not self.test_store.has_labels():
+                    self.test_store.write_labels(fetch_predictions(handle, "labels"))
+                predictions = fetch_predictions(handle, "predictions")
+                self.test_store.append(job.id, job.kwargs['budget'], job.timestamps, loss, predictions)
                 del job.result["test_predictions_for_ensemble"]
 
             if "baseline_test_predictions_for_ensemble" in job.result and job.result["baseline_test_predictions_for_ensemble"] is not None:
-                host, port, unique =  job.result["baseline_test_predictions_for_ensemble"]
+                handle = job.result["baseline_test_predictions_for_ensemble"]
                 logging.info("==> Logging baseline test preds")
-                with open(self.test_file_name, "ab") as f:
-                    if not self.test_labels_written:
-                         raise RuntimeError("Baseline test predictions found but no labels logged yet.")
-                    np.save(f, np.array([baseline_id, 0., job.timestamps], dtype=object))
-                    loop.run_until_complete(self.save_remote_data(host, port, "predictions", unique, f))
+                if not self.test_store.has_labels():
+                    raise RuntimeError("Baseline test predictions found but no labels logged yet.")
+                predictions = fetch_predictions(handle, "predictions")
+                self.test_store.append(baseline_id, 0., job.timestamps, None, predictions)
                 del job.result["baseline_test_predictions_for_ensemble"]
-        loop.close()
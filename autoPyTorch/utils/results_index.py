@@ -0,0 +1,253 @@
+import os
+import json
+import sqlite3
+import threading
+from collections.abc import Mapping
+from hpbandster.core.result import Run
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (name TEXT PRIMARY KEY, offset INTEGER, head BLOB);
+CREATE TABLE IF NOT EXISTS configs (config_id TEXT PRIMARY KEY, config TEXT, config_info TEXT);
+CREATE TABLE IF NOT EXISTS runs (config_id TEXT, budget REAL, submitted REAL, started REAL, finished REAL,
+                                 has_result INTEGER, loss REAL, info TEXT, exception TEXT, PRIMARY KEY (config_id, budget));
+CREATE TABLE IF NOT EXISTS metrics (name TEXT, config_id TEXT, budget REAL, value REAL, PRIMARY KEY (name, config_id, budget));
+CREATE INDEX IF NOT EXISTS runs_by_finished ON runs (finished);
+"""
+
+
+class ResultsIndex():
+    """Index of the results BOHB logs to results.json and configs.json.
+
+    The index is a SQLite database next to the logs, that is updated incrementally: only the lines appended to the logs
+    since the last update are parsed. Runs are looked up by config id and budget, the incumbent trajectory is computed by a
+    single query and every numeric value in the info of the runs is indexed by its name, so that a metric can be read for all runs at once.
+    Offers the parts of the interface of hpbandster's Result that are used by autonet.
+    """
+
+    def __init__(self, directory, update=True):
+        """Open the index of the results in the given directory.
+
+        Arguments:
+            directory {str} -- The directory containing results.json and configs.json.
+
+        Keyword Arguments:
+            update {bool} -- Whether to index the lines that have been logged since the last update. (default: {True})
+        """
+        self.directory = directory
+        self.filename = os.path.join(directory, "results_index.sqlite")
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.filename, timeout=60, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+        if update:
+            self.update()
+
+    def update(self):
+        """Index the lines that have been appended to the logs since the last update."""
+        with self.lock, self.connection:
+            self._index_new_lines("configs.json", self._add_config)
+            self._index_new_lines("results.json", self._add_run)
+
+    def clear(self):
+        """Remove everything from the index, e.g. when the logs are overwritten."""
+        with self.lock, self.connection:
+            for table in ["files", "configs", "runs", "metrics"]:
+                self.connection.execute("DELETE FROM " + table)
+
+    def close(self):
+        self.connection.close()
+
+    def get_config(self, config_id):
+        """Get the config with the given id.
+
+        Arguments:
+            config_id {tuple} -- The id of the config.
+
+        Returns:
+            dict -- The config and the config info.
+        """
+        row = self.connection.execute("SELECT config, config_info FROM configs WHERE config_id = ?", (to_key(config_id), )).fetchone()
+        if row is None:
+            raise KeyError(config_id)
+        return {"config": json.loads(row[0]), "config_info": json.loads(row[1])}
+
+    def get_id2config_mapping(self):
+        """Get a mapping from config ids to configs, that looks up the configs when they are accessed."""
+        return ConfigMapping(self)
+
+    def get_run(self, config_id, budget):
+        """Get the run of a config on a budget.
+
+        Arguments:
+            config_id {tuple} -- The id of the config.
+            budget {float} -- The budget.
+
+        Returns:
+            Run -- The run. None if the config has not been evaluated on the budget.
+        """
+        rows = self._query_runs("WHERE config_id = ? AND budget = ?", (to_key(config_id), budget))
+        return rows[0] if rows else None
+
+    def get_runs_by_id(self, config_id):
+        """Get the runs of a config, sorted by budget."""
+        return self._query_runs("WHERE config_id = ? ORDER BY budget", (to_key(config_id), ))
+
+    def get_all_runs(self):
+        """Get all runs, in the order of the configs and sorted by budget."""
+        return self._query_runs("ORDER BY configs.rowid, budget")
+
+    def get_num_runs(self):
+        return self.connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def get_time_ref(self):
+        """Get the time the first run has been submitted."""
+        return self.connection.execute("SELECT MIN(submitted) FROM runs").fetchone()[0]
+
+    def get_metric_values(self, name):
+        """Get the values of a metric logged in the info of the runs.
+
+        Arguments:
+            name {str} -- The name of the metric in the info.
+
+        Returns:
+            dict -- Maps (config_id, budget) to the value of the metric, for each run that logged the metric.
+        """
+        rows = self.connection.execute("SELECT config_id, budget, value FROM metrics WHERE name = ?", (name, ))
+        return {(from_key(config_id), budget): value if value is not None else float("nan") for config_id, budget, value in rows}
+
+    def get_incumbent_trajectory(self, bigger_is_better=True, non_decreasing_budget=True):
+        """Get the best configurations over time, like hpbandster's Result.get_incumbent_trajectory with all_budgets=True.
+
+        Keyword Arguments:
+            bigger_is_better {bool} -- Whether an evaluation on a larger budget is always considered better. (default: {True})
+            non_decreasing_budget {bool} -- Whether the budget of a new incumbent should be at least as big as the one of the current incumbent. (default: {True})
+
+        Returns:
+            dict -- The config ids, the times the runs finished, their budgets and their losses.
+        """
+        trajectory = {"config_ids": [], "times_finished": [], "budgets": [], "losses": []}
+        rows = self.connection.execute("SELECT runs.config_id, budget, finished, loss, has_result FROM runs LEFT JOIN configs USING (config_id) "
+                                       "ORDER BY finished, configs.rowid, budget").fetchall()
+        if not rows:
+            return trajectory
+
+        current_incumbent = float("inf")
+        incumbent_budget = self.connection.execute("SELECT MIN(budget) FROM runs").fetchone()[0]
+        loss = None
+        for config_id, budget, finished, loss, has_result in rows:
+            loss = loss if has_result else None
+            if loss is None:
+                continue
+
+            new_incumbent = (bigger_is_better and budget > incumbent_budget) or loss < current_incumbent
+            if non_decreasing_budget and budget < incumbent_budget:
+                new_incumbent = False
+
+            if new_incumbent:
+                current_incumbent = loss
+                incumbent_budget = budget
+                trajectory["config_ids"].append(from_key(config_id))
+                trajectory["times_finished"].append(finished)
+                trajectory["budgets"].append(budget)
+                trajectory["losses"].append(loss)
+
+        # extend the trajectory to the last finished run
+        if current_incumbent != loss and trajectory["config_ids"]:
+            trajectory["config_ids"].append(trajectory["config_ids"][-1])
+            trajectory["times_finished"].append(rows[-1][2])
+            trajectory["budgets"].append(trajectory["budgets"][-1])
+            trajectory["losses"].append(trajectory["losses"][-1])
+        return trajectory
+
+    def _query_runs(self, condition, parameters=()):
+        rows = self.connection.execute("SELECT runs.config_id, budget, submitted, started, finished, has_result, loss, info, exception "
+                                       "FROM runs LEFT JOIN configs USING (config_id) " + condition, parameters)
+        return [Run(from_key(config_id), budget, loss if has_result else None, json.loads(info) if has_result else None,
+                    {"submitted": submitted, "started": started, "finished": finished}, exception)
+                for config_id, budget, submitted, started, finished, has_result, loss, info, exception in rows]
+
+    def _index_new_lines(self, name, add):
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path):
+            return
+        row = self.connection.execute("SELECT offset, head FROM files WHERE name = ?", (name, )).fetchone()
+        offset, head = row if row is not None else (0, None)
+
+        with open(path, "rb") as f:
+            # the log has been overwritten: start from scratch
+            first_line = f.readline()
+            if head is not None and (first_line != head or os.fstat(f.fileno()).st_size < offset):
+                self.connection.execute("DELETE FROM files WHERE name = ?", (name, ))
+                if name == "configs.json":
+                    self.connection.execute("DELETE FROM configs")
+                self.connection.execute("DELETE FROM runs")
+                self.connection.execute("DELETE FROM metrics")
+                offset = 0
+            f.seek(offset)
+            data = f.read()
+
+        # the last line might be incomplete
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if line.strip():
+                add(json.loads(line.decode("utf-8")))
+        self.connection.execute("INSERT OR REPLACE INTO files (name, offset, head) VALUES (?, ?, ?)",
+                                (name, offset + end, first_line if first_line.endswith(b"\n") else None))
+
+    def _add_config(self, line):
+        config_id, config, config_info = line if len(line) == 3 else (line[0], line[1], "N/A")
+        self.connection.execute("INSERT INTO configs (config_id, config, config_info) VALUES (?, ?, ?) "
+                                "ON CONFLICT (config_id) DO UPDATE SET config = excluded.config, config_info = excluded.config_info",
+                                (to_key(config_id), json.dumps(config), json.dumps(config_info)))
+
+    def _add_run(self, line):
+        config_id, budget, time_stamps, result, exception = line
+        key = to_key(config_id)
+        info = result["info"] if result is not None else None
+        self.connection.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                (key, budget, time_stamps.get("submitted"), time_stamps.get("started"), time_stamps.get("finished"),
+                                 result is not None, result["loss"] if result is not None else None, json.dumps(info), exception))
+        self.connection.execute("DELETE FROM metrics WHERE config_id = ? AND budget = ?", (key, budget))
+        if isinstance(info, dict):
+            self.connection.executemany("INSERT INTO metrics VALUES (?, ?, ?, ?)",
+                                        [(name, key, budget, value) for name, value in info.items()
+                                         if isinstance(value, (int, float)) and not isinstance(value, bool)])
+
+
+class ConfigMapping(Mapping):
+    """Maps config ids to configs, looked up in a results index"""
+
+    def __init__(self, results_index):
+        self.results_index = results_index
+
+    def __getitem__(self, config_id):
+        return self.results_index.get_config(config_id)
+
+    def __iter__(self):
+        rows = self.results_index.connection.execute("SELECT config_id FROM configs ORDER BY rowid").fetchall()
+        return iter([from_key(row[0]) for row in rows])
+
+    def __len__(self):
+        return self.results_index.connection.execute("SELECT COUNT(*) FROM configs").fetchone()[0]
+
+
+class results_index_logger(object):
+    """Keep the results index up to date while BOHB is running. Has to be called after the json result logger."""
+
+    def __init__(self, directory, overwrite=False):
+        self.results_index = ResultsIndex(directory, update=False)
+        if overwrite:
+            self.results_index.clear()
+
+    def new_config(self, config_id, config, config_info):
+        pass
+
+    def __call__(self, job):
+        self.results_index.update()
+
+
+def to_key(config_id):
+    return json.dumps([int(i) for i in config_id])
+
+
+def from_key(key):
+    return tuple(json.loads(key))
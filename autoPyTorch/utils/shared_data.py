@@ -0,0 +1,125 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import os
+import json
+import uuid
+import shutil
+import tempfile
+import numpy as np
+import scipy.sparse
+
+from autoPyTorch.pipeline.base.node_cache import fingerprint
+
+
+class SharedData():
+    """Keep arrays once per host in a directory in shared memory (/dev/shm) and map them into every process that needs them.
+
+    The first process to publish the data writes it, all other processes on the same host, e.g. additional workers of the same run,
+    attach to the existing files. Attached arrays are copy-on-write memory maps: all processes read the same physical pages.
+    The data is only attached, if it has been published with the same token and has the same content.
+    """
+
+    def __init__(self, name, token, directory=None):
+        """Initialize the shared data.
+
+        Arguments:
+            name {str} -- A name that identifies the data on this host, e.g. the run_id.
+            token {str} -- Unique for each run. Only processes with the same token share the data.
+
+        Keyword Arguments:
+            directory {str} -- Where to put the data. Use /dev/shm if available and the temp dir otherwise. (default: {None})
+        """
+        if directory is None:
+            directory = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else tempfile.gettempdir()
+        self.token = token
+        self.path = os.path.join(directory, "autonet_data_" + str(name) + "_" + str(token))
+        self.created = False
+
+    def exists(self):
+        return os.path.exists(os.path.join(self.path, "meta.json"))
+
+    def publish(self, replace=False, **arrays):
+        """Write the arrays, unless another process has already published them.
+
+        Keyword Arguments:
+            replace {bool} -- Replace data published earlier, e.g. left over from a previous run with the same name. (default: {False})
+            **arrays -- The arrays. Dense numpy arrays, scipy sparse matrices or None.
+
+        Returns:
+            bool -- Whether the data can be attached. False for arrays of object dtype, which can not be mapped into memory,
+                    or if different data has been published under this name.
+        """
+        if any(isinstance(a, np.ndarray) and a.dtype.hasobject for a in arrays.values()):
+            return False
+        meta = self.describe(arrays)
+        if replace and self.exists():
+            shutil.rmtree(self.path, ignore_errors=True)
+        if self.exists():
+            return self.matches(meta)
+
+        # write to a temporary directory and rename it, so that other processes never see incomplete data
+        tmp_path = self.path + "." + uuid.uuid4().hex
+        os.makedirs(tmp_path)
+        try:
+            for key, array in arrays.items():
+                if scipy.sparse.issparse(array):
+                    array = scipy.sparse.csr_matrix(array)
+                    for part in ["data", "indices", "indptr"]:
+                        np.save(os.path.join(tmp_path, key + "." + part + ".npy"), getattr(array, part))
+                elif array is not None:
+                    np.save(os.path.join(tmp_path, key + ".npy"), np.asarray(array))
+            with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+                json.dump(meta, f)
+            os.rename(tmp_path, self.path)
+            self.created = True
+        except OSError:
+            # another process has been faster or there is no space left
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return self.exists() and self.matches(meta)
+        return True
+
+    def describe(self, arrays):
+        """Describe the arrays by the token, and the names, types, shapes, dtypes and content fingerprints of the arrays"""
+        return {"token": self.token, "arrays": {key: dict(describe(array), fingerprint=fingerprint(array)) for key, array in arrays.items()}}
+
+    def matches(self, meta):
+        """Check whether the published data has been published with the given description"""
+        with open(os.path.join(self.path, "meta.json"), "r") as f:
+            return json.load(f) == meta
+
+    def attach(self):
+        """Map the published arrays into the memory of this process.
+
+        Returns:
+            dict -- The arrays by the names they have been published with.
+        """
+        with open(os.path.join(self.path, "meta.json"), "r") as f:
+            meta = json.load(f)
+
+        result = dict()
+        for key, info in meta["arrays"].items():
+            if info["type"] == "none":
+                result[key] = None
+            elif info["type"] == "csr":
+                parts = [np.load(os.path.join(self.path, key + "." + part + ".npy"), mmap_mode="c") for part in ["data", "indices", "indptr"]]
+                result[key] = scipy.sparse.csr_matrix(tuple(parts), shape=tuple(info["shape"]), copy=False)
+            else:
+                result[key] = np.load(os.path.join(self.path, key + ".npy"), mmap_mode="c")
+        return result
+
+    def shutdown(self):
+        """Remove the data if this process has published it. Processes that have attached to it keep their mappings."""
+        if self.created:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.created = False
+
+
+def describe(array):
+    if array is None:
+        return {"type": "none"}
+    if scipy.sparse.issparse(array):
+        return {"type": "csr", "shape": list(array.shape), "dtype": str(array.dtype)}
+    array = np.asarray(array)
+    return {"type": "dense", "shape": list(array.shape), "dtype": str(array.dtype)}
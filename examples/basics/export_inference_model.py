@@ -0,0 +1,31 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(__file__, "..", "..", "..")))
+import time
+import numpy as np
+from autoPyTorch import AutoNetClassification
+from autoPyTorch.data_management.data_manager import DataManager
+
+dm = DataManager()
+dm.generate_classification(num_classes=3, num_features=21, num_samples=1500)
+
+autonet = AutoNetClassification("tiny_cs", budget_type='epochs', min_budget=1, max_budget=9, num_iterations=1, log_level='info', use_pynisher=False)
+autonet.fit(X_train=dm.X, Y_train=dm.Y)
+
+# fold the fitted preprocessing and the network into a slim model for serving
+model = autonet.export_inference_model()
+assert np.all(model.predict(dm.X_train) == autonet.predict(dm.X_train))
+
+# latency benchmark: single row predictions
+def benchmark(predict, X, repetitions):
+    predict(X[:1])
+    start = time.time()
+    for i in range(repetitions):
+        predict(X[i % X.shape[0]:i % X.shape[0] + 1])
+    return (time.time() - start) / repetitions * 1000
+
+print("AutoNet.predict:        %.3f ms per row" % benchmark(autonet.predict, dm.X_train, 20))
+print("Exported model.predict: %.3f ms per row" % benchmark(model.predict, dm.X_train, 1000))
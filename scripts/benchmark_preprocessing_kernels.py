@@ -0,0 +1,63 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import time
+import argparse
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler
+
+from autoPyTorch.components.preprocessing.column_transforms import ColumnImputer, ColumnScaler
+
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+
+def sklearn_path(X, categorical_features, train_indices, strategy):
+    numerical = [i for i, c in enumerate(categorical_features) if not c]
+    categorical = [i for i, c in enumerate(categorical_features) if c]
+    imputer = ColumnTransformer([("numerical_imputer", SimpleImputer(strategy=strategy, copy=False), numerical),
+                                 ("categorical_imputer", SimpleImputer(strategy="constant", copy=False, fill_value=-1), categorical)])
+    X = imputer.fit(X[train_indices]).transform(X)
+    categorical_features = [False] * len(numerical) + [True] * len(categorical)
+    normalizer = ColumnTransformer([("normalize", StandardScaler(), [i for i, c in enumerate(categorical_features) if not c])], remainder="passthrough")
+    return normalizer.fit(X[train_indices]).transform(X)
+
+
+def kernel_path(X, categorical_features, train_indices, strategy):
+    X = ColumnImputer(strategy, categorical_features, -1).fit_transform(X, train_indices)
+    categorical_features = sorted(categorical_features)
+    return ColumnScaler(StandardScaler, categorical_features).fit_transform(X, train_indices)
+
+
+def measure(function, repetitions, *args):
+    start = time.time()
+    for _ in range(repetitions):
+        result = function(*args)
+    return (time.time() - start) / repetitions, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare the imputation and normalization kernels with the sklearn ColumnTransformer.')
+    parser.add_argument("--num_samples", default=10000, type=int, help="Number of rows.")
+    parser.add_argument("--num_features", default=1000, type=int, help="Number of columns, every tenth is categorical.")
+    parser.add_argument("--strategy", default="mean", help="Imputation strategy: mean, median or most_frequent.")
+    parser.add_argument("--dtype", default="float32", help="Data type of the data.")
+    parser.add_argument("--repetitions", default=3, type=int, help="Number of repetitions.")
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(0)
+    X = rng.randn(args.num_samples, args.num_features).astype(args.dtype)
+    categorical_features = [i % 10 == 0 for i in range(args.num_features)]
+    X[:, categorical_features] = rng.randint(0, 5, (args.num_samples, sum(categorical_features)))
+    X[rng.rand(*X.shape) < 0.05] = np.nan
+    train_indices = rng.permutation(args.num_samples)[:int(args.num_samples * 0.67)]
+
+    sklearn_time, expected = measure(sklearn_path, args.repetitions, X, categorical_features, train_indices, args.strategy)
+    kernel_time, result = measure(kernel_path, args.repetitions, X, categorical_features, train_indices, args.strategy)
+
+    print("identical outputs: %s" % np.array_equal(result, expected))
+    print("ColumnTransformer: %.3f s" % sklearn_time)
+    print("Column kernels:    %.3f s (%.1fx)" % (kernel_time, sklearn_time / kernel_time))
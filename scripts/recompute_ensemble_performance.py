@@ -23,6 +23,7 @@ if __name__ == "__main__":
     parser.add_argument("--ensemble_size", default=0, type=int, help="Ensemble config")
     parser.add_argument("--ensemble_only_consider_n_best", default=0, type=int, help="Ensemble config")
     parser.add_argument("--ensemble_sorted_initialization_n_best", default=0, type=int, help="Ensemble config")
+    parser.add_argument("--num_workers", default=1, type=int, help="Number of processes that build the ensembles over time.")
     parser.add_argument('benchmark', help='The benchmark to visualize')
 
     args = parser.parse_args()
@@ -59,6 +60,7 @@ if __name__ == "__main__":
     benchmark_config["ensemble_size"] = args.ensemble_size
     benchmark_config["ensemble_only_consider_n_best"] = args.ensemble_only_consider_n_best
     benchmark_config["ensemble_sorted_initialization_n_best"] = args.ensemble_sorted_initialization_n_best
+    benchmark_config["ensemble_log_num_workers"] = args.num_workers
     benchmark_config['benchmark_name'] = os.path.basename(args.benchmark).split(".")[0]
     
     benchmark.compute_ensemble_performance(**benchmark_config)
@@ -20,6 +20,8 @@ if __name__ == "__main__":
     parser.add_argument("--partial_benchmark", default=None, nargs="+", help="Only run a part of the benchmark. Run other parts later or in parallel. 3-tuple: instance_slice, autonet_config_slice, run_number_range.")
     parser.add_argument("--result_dir", default=None, help="Override result dir in benchmark config.")
     parser.add_argument("--host_config", default=None, help="Override some configs according to host specifics.")
+    parser.add_argument("--num_local_jobs", default=None, type=int, help="Run this many combinations of instance, autonet config and run in parallel on this machine.")
+    parser.add_argument("--resume", action="store_true", help="Skip runs that have already written a summary.json.")
     parser.add_argument('benchmark', help='The benchmark to run')
     args = parser.parse_args()
 
@@ -45,6 +47,11 @@ if __name__ == "__main__":
         if len(args.partial_benchmark) > 2:
             benchmark_config['run_number_range'] = args.partial_benchmark[2]
 
+    if args.num_local_jobs is not None:
+        benchmark_config['num_local_jobs'] = args.num_local_jobs
+    if args.resume:
+        benchmark_config['skip_finished_runs'] = True
+
     benchmark_config['run_id'] = args.run_id
     benchmark_config['task_id'] = args.task_id
     benchmark_config['benchmark_name'] = os.path.basename(args.benchmark).split(".")[0]
@@ -0,0 +1,91 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import logging
+import torch
+from unittest.mock import Mock, patch
+
+from autoPyTorch.components.training.budget_types import BudgetTypeTime, BudgetTypeEpochs
+from autoPyTorch.components.training.lr_scheduling import LrScheduling
+from autoPyTorch.components.lr_scheduler.lr_schedulers import SchedulerCosineAnnealingLR
+
+
+class Clock():
+    def __init__(self):
+        self.now = 0.0
+        self.reads = 0
+
+    def time(self):
+        self.reads += 1
+        return self.now
+
+
+def train(techniques, trainer, clock, num_steps, batch_cost, eval_cost):
+    """Simulate the training loop of the TrainNode, returns the number of epochs and the steps of the last epoch"""
+    epoch = 0
+    while True:
+        for t in techniques:
+            t.on_epoch_start(trainer=trainer, log=dict(), epoch=epoch)
+        stop = False
+        for step in range(num_steps):
+            clock.now += batch_cost
+            if any([t.on_batch_end(batch_loss=0, trainer=trainer, epoch=epoch + 1, step=step, num_steps=num_steps) for t in techniques]):
+                stop = True
+                break
+        clock.now += eval_cost
+        stop = any([t.on_epoch_end(trainer=trainer, log={"loss": 0}, epoch=epoch) for t in techniques]) or stop
+        if stop:
+            return epoch + 1, step + 1
+        epoch += 1
+
+
+class TestBudgetPlanner(unittest.TestCase):
+
+    def setUp(self):
+        self.trainer = Mock()
+        self.trainer.logger = logging.getLogger('autonet')
+        self.trainer.fit_start_time = 0.0
+        self.trainer.budget = 110
+
+    def test_plan_full_epochs(self):
+        with patch("autoPyTorch.components.training.budget_types.time", Clock()) as clock:
+            budget_type = BudgetTypeTime()
+            budget_type.set_up(self.trainer, dict())
+            num_epochs, last_steps = train([budget_type], self.trainer, clock, num_steps=100, batch_cost=0.1, eval_cost=3)
+
+        # an epoch takes 13 seconds, 7 of them fit into 110 - 10 seconds
+        self.assertEqual((num_epochs, last_steps), (7, 100))
+        self.assertEqual(self.trainer.planned_epochs, 7)
+        self.assertLess(clock.reads, 50)
+        self.assertLessEqual(clock.now, 100)
+
+    def test_cut_long_epoch(self):
+        with patch("autoPyTorch.components.training.budget_types.time", Clock()) as clock:
+            budget_type = BudgetTypeTime(compensate=20)
+            budget_type.set_up(self.trainer, dict())
+            num_epochs, last_steps = train([budget_type], self.trainer, clock, num_steps=10000, batch_cost=0.1, eval_cost=3)
+
+        self.assertEqual((num_epochs, last_steps), (1, 900))
+        self.assertLess(clock.reads, 15)
+
+    def test_fit_cosine_schedule_to_budget(self):
+        optimizer = torch.optim.SGD(torch.nn.Linear(2, 2).parameters(), lr=1.0)
+        scheduler = SchedulerCosineAnnealingLR(optimizer, {"T_max": 500, "eta_min": 1e-8})
+        lr_scheduling = LrScheduling(training_components={"lr_scheduler": scheduler}, lr_step_after_batch=False,
+            lr_step_with_time=False, allow_snapshot=True, fit_to_budget=True)
+        self.trainer.lr_scheduler = scheduler
+
+        with patch("autoPyTorch.components.training.budget_types.time", Clock()) as clock:
+            budget_type = BudgetTypeTime()
+            budget_type.set_up(self.trainer, dict())
+            num_epochs, _ = train([lr_scheduling, budget_type], self.trainer, clock, num_steps=100, batch_cost=0.1, eval_cost=3)
+
+        self.assertEqual(num_epochs, 7)
+        self.assertEqual(scheduler.T_max, 6)
+        self.assertAlmostEqual(optimizer.param_groups[0]["lr"], 1e-8)
+
+        # epoch budgets plan the epochs in advance
+        BudgetTypeEpochs().set_up(self.trainer, dict())
+        self.assertEqual(self.trainer.planned_epochs, 111)
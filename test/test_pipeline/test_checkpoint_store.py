@@ -0,0 +1,90 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import os
+import unittest
+import logging
+import tempfile
+import numpy as np
+import torch
+import torch.nn as nn
+from types import SimpleNamespace
+
+from autoPyTorch.components.training.checkpoint_store import CheckpointStore
+
+
+def create_trainer(seed):
+    torch.manual_seed(seed)
+    model = nn.Linear(3, 2)
+    model.epochs_trained = 0
+    model.budget_trained = 0
+    model.logs = []
+    model.num_epochs_no_progress = 0
+    model.current_best_epoch_performance = None
+    model.best_parameters = None
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.1, momentum=0.9)
+    lr_scheduler = torch.optim.lr_scheduler.StepLR(optimizer, step_size=1, gamma=0.5)
+    return SimpleNamespace(model=model, optimizer=optimizer, lr_scheduler=lr_scheduler, logger=None)
+
+
+class TestCheckpointStore(unittest.TestCase):
+
+    def test_resume_on_higher_budget(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = CheckpointStore(directory)
+            config_id = (0, 0, 1)
+            train_indices = np.arange(10)
+
+            trainer = create_trainer(seed=0)
+            trainer.model(torch.ones(4, 3)).sum().backward()
+            trainer.optimizer.step()
+            trainer.lr_scheduler.step()
+            trainer.model.logs = [{"loss": 1.0}, {"loss": 0.5}]
+            trainer.model.budget_trained = 1
+            store.save(config_id, train_indices, trainer, budget=2, next_epoch=2)
+
+            # same or lower budget: nothing to resume
+            resumed = create_trainer(seed=1)
+            self.assertIsNone(store.load(config_id, train_indices, resumed, budget=2))
+            self.assertIsNone(store.load(config_id, np.arange(5), resumed, budget=6))
+            self.assertIsNone(store.load((0, 0, 2), train_indices, resumed, budget=6))
+
+            self.assertEqual(store.load(config_id, train_indices, resumed, budget=6), 2)
+            self.assertTrue(torch.equal(resumed.model.weight, trainer.model.weight))
+            self.assertEqual(resumed.model.epochs_trained, 2)
+            self.assertEqual(resumed.model.logs, trainer.model.logs)
+            self.assertEqual(resumed.lr_scheduler.get_last_lr(), trainer.lr_scheduler.get_last_lr())
+            momentum = lambda t: t.optimizer.state_dict()["state"][0]["momentum_buffer"]
+            self.assertTrue(torch.equal(momentum(resumed), momentum(trainer)))
+
+    def test_failed_load_restores_nothing(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = CheckpointStore(directory)
+            config_id = (0, 0, 1)
+            train_indices = np.arange(10)
+            store.save(config_id, train_indices, create_trainer(seed=0), budget=2, next_epoch=2)
+
+            # the learning rate scheduler fails after the network and the optimizer have been restored
+            trainer = create_trainer(seed=1)
+            trainer.logger = logging.getLogger('autonet')
+            weight = trainer.model.weight.detach().clone()
+            def fail(state_dict):
+                raise RuntimeError("incompatible scheduler")
+            trainer.lr_scheduler.load_state_dict = fail
+            self.assertIsNone(store.load(config_id, train_indices, trainer, budget=6))
+            self.assertTrue(torch.equal(trainer.model.weight, weight))
+            self.assertEqual(trainer.model.epochs_trained, 0)
+            self.assertEqual(trainer.optimizer.state_dict()["state"], {})
+
+            # a different network is rejected before anything is restored
+            trainer = create_trainer(seed=1)
+            trainer.logger = logging.getLogger('autonet')
+            trainer.model.weight = nn.Parameter(torch.zeros(4, 3))
+            self.assertIsNone(store.load(config_id, train_indices, trainer, budget=6))
+            self.assertEqual(trainer.model.epochs_trained, 0)
+
+            # checkpoints of configs evaluated on the max budget are removed
+            store.remove(config_id, train_indices)
+            store.remove(config_id, train_indices)
+            self.assertEqual(os.listdir(directory), [])
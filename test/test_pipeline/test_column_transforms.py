@@ -0,0 +1,68 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import numpy as np
+import torch
+from numpy.testing import assert_array_equal, assert_array_almost_equal
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler, MinMaxScaler, MaxAbsScaler
+
+from autoPyTorch.components.preprocessing.column_transforms import ColumnImputer, ColumnScaler
+from autoPyTorch.core.inference_model import fold_transformer
+
+
+def create_data(dtype):
+    rng = np.random.RandomState(0)
+    X = (rng.randn(200, 8) * rng.rand(8) * 100).astype(dtype)
+    X[:, [2, 5]] = rng.randint(0, 5, (200, 2))
+    X[:, 3] = rng.randint(0, 3, 200)
+    X[rng.rand(200, 8) < 0.2] = np.nan
+    X[:100, 6] = np.nan
+    X[:, 7] = 3
+    categorical_features = [False, False, True, False, False, True, False, False]
+    return X, categorical_features, np.arange(100)
+
+
+class TestColumnTransforms(unittest.TestCase):
+
+    def test_column_imputer(self):
+        for dtype in [np.float64, np.float32]:
+            X, categorical_features, train_indices = create_data(dtype)
+            numerical = [i for i, c in enumerate(categorical_features) if not c]
+            categorical = [i for i, c in enumerate(categorical_features) if c]
+
+            for strategy in ["mean", "median", "most_frequent"]:
+                expected = ColumnTransformer([("numerical", SimpleImputer(strategy=strategy), numerical),
+                                              ("categorical", SimpleImputer(strategy="constant", fill_value=7), categorical)])
+                expected = expected.fit(X[train_indices]).transform(X)
+
+                imputer = ColumnImputer(strategy, categorical_features, 7)
+                result = imputer.fit_transform(X, train_indices)
+                self.assertEqual(result.dtype, expected.dtype)
+                assert_array_equal(result, expected)
+                assert_array_equal(imputer.transform(torch.from_numpy(X)).numpy(), expected)
+                assert_array_almost_equal(fold_transformer(imputer)(X), expected, decimal=4)
+
+                if strategy != "most_frequent":
+                    statistics = ColumnImputer(strategy, categorical_features, 7).fit(torch.from_numpy(X), torch.from_numpy(train_indices)).statistics
+                    assert_array_almost_equal(statistics, imputer.statistics, decimal=3)
+
+    def test_column_scaler(self):
+        for dtype in [np.float64, np.float32]:
+            X, categorical_features, train_indices = create_data(dtype)
+            X = ColumnImputer("median", categorical_features, 7).fit_transform(X, train_indices)
+            categorical_features = [False] * (X.shape[1] - 2) + [True] * 2
+
+            for scaler in [StandardScaler, MinMaxScaler, MaxAbsScaler]:
+                expected = ColumnTransformer([("normalize", scaler(), [i for i, c in enumerate(categorical_features) if not c])], remainder="passthrough")
+                expected = expected.fit(X[train_indices]).transform(X)
+
+                normalizer = ColumnScaler(scaler, categorical_features)
+                result = normalizer.fit_transform(X, train_indices)
+                self.assertEqual(result.dtype, expected.dtype)
+                assert_array_equal(result, expected)
+                assert_array_almost_equal(normalizer.transform(torch.from_numpy(X)).numpy(), expected)
+                assert_array_almost_equal(fold_transformer(normalizer)(X), expected, decimal=4)
@@ -0,0 +1,61 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import numpy as np
+import torch
+import scipy.sparse
+
+from autoPyTorch.pipeline.base.pipeline import Pipeline
+from autoPyTorch.pipeline.nodes.create_dataloader import CreateDataLoader
+from autoPyTorch.data_management.tensor_loader import TensorBatchLoader, SparseBatchLoader
+
+
+class TestCreateDataLoaderMethods(unittest.TestCase):
+
+    def test_tensor_batch_loader(self):
+        X = torch.arange(20).float().reshape(10, 2)
+        Y = torch.arange(10)
+
+        loader = TensorBatchLoader(X, Y, indices=np.array([1, 3, 5, 7, 9]), batch_size=2, shuffle=True)
+        self.assertEqual(len(loader), 3)
+        batches = list(loader)
+        self.assertListEqual([len(y) for _, y in batches], [2, 2, 1])
+        self.assertListEqual(sorted(torch.cat([y for _, y in batches]).tolist()), [1, 3, 5, 7, 9])
+        for x, y in batches:
+            self.assertTrue(torch.equal(x, X[y]))
+
+        loader = TensorBatchLoader(X, Y, batch_size=4, drop_last=True)
+        self.assertListEqual([y.tolist() for _, y in loader], [[0, 1, 2, 3], [4, 5, 6, 7]])
+
+    def test_create_dataloader(self):
+        pipeline = Pipeline([
+            CreateDataLoader()
+        ])
+        pipeline_config = pipeline.get_pipeline_config()
+        pipeline_config["random_seed"] = 42
+        hyperparameter_config = {CreateDataLoader.get_name() + ":batch_size": 3}
+
+        X = np.random.rand(10, 2)
+        Y = np.arange(10)
+        pipeline.fit_pipeline(pipeline_config=pipeline_config, hyperparameter_config=hyperparameter_config,
+            X=X, Y=Y, train_indices=np.arange(7), valid_indices=np.arange(7, 10))
+
+        train_loader = pipeline[CreateDataLoader.get_name()].fit_output['train_loader']
+        valid_loader = pipeline[CreateDataLoader.get_name()].fit_output['valid_loader']
+        self.assertEqual(len(train_loader), 2)
+        train_targets = torch.cat([y for _, y in train_loader]).tolist()
+        self.assertEqual(len(set(train_targets)), 6)
+        self.assertTrue(set(train_targets) <= set(range(7)))
+        self.assertListEqual([y.tolist() for _, y in valid_loader], [[7, 8, 9]])
+
+    def test_sparse_batch_loader(self):
+        X = scipy.sparse.random(10, 5, density=0.3, format="csr", random_state=1)
+        Y = torch.arange(10)
+
+        loader = SparseBatchLoader(X, Y, indices=np.arange(8), batch_size=3, shuffle=True)
+        self.assertEqual(len(loader), 3)
+        for x, y in loader:
+            np.testing.assert_array_almost_equal(x.numpy(), X[y.numpy()].toarray())
+            self.assertEqual(x.dtype, torch.float32)
@@ -15,7 +15,7 @@ from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
 from autoPyTorch.pipeline.base.pipeline import Pipeline
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
 from autoPyTorch.pipeline.nodes.cross_validation import CrossValidation
-from autoPyTorch.components.training.budget_types import BudgetTypeEpochs
+from autoPyTorch.components.training.budget_types import BudgetTypeEpochs, BudgetTypeTime, BudgetTypeTrainingTime
 from autoPyTorch.pipeline.nodes.create_dataset_info import DataSetInfo
 
 class TestCrossValidationMethods(unittest.TestCase):
@@ -111,4 +111,83 @@ class TestCrossValidationMethods(unittest.TestCase):
                                           optimize_start_time=time.time(), refit=False, dataset_info=dataset_info, rescore=False)
 
         self.assertEqual(cv_result['loss'], 45)
-        self.assertDictEqual(cv_result['info'], {'a': 171, 'b': 45})
\ No newline at end of file
+        self.assertDictEqual(cv_result['info'], {'a': 171, 'b': 45})
+
+    def test_cross_validation_parallel(self):
+
+        class ResultNode(PipelineNode):
+            def fit(self, X, Y, train_indices, valid_indices):
+                return { 'loss': np.sum(X[valid_indices]), 'info': {'a': np.sum(X[train_indices]), 'b': np.sum(X[valid_indices])} }
+
+        pipeline = Pipeline([
+            CrossValidation([
+                ResultNode()
+            ])
+        ])
+        pipeline["CrossValidation"].add_cross_validator("k_fold", KFold, lambda x: x.reshape((-1 ,)))
+
+        x_train = np.array([[1, 2, 3], [4, 5, 6], [7, 8, 9]])
+        y_train = np.array([[1], [0], [1]])
+
+        for cv_parallel_workers in [1, 2]:
+            pipeline_config = pipeline.get_pipeline_config(cross_validator="k_fold", cross_validator_args={"n_splits": 3},
+                                                           cv_parallel_workers=cv_parallel_workers)
+            pipeline_config_space = pipeline.get_hyperparameter_search_space(**pipeline_config)
+            dataset_info = DataSetInfo()
+            dataset_info.categorical_features = [None] * 3
+            dataset_info.x_shape = x_train.shape
+            dataset_info.y_shape = y_train.shape
+            pipeline_config["random_seed"] = 42
+
+            cv_result = pipeline.fit_pipeline(hyperparameter_config=pipeline_config_space, pipeline_config=pipeline_config, 
+                                              X_train=x_train, Y_train=y_train, X_valid=None, Y_valid=None, 
+                                              budget=5, budget_type=BudgetTypeEpochs, one_hot_encoder=None,
+                                              optimize_start_time=time.time(), refit=False, dataset_info=dataset_info, rescore=False,
+                                              hyperparameter_config_id=None)
+
+            self.assertEqual(cv_result['loss'], 15)
+            self.assertDictEqual(cv_result['info'], {'a': 30, 'b': 15})
+
+    def test_cross_validation_parallel_budget(self):
+
+        class FakeBudgetTypeTime(BudgetTypeTime):
+            pass
+
+        class BudgetNode(PipelineNode):
+            def fit(self, X, Y, budget, training_techniques):
+                compensate = getattr(training_techniques[0], "compensate", 0)
+                return {'loss': 0, 'info': {'budget': budget, 'compensate': compensate}}
+
+        pipeline = Pipeline([
+            CrossValidation([
+                BudgetNode()
+            ])
+        ])
+        pipeline["CrossValidation"].add_cross_validator("k_fold", KFold, lambda x: x.reshape((-1 ,)))
+
+        x_train = np.arange(12).reshape((4, 3))
+        y_train = np.array([[1], [0], [1], [0]])
+
+        def fit(cv_parallel_workers, budget_type):
+            pipeline_config = pipeline.get_pipeline_config(cross_validator="k_fold", cross_validator_args={"n_splits": 4},
+                                                           cv_parallel_workers=cv_parallel_workers)
+            pipeline_config_space = pipeline.get_hyperparameter_search_space(**pipeline_config)
+            pipeline_config["random_seed"] = 42
+            dataset_info = DataSetInfo()
+            dataset_info.categorical_features = [None] * 3
+            dataset_info.x_shape = x_train.shape
+            dataset_info.y_shape = y_train.shape
+            return pipeline.fit_pipeline(hyperparameter_config=pipeline_config_space, pipeline_config=pipeline_config,
+                                         X_train=x_train, Y_train=y_train, X_valid=None, Y_valid=None,
+                                         budget=120, budget_type=budget_type, one_hot_encoder=None,
+                                         optimize_start_time=time.time(), refit=False, dataset_info=dataset_info, rescore=False,
+                                         hyperparameter_config_id=None)['info']
+
+        # all splits at the same time: each split gets the whole time budget
+        info = fit(4, FakeBudgetTypeTime)
+        self.assertAlmostEqual(info['budget'], 120, delta=1)
+        self.assertEqual(info['compensate'], 10)
+
+        # two rounds of two splits
+        self.assertEqual(fit(2, BudgetTypeTrainingTime)['budget'], 60)
+        self.assertEqual(fit(2, BudgetTypeEpochs)['budget'], 30)
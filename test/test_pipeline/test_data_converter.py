@@ -0,0 +1,35 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from autoPyTorch.data_management.data_converter import DataConverter
+
+
+class TestDataConverter(unittest.TestCase):
+
+    def test_convert_matrix(self):
+        X = np.array([
+            [0.1, "b", 1, 7],
+            [0.2, np.nan, 2, 7],
+            [0.3, "a", np.nan, 7],
+            [0.4, "b", 2, 7]], dtype=object)
+
+        for num_threads in [1, 2]:
+            converter = DataConverter(num_threads=num_threads)
+            result, categorical = converter.convert_matrix(X, force_categorical=[], force_numerical=[])
+
+            # constant columns are dropped, missing values are an additional category with the highest index
+            self.assertEqual(categorical, [False, True, False])
+            self.assertTrue(result.flags.f_contiguous)
+            self.assertEqual(result.dtype, np.float32)
+            assert_array_equal(result[:, 0], np.array([0.1, 0.2, 0.3, 0.4], dtype=np.float32))
+            assert_array_equal(result[:, 1], [0, 2, 1, 0])
+            assert_array_equal(result[:, 2], [1, 2, np.nan, 2])
+
+        result, categorical = DataConverter().convert_matrix(X[:, [0, 2]].astype(float), force_categorical=[1], force_numerical=[])
+        self.assertEqual(categorical, [False, True])
+        assert_array_equal(result[:, 1], [0, 1, 2, 1])
@@ -0,0 +1,88 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import os
+import unittest
+import tempfile
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from autoPyTorch.data_management.data_reader import AutoMlReader, CSVReader
+
+
+class TestDataReader(unittest.TestCase):
+
+    def write_automl_dataset(self, directory, is_sparse, feat_type="Numerical"):
+        info = ["task = 'binary.classification'", "name = 'data'", "metric = 'bac_metric'", "time_budget = 100",
+                "target_num = 1", "feat_num = 4", "train_num = 3", "valid_num = 0", "test_num = 0",
+                "is_sparse = " + str(int(is_sparse)), "feat_type = '" + feat_type + "'"]
+        with open(os.path.join(directory, "data.info"), "w") as f:
+            f.write("\n".join(info) + "\n")
+        with open(os.path.join(directory, "data_train.solution"), "w") as f:
+            f.write("1\n0\n1\n")
+        return os.path.join(directory, "data.info")
+
+    def test_read_dense(self):
+        with tempfile.TemporaryDirectory() as directory:
+            info_file = self.write_automl_dataset(directory, is_sparse=False)
+            with open(os.path.join(directory, "data_train.data"), "w") as f:
+                f.write("1 2 3 4 \n5 6.5 7 8\n-1 0 1e3 2\n")
+
+            reader = AutoMlReader(info_file, chunk_size=2)
+            reader.read(auto_convert=False)
+            assert_array_equal(reader.X, [[1, 2, 3, 4], [5, 6.5, 7, 8], [-1, 0, 1000, 2]])
+            assert_array_equal(reader.Y, [[1], [0], [1]])
+
+    def test_read_sparse(self):
+        with tempfile.TemporaryDirectory() as directory:
+            info_file = self.write_automl_dataset(directory, is_sparse=True)
+            with open(os.path.join(directory, "data_train.data"), "w") as f:
+                f.write("1:0.5 4:2\n\n2:3 3:-1 \n")
+
+            reader = AutoMlReader(info_file, chunk_size=2)
+            reader.read(auto_convert=False)
+            assert_array_equal(reader.X.toarray(), [[0.5, 0, 0, 2], [0, 0, 0, 0], [0, 3, -1, 0]])
+
+            self.write_automl_dataset(directory, is_sparse=True, feat_type="Binary")
+            with open(os.path.join(directory, "data_train.data"), "w") as f:
+                f.write("1 4\n\n2 3\n")
+            reader.read(auto_convert=False)
+            assert_array_equal(reader.X.toarray(), [[1, 0, 0, 1], [0, 0, 0, 0], [0, 1, 1, 0]])
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            info_file = self.write_automl_dataset(directory, is_sparse=False)
+            data_file = os.path.join(directory, "data_train.data")
+            cache_dir = os.path.join(directory, "cache")
+            with open(data_file, "w") as f:
+                f.write("1 2 3 4\n5 6 7 8\n9 10 11 12\n")
+
+            reader = AutoMlReader(info_file, cache_dir=cache_dir)
+            reader.read(auto_convert=False)
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+            # cached data is used as long as the file is not modified
+            reader.read_datafile = None
+            reader.read(auto_convert=False)
+            assert_array_equal(reader.X[0], [1, 2, 3, 4])
+
+            with open(data_file, "w") as f:
+                f.write("0 0 0 0\n5 6 7 8\n9 10 11 12\n")
+            os.utime(data_file, ns=(0, 0))
+            reader = AutoMlReader(info_file, cache_dir=cache_dir)
+            reader.read(auto_convert=False)
+            assert_array_equal(reader.X[0], [0, 0, 0, 0])
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+    def test_csv_missing_values(self):
+        with tempfile.TemporaryDirectory() as directory:
+            csv_file = os.path.join(directory, "data.csv")
+            with open(csv_file, "w") as f:
+                f.write("a,b,y\n1,x,0\n?,?,1\n3,z,?\n")
+
+            reader = CSVReader(csv_file)
+            reader.read(auto_convert=False)
+            self.assertTrue(np.isnan(reader.X[1, 0]) and np.isnan(reader.X[1, 1]))
+            self.assertEqual(reader.X[0, 1], "x")
+            self.assertEqual(reader.Y[2], "?")
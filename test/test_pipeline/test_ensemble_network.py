@@ -0,0 +1,38 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import torch
+import torch.nn as nn
+
+from autoPyTorch.components.networks.feature.mlpnet import MlpNet
+from autoPyTorch.components.networks.feature.embedding import NoEmbedding
+from autoPyTorch.components.ensembles.ensemble_network import EnsembleNetwork
+
+
+def create_network(seed, num_units=8, activation="relu"):
+    torch.manual_seed(seed)
+    config = {"num_layers": 2, "num_units_1": num_units, "num_units_2": num_units, "activation": activation, "use_dropout": True,
+              "dropout_1": 0.5, "dropout_2": 0.5}
+    return MlpNet(config=config, in_features=5, out_features=3, embedding=NoEmbedding(config, 5, None), final_activation=nn.Softmax(1))
+
+
+class TestEnsembleNetwork(unittest.TestCase):
+
+    def test_weighted_prediction(self):
+        networks = [create_network(0), create_network(1), create_network(2, activation="tanh"), create_network(3, num_units=4), create_network(4)]
+        weights = [0.2, 0.3, 0.1, 0.3, 0.1]
+        X = torch.randn(20, 5)
+
+        for network in networks:
+            network.eval()
+        expected = sum(w * n(X) for w, n in zip(weights, networks))
+
+        for num_threads, stack_networks in [(1, True), (1, False), (3, False)]:
+            ensemble = EnsembleNetwork(networks, weights, num_threads=num_threads, stack_networks=stack_networks)
+            ensemble.eval()
+            self.assertEqual(len(ensemble.groups), 3 if stack_networks else 5)
+            result = ensemble(X)
+            self.assertTrue(torch.allclose(result, expected, atol=1e-6))
+            self.assertEqual(len(ensemble.stacked), 1 if stack_networks else 0)
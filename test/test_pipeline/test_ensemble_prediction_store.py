@@ -0,0 +1,65 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import os
+import unittest
+import tempfile
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from autoPyTorch.utils.ensemble import EnsemblePredictionStore, read_ensemble_prediction_file, offer_predictions, fetch_predictions, \
+    get_transfer_file_name, start_server
+
+
+class TestEnsemblePredictionStore(unittest.TestCase):
+
+    def test_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "predictions_for_ensemble.npy")
+            store = EnsemblePredictionStore(filename)
+            store.create(overwrite=False)
+            self.assertRaises(FileExistsError, store.create, overwrite=False)
+
+            labels = np.array([0, 1, 1])
+            predictions = [np.random.rand(3, 2).astype(np.float32) for _ in range(3)]
+            store.write_labels(labels)
+            store.append((0, 0, 0), 1.0, {"finished": 1.0}, 0.3, predictions[0])
+            store.append((0, 0, 1), 3.0, {"finished": 2.0}, 0.1, predictions[1])
+            store.append((-1, 0, 0), 0.0, {"finished": 2.0}, None, predictions[2])
+
+            y_transform = lambda y: (y, None)
+            all_predictions, all_labels, model_identifiers, timestamps = read_ensemble_prediction_file(filename, y_transform)
+            assert_array_equal(all_labels, labels)
+            for p, q in zip(all_predictions, predictions):
+                assert_array_equal(p, q)
+            self.assertListEqual(model_identifiers, [(0, 0, 0, 1.0), (0, 0, 1, 3.0), (-1, 0, 0, 0.0)])
+            self.assertListEqual(timestamps, [{"finished": 1.0}, {"finished": 2.0}, {"finished": 2.0}])
+
+            all_predictions, _, model_identifiers, _ = read_ensemble_prediction_file(filename, y_transform, budgets=[3.0])
+            self.assertListEqual(model_identifiers, [(0, 0, 1, 3.0)])
+            assert_array_equal(all_predictions[0], predictions[1])
+
+            _, _, model_identifiers, _ = read_ensemble_prediction_file(filename, y_transform, n_best=2)
+            self.assertListEqual(model_identifiers, [(0, 0, 0, 1.0), (0, 0, 1, 3.0)])
+
+    def test_transfer(self):
+        host, port, server = start_server("127.0.0.1")
+        try:
+            pipeline_kwargs = {0: {"pipeline_config": {"ensemble_server_credentials": (host, port)}}}
+            predictions = np.random.rand(10, 3)
+            labels = np.arange(10)
+
+            # same host: shared memory
+            handle = offer_predictions(pipeline_kwargs, predictions, labels)
+            assert_array_equal(fetch_predictions(handle, "labels"), labels)
+            assert_array_equal(fetch_predictions(handle, "predictions"), predictions)
+
+            # other host: ensemble server
+            handle = offer_predictions(pipeline_kwargs, predictions, labels)[:3] + ("other_host", )
+            assert_array_equal(fetch_predictions(handle, "predictions"), predictions)
+            self.assertFalse(os.path.exists(get_transfer_file_name("predictions", handle[2])))
+            self.assertFalse(os.path.exists(get_transfer_file_name("labels", handle[2])))
+        finally:
+            server.shutdown()
+            server.join()
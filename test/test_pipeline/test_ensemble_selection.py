@@ -0,0 +1,39 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import numpy as np
+
+from autoPyTorch.components.ensembles.ensemble_selection import EnsembleSelection
+from autoPyTorch.pipeline.nodes.metric_selector import AutoNetMetric, undo_ohe, default_minimize_transform
+
+
+def accuracy(y_true, y_pred):
+    return np.mean(y_true == y_pred)
+
+def batched_accuracy(y_true, y_pred):
+    return np.mean(y_true == y_pred, axis=1)
+
+
+class TestEnsembleSelection(unittest.TestCase):
+
+    def test_batched_metric(self):
+        random_state = np.random.RandomState(0)
+        predictions = random_state.rand(30, 50, 3)
+        labels = np.eye(3)[random_state.randint(0, 3, 50)]
+
+        scalar_metric = AutoNetMetric("accuracy", accuracy, default_minimize_transform, undo_ohe)
+        batched_metric = AutoNetMetric("accuracy", accuracy, default_minimize_transform, undo_ohe, batched_metric=batched_accuracy)
+        np.testing.assert_array_almost_equal(batched_metric.get_loss_values(predictions, labels),
+                                             scalar_metric.get_loss_values(predictions, labels))
+
+        results = []
+        for metric in [scalar_metric, batched_metric]:
+            np.random.seed(1)
+            ensemble = EnsembleSelection(10, metric, sorted_initialization_n_best=2, only_consider_n_best=20)
+            ensemble.fit(predictions, labels, list(range(30)))
+            results.append(ensemble)
+        self.assertListEqual(list(results[0].indices_), list(results[1].indices_))
+        np.testing.assert_array_almost_equal(results[0].weights_, results[1].weights_)
+        np.testing.assert_array_almost_equal(results[0].trajectory_, results[1].trajectory_)
@@ -0,0 +1,58 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import pickle
+import unittest
+import numpy as np
+import scipy.sparse
+import torch
+import torch.nn as nn
+from numpy.testing import assert_array_almost_equal, assert_array_equal
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler, MinMaxScaler, MaxAbsScaler, OneHotEncoder
+
+from autoPyTorch.core.inference_model import InferenceModel, fold_transformer
+
+
+def to_dense(X):
+    return X.toarray() if scipy.sparse.issparse(X) else X
+
+
+class TestInferenceModel(unittest.TestCase):
+
+    def test_fold_transformers(self):
+        rng = np.random.RandomState(0)
+        X = rng.randn(30, 5)
+        X[:, 3:] = rng.randint(0, 3, (30, 2))
+        X[rng.rand(30, 5) < 0.2] = np.nan
+        X[:, 1] = np.nan
+        X_test = rng.randn(10, 5)
+        X_test[:, 3:] = rng.randint(0, 4, (10, 2))
+        X_test[rng.rand(10, 5) < 0.2] = np.nan
+
+        # columns without statistics are dropped, as in sklearn
+        imputer = ColumnTransformer([("numerical", SimpleImputer(strategy="median"), [0, 1, 2]),
+                                     ("categorical", SimpleImputer(strategy="constant", fill_value=5), [3, 4])]).fit(X)
+        assert_array_almost_equal(fold_transformer(imputer)(X_test), imputer.transform(X_test))
+        X, X_test = imputer.transform(X), imputer.transform(X_test)
+
+        for scaler in [StandardScaler(), MinMaxScaler(), MaxAbsScaler()]:
+            normalizer = ColumnTransformer([("normalize", scaler, [0, 1])], remainder="passthrough").fit(X)
+            assert_array_almost_equal(fold_transformer(normalizer)(X_test), normalizer.transform(X_test))
+
+        encoder = ColumnTransformer([("ohe", OneHotEncoder(categories="auto", handle_unknown="ignore"), [2, 3])], remainder="passthrough").fit(X)
+        assert_array_almost_equal(fold_transformer(encoder)(X_test), to_dense(encoder.transform(X_test)))
+
+    def test_predict(self):
+        network = nn.Sequential(nn.Linear(3, 2), nn.Softmax(1))
+        scaler = StandardScaler().fit(np.random.randn(10, 3))
+        model = InferenceModel(transforms=[fold_transformer(scaler)], network=network, y_categories=np.array(["a", "b"]))
+        model = pickle.loads(pickle.dumps(model))
+
+        X = np.random.randn(4, 3)
+        expected = network(torch.from_numpy(scaler.transform(X)).float()).detach().numpy()
+        assert_array_almost_equal(model.predict_proba(X), expected)
+        assert_array_equal(model.predict(X), np.array(["a", "b"])[np.argmax(expected, axis=1)].reshape(-1, 1))
+        self.assertEqual(model(X[0]).shape, (1, 1))
@@ -0,0 +1,69 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import logging
+import threading
+import numpy as np
+from unittest.mock import Mock
+
+from autoPyTorch.components.training.learning_curve import LearningCurveTermination, probability_to_beat
+from autoPyTorch.pipeline.nodes.cross_validation import CrossValidation
+from autoPyTorch.pipeline.nodes.optimization_algorithm import incumbent_logger
+from autoPyTorch.core.hpbandster_extensions.bohb_ext import BOHBExt
+
+
+class TestLearningCurveTermination(unittest.TestCase):
+
+    def test_probability_to_beat(self):
+        t = np.arange(1, 9)
+        y = 0.3 + 0.5 * t ** -0.8 + np.random.RandomState(0).normal(0, 0.005, len(t))
+
+        self.assertLess(probability_to_beat(t, y, 50, incumbent_loss=0.1), 0.01)
+        self.assertGreater(probability_to_beat(t, y, 50, incumbent_loss=0.4), 0.99)
+        self.assertEqual(probability_to_beat(t, y, 50, incumbent_loss=y.min() + 0.01), 1)
+
+    def test_stop_hopeless_config(self):
+        trainer = Mock()
+        trainer.metrics = [Mock(loss_transform=lambda x: -x)]
+        trainer.metrics[0].name = "accuracy"
+        trainer.budget = 50
+        trainer.logger = logging.getLogger('autonet')
+        pipeline_config = {"learning_curve_min_epochs": 5, "learning_curve_min_probability": 0.05}
+
+        def run(incumbent_loss):
+            technique = LearningCurveTermination(incumbent_loss=incumbent_loss)
+            technique.set_up(trainer, pipeline_config)
+            for epoch in range(trainer.budget):
+                trainer.model.budget_trained = epoch
+                if technique.on_epoch_end(trainer=trainer, log={"val_accuracy": 70 - 20 * 0.8 ** epoch}, epoch=epoch):
+                    return epoch + 1
+            return trainer.budget
+
+        self.assertEqual(run(incumbent_loss=-90), 5)
+        self.assertEqual(run(incumbent_loss=-60), 50)
+        self.assertEqual(run(incumbent_loss=None), 50)
+
+    def test_incumbents_sent_with_jobs(self):
+        incumbents = incumbent_logger()
+        for budget, loss in [(1, 0.5), (1, 0.3), (3, 0.4), (3, None)]:
+            incumbents(Mock(kwargs={"budget": budget}, result={"loss": loss}))
+
+        master = Mock(spec=["dispatcher", "logger", "thread_cond", "working_directory", "num_running_jobs", "job_kwargs"])
+        master.thread_cond = threading.Condition()
+        master.num_running_jobs = 0
+        master.job_kwargs = incumbents.get_job_kwargs
+        BOHBExt._submit_job(master, (0, 0, 1), config={}, budget=3)
+        master.dispatcher.submit_job.assert_called_once_with((0, 0, 1), config={}, budget=3, working_directory=master.working_directory,
+                                                             incumbent_losses=[(1, 0.3), (3, 0.4)])
+
+        # without the hook, the jobs carry no additional arguments
+        master.job_kwargs = None
+        master.dispatcher.submit_job.reset_mock()
+        BOHBExt._submit_job(master, (0, 0, 2), config={}, budget=3)
+        master.dispatcher.submit_job.assert_called_once_with((0, 0, 2), config={}, budget=3, working_directory=master.working_directory)
+
+        self.assertEqual(CrossValidation.get_incumbent_loss([(1, 0.3), (3, 0.4)], 3.0), 0.4)
+        self.assertIsNone(CrossValidation.get_incumbent_loss([(1, 0.3)], 9))
+        self.assertIsNone(CrossValidation.get_incumbent_loss(None, 9))
@@ -0,0 +1,77 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import os
+import json
+import time
+import unittest
+import tempfile
+from types import SimpleNamespace
+
+from autoPyTorch.pipeline.base.pipeline import Pipeline
+from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
+from autoPyTorch.utils.benchmarking.benchmark_pipeline import ForInstance, ForAutoNetConfig, ForRun
+from autoPyTorch.utils.benchmarking.benchmark_pipeline.prepare_result_folder import get_run_result_dir
+from autoPyTorch.utils.benchmarking.local_scheduler import LocalScheduler
+
+
+class CreateFakeAutoNet(PipelineNode):
+    def fit(self, pipeline_config, instance):
+        autonet = SimpleNamespace(get_current_autonet_config=lambda: {"min_budget": 1, "max_budget": 9})
+        return {"autonet": autonet, "data_manager": None}
+
+
+class FakeRun(PipelineNode):
+    def fit(self, pipeline_config, autonet, instance, run_number, run_id):
+        result_dir = get_run_result_dir(pipeline_config, instance, run_id, run_number, autonet)
+        os.makedirs(result_dir, exist_ok=True)
+        with open(os.path.join(result_dir, "summary.json"), "a") as f:
+            print(json.dumps({"working_dir": pipeline_config["working_dir"]}), file=f)
+        print("fitted " + os.path.basename(instance))
+        return dict()
+
+
+@unittest.skipIf(not LocalScheduler.is_available(), "processes can not be forked")
+class TestLocalScheduler(unittest.TestCase):
+
+    def test_run_jobs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            def sleep():
+                print("sleeping")
+                time.sleep(0.5)
+
+            scheduler = LocalScheduler(num_jobs=3, log_dir=directory, cores_per_job=1)
+            start_time = time.time()
+            exit_codes = scheduler.run([("a", sleep), ("b", sleep), ("c", sleep), ("crash", lambda: 1 / 0)])
+            self.assertLess(time.time() - start_time, 1.5)
+            self.assertEqual(exit_codes, {"a": 0, "b": 0, "c": 0, "crash": 1})
+
+            with open(scheduler.get_log_file("benchmark")) as f:
+                log = f.read()
+            self.assertEqual(log.count("sleeping"), 3)
+            self.assertIn("ZeroDivisionError", log)
+
+    def test_benchmark_jobs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, "instances"))
+            for name in ["a.csv", "b.csv"]:
+                open(os.path.join(directory, "instances", name), "w").close()
+
+            pipeline = Pipeline([ForInstance([CreateFakeAutoNet(), ForAutoNetConfig([ForRun([FakeRun()])])])])
+            config = {"instances": os.path.join(directory, "instances"), "instance_slice": None, "multiple_datasets_indices": None,
+                      "dataset_root": directory, "autonet_configs": ["x.txt"], "autonet_config_root": directory,
+                      "autonet_config_slice": None, "num_runs": 2, "run_number_range": None, "skip_finished_runs": True,
+                      "result_dir": os.path.join(directory, "results"), "name": "test", "working_dir": directory,
+                      "num_local_jobs": 2, "cores_per_job": None, "memory_per_job_mb": None}
+            for _ in range(2):
+                pipeline.fit_pipeline(pipeline_config=config, task_id=-1, run_id="0")
+
+            # the second time, the finished runs are skipped
+            for instance in ["a", "b"]:
+                for run_number in range(2):
+                    with open(os.path.join(directory, "results", instance, "test[1_9]", "run_0_" + str(run_number), "summary.json")) as f:
+                        self.assertEqual(len(f.readlines()), 1)
+            self.assertEqual(len(os.listdir(os.path.join(directory, "results", "logs_0"))), 2 * 2 + 1)
+            with open(os.path.join(directory, "results", "logs_0", "benchmark.log")) as f:
+                self.assertEqual(f.read().count("fitted"), 4)
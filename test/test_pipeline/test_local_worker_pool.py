@@ -0,0 +1,46 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import os
+import time
+import unittest
+import tempfile
+from unittest.mock import Mock
+
+from autoPyTorch.core.local_worker_pool import LocalWorkerPool
+
+
+@unittest.skipIf(not LocalWorkerPool.is_available(), "processes can not be forked")
+class TestLocalWorkerPool(unittest.TestCase):
+
+    def test_restart_crashed_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            def run_worker(index):
+                # worker 1 crashes on its first start
+                with open(os.path.join(directory, str(index)), "a") as f:
+                    f.write("started\n")
+                if index == 1 and not os.path.exists(os.path.join(directory, "crashed")):
+                    open(os.path.join(directory, "crashed"), "w").close()
+                    os._exit(1)
+
+            shutdownable = Mock()
+            pool = LocalWorkerPool(run_worker=run_worker, num_workers=3, shutdownables=[shutdownable], poll_interval=0.1)
+            pool.start()
+            time.sleep(1)
+            pool.shutdown()
+
+            self.assertEqual(pool.num_restarts, 1)
+            for index, num_starts in [(0, 1), (1, 2), (2, 1)]:
+                with open(os.path.join(directory, str(index)), "r") as f:
+                    self.assertEqual(len(f.readlines()), num_starts)
+            self.assertTrue(all(process.exitcode == 0 for process in pool.processes))
+            shutdownable.shutdown.assert_called_once_with()
+
+    def test_max_restarts(self):
+        pool = LocalWorkerPool(run_worker=lambda index: os._exit(1), num_workers=2, shutdownables=[], max_restarts=3, poll_interval=0.1)
+        pool.start()
+        time.sleep(1)
+        pool.shutdown()
+        self.assertEqual(pool.num_restarts, 3)
+        self.assertEqual(pool.failed, set([0, 1]))
@@ -0,0 +1,75 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import logging
+import unittest
+import numpy as np
+import torch
+import torch.nn as nn
+from types import SimpleNamespace
+from torch.utils.data import DataLoader, TensorDataset
+
+from autoPyTorch.components.networks.base_net import BaseNet
+from autoPyTorch.components.metrics.standard_metrics import accuracy
+from autoPyTorch.components.training.base_training import BaseBatchLossComputationTechnique
+from autoPyTorch.components.training.mixed_precision import MixedPrecision, get_autocast_dtype, prepare_input
+from autoPyTorch.components.training.trainer import Trainer
+from autoPyTorch.pipeline.nodes.metric_selector import AutoNetMetric, undo_ohe
+
+
+class LinearNet(BaseNet):
+    def __init__(self):
+        super(LinearNet, self).__init__(config=dict(), in_features=4, out_features=2, final_activation=nn.Softmax(1))
+        self.layers = nn.Sequential(nn.Linear(4, 16), nn.ReLU(), nn.Linear(16, 2))
+
+
+class TestMixedPrecision(unittest.TestCase):
+
+    def test_autocast_dtype(self):
+        cpu, cuda = torch.device("cpu"), torch.device("cuda")
+        self.assertIsNone(get_autocast_dtype("fp32", cpu))
+        self.assertEqual(get_autocast_dtype("bf16", cpu), torch.bfloat16)
+        self.assertEqual(get_autocast_dtype("fp16", cpu), torch.bfloat16)
+        self.assertEqual(get_autocast_dtype("fp16", cuda), torch.float16)
+
+    def test_train_bf16(self):
+        torch.manual_seed(0)
+        X = torch.randn(64, 4)
+        Y = nn.functional.one_hot((X[:, 0] > 0).long(), 2).float()
+        loader = DataLoader(TensorDataset(X, Y), batch_size=16)
+
+        network = LinearNet()
+        metric = AutoNetMetric(name="accuracy", metric=accuracy, loss_transform=lambda x: -x, ohe_transform=undo_ohe)
+        trainer = Trainer(metrics=[metric], log_functions=[], loss_computation=BaseBatchLossComputationTechnique(), model=network,
+                          criterion=nn.CrossEntropyLoss(), budget=1, optimizer=torch.optim.SGD(network.parameters(), lr=0.1),
+                          training_techniques=[MixedPrecision()], logger=logging.getLogger('autonet'), device=torch.device("cpu"),
+                          full_eval_each_epoch=False)
+        trainer.prepare(pipeline_config={"training_precision": "bf16", "channels_last": False},
+                        hyperparameter_config={"batch_loss_computation_technique": "standard"}, fit_start_time=0)
+        self.assertEqual(trainer.autocast_dtype, torch.bfloat16)
+        self.assertIsNone(trainer.grad_scaler)
+
+        for epoch in range(3):
+            train_metrics, train_loss, _ = trainer.train(epoch + 1, loader)
+        self.assertTrue(np.isfinite(train_loss))
+        self.assertTrue(all(p.dtype == torch.float32 for p in network.parameters()))
+
+        # snapshots keep the float32 parameters
+        network.snapshot()
+        valid_metrics = trainer.evaluate(loader)
+        trainer.train(4, loader)
+        network.load_snapshot()
+        self.assertEqual(trainer.evaluate(loader), valid_metrics)
+        self.assertGreater(valid_metrics[0], 0.5)
+
+    def test_channels_last(self):
+        network = nn.Sequential(nn.Conv2d(3, 4, 3), nn.Flatten())
+        trainer = SimpleNamespace(model=network, device=torch.device("cpu"))
+        MixedPrecision().set_up(trainer, {"training_precision": "fp32", "channels_last": True})
+        self.assertIsNone(trainer.autocast_dtype)
+        self.assertTrue(network[0].weight.is_contiguous(memory_format=torch.channels_last))
+
+        data = prepare_input(trainer, torch.randn(2, 3, 8, 8))
+        self.assertTrue(data.is_contiguous(memory_format=torch.channels_last))
+        self.assertEqual(prepare_input(trainer, torch.randn(2, 3)).dim(), 2)
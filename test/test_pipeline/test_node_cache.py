@@ -0,0 +1,80 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import tempfile
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from autoPyTorch.pipeline.base.pipeline import Pipeline
+from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
+from autoPyTorch.pipeline.base.node_cache import NodeCache, fingerprint
+
+
+class ScaleNode(PipelineNode):
+    def __init__(self):
+        super(ScaleNode, self).__init__()
+        self.num_fits = 0
+
+    def fit(self, hyperparameter_config, X, train_indices):
+        self.num_fits += 1
+        scale = np.max(X[train_indices]) * hyperparameter_config["factor"]
+        return {'X': X / scale, 'scale': scale}
+
+    def get_fit_cache_key(self, hyperparameter_config, X, train_indices):
+        return (hyperparameter_config["factor"], X, train_indices)
+
+
+class ShiftNode(ScaleNode):
+    def fit(self, hyperparameter_config, X, train_indices):
+        self.num_fits += 1
+        return {'X': X - np.min(X[train_indices]), 'result': X - np.min(X[train_indices])}
+
+
+class TestNodeCache(unittest.TestCase):
+
+    def test_fit_traverse_uses_cache(self):
+        pipeline = Pipeline([ScaleNode(), ShiftNode()])
+        pipeline.node_cache = NodeCache(max_memory_mb=10)
+
+        X = np.arange(12, dtype=np.float32).reshape(4, 3)
+        first = pipeline.fit_pipeline(hyperparameter_config={"factor": 2}, X=X, train_indices=np.array([0, 1]))
+        second = pipeline.fit_pipeline(hyperparameter_config={"factor": 2}, X=X.copy(), train_indices=np.array([0, 1]))
+        assert_array_equal(first['result'], second['result'])
+        self.assertEqual(pipeline["ScaleNode"].num_fits, 1)
+        self.assertEqual(pipeline["ShiftNode"].num_fits, 1)
+        self.assertEqual(pipeline["ScaleNode"].fit_output['scale'], 10)
+
+        # different hyperparameters or splits invalidate the cache
+        pipeline.fit_pipeline(hyperparameter_config={"factor": 3}, X=X, train_indices=np.array([0, 1]))
+        pipeline.fit_pipeline(hyperparameter_config={"factor": 2}, X=X, train_indices=np.array([0, 2]))
+        self.assertEqual(pipeline["ScaleNode"].num_fits, 3)
+        self.assertEqual(pipeline["ShiftNode"].num_fits, 3)
+
+    def test_lru_eviction(self):
+        cache = NodeCache(max_memory_mb=1)
+        data = np.zeros(100 * 1024, dtype=np.float32)  # 400 KB
+
+        for key in ["a", "b", "c"]:
+            cache.put(key, {'X': data})
+            cache.get("a")
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_disk_tier(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = NodeCache(cache_dir=cache_dir)
+            cache.put("key", {'X': np.ones(3)})
+
+            other_process_cache = NodeCache(cache_dir=cache_dir)
+            assert_array_equal(other_process_cache.get("key")['X'], np.ones(3))
+            self.assertIsNone(other_process_cache.get("other_key"))
+
+    def test_fingerprint(self):
+        X = np.arange(6).reshape(2, 3)
+        self.assertEqual(fingerprint((X, {"a": 1})), fingerprint((X.copy(), {"a": 1})))
+        self.assertNotEqual(fingerprint(X), fingerprint(X.astype(np.float64)))
+        self.assertNotEqual(fingerprint(X), fingerprint(X.reshape(3, 2)))
+        self.assertNotEqual(fingerprint({"a": 1}), fingerprint({"a": 2}))
@@ -0,0 +1,72 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import gc
+import time
+import inspect
+import unittest
+from unittest.mock import patch
+
+from autoPyTorch.pipeline.base.pipeline import Pipeline
+from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
+
+
+class StepNode(PipelineNode):
+    def fit(self, pipeline_config, X, offset=1):
+        return {'X': X + offset, 'offset': offset}
+
+    def predict(self, X, offset):
+        return {'X': X + offset}
+
+
+class LastNode(PipelineNode):
+    def fit(self, X):
+        return {'Y': X}
+
+    def predict(self, X):
+        return {'Y': X}
+
+
+def create_pipeline(num_nodes):
+    # nodes are identified by the name of their class
+    return Pipeline([type("StepNode" + str(i), (StepNode, ), dict())() for i in range(num_nodes)] + [LastNode()])
+
+
+class TestPipelineTraversal(unittest.TestCase):
+
+    def test_traversal_plan(self):
+        pipeline = create_pipeline(3)
+        self.assertEqual(pipeline.fit_pipeline(pipeline_config=dict(), X=0)['Y'], 3)
+        self.assertEqual(pipeline.predict_pipeline(X=10)['Y'], 13)
+
+        # the keywords of the nodes are only inspected once
+        with patch.object(inspect, "getfullargspec", side_effect=inspect.getfullargspec) as getfullargspec, \
+                patch.object(gc, "collect") as collect:
+            pipeline.fit_pipeline(pipeline_config=dict(), X=0)
+            pipeline.predict_pipeline(X=0)
+            self.assertEqual(getfullargspec.call_count, 0)
+            self.assertEqual(collect.call_count, 0)
+
+            # garbage collection is opt-in
+            pipeline.fit_pipeline(pipeline_config={"collect_garbage": True}, X=0)
+            self.assertEqual(collect.call_count, 2)
+
+        # adding a node invalidates the plan
+        plan = pipeline.get_traversal_plan()
+        pipeline.add_pipeline_node(type("StepNode3", (StepNode, ), dict())())
+        self.assertIsNot(pipeline.get_traversal_plan(), plan)
+
+    def test_dispatch_overhead(self):
+        num_nodes, repetitions = 20, 200
+        pipeline = create_pipeline(num_nodes)
+        pipeline.fit_pipeline(pipeline_config=dict(), X=0)
+
+        start = time.time()
+        for _ in range(repetitions):
+            pipeline.fit_pipeline(pipeline_config=dict(), X=0)
+            pipeline.predict_pipeline(X=0)
+        per_node = (time.time() - start) / repetitions / num_nodes / 2
+
+        # dispatching a call to a node should take a few microseconds, way below a millisecond on any machine
+        self.assertLess(per_node, 1e-3)
@@ -0,0 +1,71 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import os
+import json
+import unittest
+import tempfile
+import numpy as np
+from hpbandster.core.result import logged_results_to_HBS_result
+
+from autoPyTorch.utils.results_index import ResultsIndex
+
+
+def write_logs(directory, num_configs, mode="w", start=0, seed=0):
+    rng = np.random.RandomState(seed)
+    with open(os.path.join(directory, "configs.json"), mode) as configs, open(os.path.join(directory, "results.json"), mode) as results:
+        for i in range(start, start + num_configs):
+            config_id = [i // 10, 0, i % 10]
+            print(json.dumps([config_id, {"learning_rate": rng.rand()}, {"model_based_pick": False}]), file=configs)
+            for budget in [1.0, 3.0, 9.0][:rng.randint(1, 4)]:
+                finished = float(i + budget + rng.randint(0, 3))
+                result = {"loss": float(rng.rand()), "info": {"val_accuracy": float(rng.rand()), "train_accuracy": float(rng.rand()), "name": "x"}}
+                if rng.rand() < 0.1:
+                    result = None
+                print(json.dumps([config_id, budget, {"submitted": i, "started": i, "finished": finished}, result, None]), file=results)
+
+
+class TestResultsIndex(unittest.TestCase):
+
+    def assert_same_results(self, directory, index):
+        result = logged_results_to_HBS_result(directory)
+        for kwargs in [dict(bigger_is_better=False, non_decreasing_budget=False), dict()]:
+            expected = result.get_incumbent_trajectory(**kwargs)
+            self.assertEqual(index.get_incumbent_trajectory(**kwargs), expected)
+
+        id2config = result.get_id2config_mapping()
+        self.assertEqual(list(index.get_id2config_mapping()), list(id2config))
+        self.assertEqual(index.get_time_ref(), result.HB_config["time_ref"])
+        val_accuracy = index.get_metric_values("val_accuracy")
+        for config_id in id2config:
+            self.assertEqual(index.get_config(config_id)["config"], id2config[config_id]["config"])
+            for run in result.get_runs_by_id(config_id):
+                indexed = index.get_run(config_id, run.budget)
+                self.assertEqual((indexed.loss, indexed.info, indexed.time_stamps), (run.loss, run.info, run.time_stamps))
+                if run.info:
+                    self.assertEqual(val_accuracy[(config_id, run.budget)], run.info["val_accuracy"])
+        self.assertNotIn("name", [name for name, in index.connection.execute("SELECT DISTINCT name FROM metrics")])
+
+    def test_index(self):
+        with tempfile.TemporaryDirectory() as directory:
+            write_logs(directory, 30)
+            self.assert_same_results(directory, ResultsIndex(directory))
+
+            # only the appended lines are indexed, incomplete lines later
+            write_logs(directory, 20, mode="a", start=30, seed=1)
+            with open(os.path.join(directory, "results.json"), "a") as f:
+                f.write('[[5, 0, 0], 1.0, {"submitted": 50')
+            index = ResultsIndex(directory)
+            self.assertIsNone(index.get_run((5, 0, 0), 1.0))
+            with open(os.path.join(directory, "configs.json"), "a") as f:
+                print(json.dumps([[5, 0, 0], {}, {}]), file=f)
+            with open(os.path.join(directory, "results.json"), "a") as f:
+                print(', "started": 50, "finished": 51}, {"loss": 0.5, "info": {}}, null]', file=f)
+            index.update()
+            self.assertEqual(index.get_run((5, 0, 0), 1.0).loss, 0.5)
+            self.assert_same_results(directory, index)
+
+            # the logs have been overwritten by a new run
+            write_logs(directory, 10, seed=2)
+            self.assert_same_results(directory, ResultsIndex(directory))
@@ -0,0 +1,87 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import os
+import json
+import unittest
+import tempfile
+import numpy as np
+from types import SimpleNamespace
+from numpy.testing import assert_array_equal
+
+from autoPyTorch.components.ensembles.ensemble_selection import EnsembleSelection
+from autoPyTorch.pipeline.nodes import OneHotEncoding
+from autoPyTorch.pipeline.nodes.metric_selector import AutoNetMetric, MetricSelector
+from autoPyTorch.utils.ensemble import EnsemblePredictionStore
+from autoPyTorch.utils.benchmarking.benchmark_pipeline.save_ensemble_logs import save_ensemble_logs, get_selection_key, weighted_sum
+
+
+def log_loss(y_true, y_pred):
+    return float(-np.mean(np.sum(y_true * np.log(y_pred), axis=1)))
+
+
+def create_autonet(only_consider_n_best):
+    metric = AutoNetMetric(name="log_loss", metric=log_loss, loss_transform=lambda x: x, ohe_transform=lambda x: x)
+    autonet_config = {"optimize_metric": "log_loss", "additional_metrics": [], "ensemble_size": 10,
+                      "ensemble_only_consider_n_best": only_consider_n_best, "ensemble_sorted_initialization_n_best": 0}
+    pipeline = {MetricSelector.get_name(): SimpleNamespace(metrics={"log_loss": metric}),
+                OneHotEncoding.get_name(): SimpleNamespace(complete_y_tranformation=lambda y: (y, None))}
+    return SimpleNamespace(get_current_autonet_config=lambda: autonet_config, pipeline=pipeline), metric
+
+
+def create_result_dir(directory, num_models):
+    rng = np.random.RandomState(0)
+    with open(os.path.join(directory, "configs.json"), "w") as f:
+        print(json.dumps([[0, 0, 0], {}, {}]), file=f)
+    with open(os.path.join(directory, "results.json"), "w") as f:
+        print(json.dumps([[0, 0, 0], 1.0, {"submitted": 0, "started": 0, "finished": 1}, {"loss": 0, "info": {}}, None]), file=f)
+
+    labels = np.eye(3)[rng.randint(0, 3, 100)]
+    store = EnsemblePredictionStore(os.path.join(directory, "predictions_for_ensemble.npy"))
+    store.create(overwrite=True)
+    store.write_labels(labels)
+    predictions = list()
+    finished = 0
+    for i in range(num_models):
+        finished += rng.rand() * 10
+        predictions.append((rng.dirichlet([1, 1, 1], 100) * 0.9 + labels * 0.1).astype(np.float32))
+        store.append((i, 0, 0), 1.0, {"submitted": finished - 5, "finished": finished}, 0, predictions[-1])
+    return np.array(predictions), labels
+
+
+class TestSaveEnsembleLogs(unittest.TestCase):
+
+    def test_ensemble_over_time(self):
+        for only_consider_n_best in [0, 5]:
+            with tempfile.TemporaryDirectory() as directory:
+                predictions, labels = create_result_dir(directory, num_models=30)
+                autonet, metric = create_autonet(only_consider_n_best)
+                save_ensemble_logs({"num_ensemble_evaluations": 20, "ensemble_log_num_workers": 1}, autonet, directory)
+                save_ensemble_logs({"num_ensemble_evaluations": 20, "ensemble_log_num_workers": 2}, autonet, directory, log_filename="parallel.json")
+
+                with open(os.path.join(directory, "ensemble_log.json")) as f:
+                    logs = [json.loads(line) for line in f]
+                with open(os.path.join(directory, "parallel.json")) as f:
+                    self.assertEqual([log[1:] for log in logs], [json.loads(line)[1:] for line in f])
+                self.assertGreater(len(logs), 1)
+
+                # same result as building each ensemble from scratch
+                for _, performance, weights, _, info in logs:
+                    num_models = info["num_input_models"]
+                    ensemble = EnsembleSelection(10, metric, only_consider_n_best=only_consider_n_best)
+                    ensemble.fit(np.copy(predictions[:num_models]), labels, list(range(num_models)))
+                    self.assertEqual(performance["log_loss"], log_loss(labels, ensemble.predict(np.copy(predictions[:num_models]))))
+                    self.assertEqual([w for _, w in weights], sorted(ensemble.weights_[ensemble.weights_ > 0].tolist(), reverse=True))
+
+    def test_selection_key(self):
+        losses = np.array([0.3, 0.1, 0.2, 0.5])
+        self.assertIsNone(get_selection_key(losses, 0, 0))
+        self.assertEqual(get_selection_key(losses, 2, 1), get_selection_key(np.append(losses, 0.4), 2, 1))
+        self.assertNotEqual(get_selection_key(losses, 2, 1), get_selection_key(np.append(losses, 0.15), 2, 1))
+
+    def test_weighted_sum(self):
+        predictions = np.random.rand(4, 10, 3).astype(np.float32)
+        weights = np.array([0.5, 0, 0.25, 0.25])
+        ensemble = SimpleNamespace(weights_=weights)
+        assert_array_equal(weighted_sum(predictions, weights), EnsembleSelection.predict(ensemble, np.copy(predictions)))
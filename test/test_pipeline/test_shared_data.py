@@ -0,0 +1,58 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import os
+import unittest
+import tempfile
+import numpy as np
+import scipy.sparse
+from numpy.testing import assert_array_equal
+
+from autoPyTorch.utils.shared_data import SharedData
+
+
+class TestSharedData(unittest.TestCase):
+
+    def test_publish_and_attach(self):
+        with tempfile.TemporaryDirectory() as directory:
+            X = np.arange(12, dtype=np.float32).reshape(4, 3)
+            X_sparse = scipy.sparse.random(4, 5, density=0.5, format="csr", random_state=0)
+            Y = np.array([0, 1, 0, 1])
+
+            master = SharedData("run", "token", directory=directory)
+            self.assertTrue(master.publish(replace=True, X_train=X, Y_train=Y, X_valid=X_sparse, Y_valid=None))
+
+            # a second worker on the same host attaches to the published data
+            worker = SharedData("run", "token", directory=directory)
+            self.assertTrue(worker.publish(X_train=X, Y_train=Y, X_valid=X_sparse, Y_valid=None))
+            self.assertFalse(worker.created)
+            data = worker.attach()
+            assert_array_equal(data["X_train"], X)
+            assert_array_equal(data["Y_train"], Y)
+            assert_array_equal(data["X_valid"].toarray(), X_sparse.toarray())
+            self.assertIsNone(data["Y_valid"])
+            self.assertIsInstance(data["X_train"], np.memmap)
+
+            # writes stay in the process
+            data["X_train"][0, 0] = 100
+            self.assertEqual(master.attach()["X_train"][0, 0], 0)
+
+            # different data with the same name or data that can not be mapped is not shared
+            self.assertFalse(worker.publish(X_train=X[:2], Y_train=Y, X_valid=X_sparse, Y_valid=None))
+            self.assertFalse(worker.publish(X_train=X + 1, Y_train=Y, X_valid=X_sparse, Y_valid=None))
+
+            # another run with the same run id does neither attach to the data nor replace it
+            other_run = SharedData("run", "other_token", directory=directory)
+            self.assertNotEqual(other_run.path, master.path)
+            self.assertTrue(other_run.publish(replace=True, X_train=X, Y_train=Y, X_valid=X_sparse, Y_valid=None))
+            self.assertTrue(other_run.created)
+            self.assertTrue(master.exists())
+            other_run.shutdown()
+            self.assertFalse(SharedData("other", "token", directory=directory).publish(X_train=np.array(["a"], dtype=object)))
+
+            worker.shutdown()
+            self.assertTrue(master.exists())
+            master.shutdown()
+            self.assertFalse(master.exists())
+            self.assertEqual(os.listdir(directory), [])
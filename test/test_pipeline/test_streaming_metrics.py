@@ -0,0 +1,103 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import numpy as np
+import torch
+
+from autoPyTorch.components.metrics import accuracy, balanced_accuracy, auc_metric, pac_metric, mae, rmse, \
+    StreamingAccuracy, StreamingBalancedAccuracy, StreamingAUC, StreamingPAC, StreamingMAE, StreamingRMSE
+from autoPyTorch.pipeline.nodes.metric_selector import AutoNetMetric, undo_ohe, no_transform, default_minimize_transform
+
+
+def compute_streaming(streaming_metric, y_true, y_pred, batch_size=37, **kwargs):
+    accumulators = list()
+    for i in range(0, len(y_true), batch_size):
+        accumulator = streaming_metric(**kwargs)
+        accumulator.update(y_true[i:i + batch_size], y_pred[i:i + batch_size])
+        accumulators.append(accumulator)
+    for accumulator in accumulators[1:]:
+        accumulators[0].merge(accumulator)
+    return accumulators[0].compute()
+
+
+class TestStreamingMetrics(unittest.TestCase):
+
+    def test_classification_metrics(self):
+        random_state = np.random.RandomState(0)
+        for num_classes in [2, 3, 5]:
+            labels = random_state.randint(0, num_classes, 500)
+            predicted_labels = random_state.randint(0, num_classes, 500)
+            probabilities = random_state.rand(500, num_classes)
+            one_hot = np.eye(num_classes)[labels]
+
+            self.assertAlmostEqual(compute_streaming(StreamingAccuracy, labels, predicted_labels), accuracy(labels, predicted_labels))
+            self.assertAlmostEqual(compute_streaming(StreamingBalancedAccuracy, labels, predicted_labels),
+                                   balanced_accuracy(labels, predicted_labels))
+            self.assertAlmostEqual(compute_streaming(StreamingPAC, one_hot, probabilities), pac_metric(one_hot, probabilities))
+            self.assertAlmostEqual(compute_streaming(StreamingPAC, labels, probabilities), pac_metric(labels, probabilities))
+            self.assert_auc_approximation(one_hot, probabilities)
+
+    def test_auc_saturated_probabilities(self):
+        # well trained networks put most of the probability mass close to 1
+        random_state = np.random.RandomState(0)
+        for num_classes in [2, 4]:
+            labels = random_state.randint(0, num_classes, 500)
+            one_hot = np.eye(num_classes)[labels]
+            probabilities = 0.999 + 0.001 * random_state.rand(500, num_classes)
+            probabilities[np.arange(500), labels] = 0.999 + 0.001 * random_state.beta(5, 1, 500)
+            self.assertGreater(auc_metric(one_hot, probabilities), 0.5)
+            self.assert_auc_approximation(one_hot, probabilities)
+
+    def assert_auc_approximation(self, one_hot, probabilities):
+        # a positive and a negative sample sharing a histogram bin count as half a win, the exact ROC AUC counts
+        # one or zero. So auc_metric = 2 * AUC - 1 is off by at most the mean fraction of positive-negative pairs
+        # sharing a bin. With 10000 bins over the logits in [-20, 20] that error stays below 1e-3 here.
+        bins = StreamingAUC().to_bins(probabilities).numpy()
+        positive = one_hot > 0.5
+        shared = [np.mean(bins[positive[:, i], i][:, None] == bins[~positive[:, i], i][None, :]) for i in range(one_hot.shape[1])]
+        error_bound = np.mean(shared)
+        self.assertLess(error_bound, 1e-3)
+
+        approximation = compute_streaming(StreamingAUC, one_hot, probabilities)
+        self.assertLessEqual(abs(approximation - auc_metric(one_hot, probabilities)), error_bound + 1e-12)
+        self.assertAlmostEqual(compute_streaming(StreamingAUC, one_hot, probabilities, exact=True),
+                               auc_metric(one_hot, probabilities))
+
+    def test_regression_metrics(self):
+        random_state = np.random.RandomState(0)
+        y_true, y_pred = random_state.rand(500, 2), random_state.rand(500, 2)
+        self.assertAlmostEqual(compute_streaming(StreamingMAE, y_true, y_pred), mae(y_true, y_pred))
+        self.assertAlmostEqual(compute_streaming(StreamingRMSE, y_true, y_pred), rmse(y_true, y_pred))
+
+    def test_accumulator(self):
+        random_state = np.random.RandomState(0)
+        labels = np.eye(3)[random_state.randint(0, 3, 100)]
+        probabilities = random_state.rand(100, 3)
+
+        metric = AutoNetMetric("accuracy", accuracy, default_minimize_transform, undo_ohe, streaming_metric=StreamingAccuracy)
+        accumulator = metric.create_accumulator()
+        accumulator.update(probabilities[:50], labels[:50])
+        accumulator.update(probabilities[50:], labels[50:])
+        self.assertAlmostEqual(accumulator.compute(), metric(probabilities, labels))
+        self.assertIsNone(AutoNetMetric("accuracy", accuracy, default_minimize_transform, undo_ohe).create_accumulator())
+
+    def test_accumulator_tensors(self):
+        random_state = np.random.RandomState(0)
+        labels = torch.from_numpy(np.eye(3)[random_state.randint(0, 3, 100)])
+        probabilities = torch.from_numpy(random_state.rand(100, 3))
+
+        for name, metric_function, ohe_transform, streaming_metric in [
+                ("accuracy", accuracy, undo_ohe, StreamingAccuracy),
+                ("balanced_accuracy", balanced_accuracy, undo_ohe, StreamingBalancedAccuracy),
+                ("pac_metric", pac_metric, no_transform, StreamingPAC),
+                ("auc_metric", auc_metric, no_transform, StreamingAUC)]:
+            metric = AutoNetMetric(name, metric_function, default_minimize_transform, ohe_transform, streaming_metric=streaming_metric)
+            accumulator = metric.create_accumulator()
+            accumulator.update(probabilities[:50], labels[:50])
+            accumulator.update(probabilities[50:], labels[50:])
+
+            # the batches are reduced with torch, only compute() converts the state
+            self.assertTrue(all(isinstance(value, (torch.Tensor, int)) for value in accumulator.streaming_metric.state.values()))
+            self.assertAlmostEqual(accumulator.compute(), metric(probabilities, labels), places=3)